@@ -1,22 +1,169 @@
+import json
 import time
 import logging
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from typing import List
 
 from app.api.schemas import JobItem
-from app.normalizer import normalize_job_post
+from app.core.config import LLM_USAGE_IN_RESPONSE
+from app.core.metrics import registry as metrics_registry
+from app.integrations.companies_repo import company_cache_stats
+from app.integrations.company_index import get_company_index
+from app.normalizer import anormalize_job_posts, astream_job_posts
+from app.normalizer.job_queue import get_job_queue
+from app.normalizer.llm.breaker import breakers
+from app.normalizer.llm.cache import get_extraction_cache
+from app.normalizer.llm.hedging import hedger
+from app.normalizer.llm.near_dup import get_near_dup_index
+from app.normalizer.llm.rate_limit import rate_limiter
+from app.normalizer.llm.usage import merge_usage, usage_ledger
+from app.normalizer.utils.compact import compaction_stats
+from app.normalizer.utils.rules import rule_stats
+from app.normalizer.vocab.registry import vocab_registry
 
 log = logging.getLogger("job-normalizer")
 router = APIRouter()
 
+# graph state keys clients have always received; everything else in the state is internal
+_PUBLIC_KEYS = (
+    "job_dict", "payload", "llm_primary", "llm_fallback", "llm_merged", "normalized",
+    "company_website", "needs_company_website_lookup", "experience_level",
+)
+
+def _public(result):
+    if not isinstance(result, dict):
+        return result
+    out = {k: result[k] for k in _PUBLIC_KEYS if k in result}
+    # finalize always attaches llm_usage (headers and batch rollups need it); clients only see it on request
+    if LLM_USAGE_IN_RESPONSE and "llm_usage" in result:
+        out["llm_usage"] = result["llm_usage"]
+    return out
+
 @router.post("/normalize-job")
-def normalize_jobs(req: List[JobItem], request: Request):
+async def normalize_jobs(req: List[JobItem], request: Request, response: Response):
     t0 = time.time()
     try:
-        results = [normalize_job_post(job.model_dump()) for job in req]
-        log.info("Normalized %d jobs in %.1fms", len(results), (time.time() - t0) * 1000)
-        return results
+        results, stats = await anormalize_job_posts([job.model_dump() for job in req])
+        usage = merge_usage(r.get("llm_usage") for r in results)
+        response.headers["X-LLM-Prompt-Tokens"] = str(usage["prompt_tokens"])
+        response.headers["X-LLM-Cached-Tokens"] = str(usage["cached_tokens"])
+        response.headers["X-LLM-Completion-Tokens"] = str(usage["completion_tokens"])
+        response.headers["X-LLM-Cost-USD"] = f'{usage["cost_usd"]:.6f}'
+        log.info(
+            "Normalized %d jobs in %.1fms (max_concurrency=%d, peak_concurrency=%d, tokens=%d/%d, cost=$%.6f)",
+            len(results), (time.time() - t0) * 1000,
+            stats["max_concurrency"], stats["peak_concurrency"],
+            usage["prompt_tokens"], usage["completion_tokens"], usage["cost_usd"],
+        )
+        return [_public(r) for r in results]
     except Exception as e:
         log.exception("Error during normalization: %s", e)
         return JSONResponse(status_code=500, content={"detail": "internal_error"})
+
+@router.post("/normalize-job/stream")
+async def normalize_jobs_stream(req: List[JobItem], request: Request):
+    """
+    Same work as /normalize-job, but one NDJSON line per job as soon as it
+    finishes (completion order): {"index": i, "result": {...}} or {"index": i, "error": "..."}.
+    """
+    jobs = [job.model_dump() for job in req]
+
+    async def lines():
+        t0 = time.time()
+        sent = failed = 0
+        async for idx, result, error in astream_job_posts(jobs):
+            if error is not None:
+                log.error("Error normalizing job %d: %s", idx, error)
+                failed += 1
+                line = {"index": idx, "error": "internal_error"}
+            else:
+                line = {"index": idx, "result": jsonable_encoder(_public(result))}
+            sent += 1
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        log.info("Streamed %d jobs (%d failed) in %.1fms", sent, failed, (time.time() - t0) * 1000)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/jobs", status_code=202)
+def submit_jobs(req: List[JobItem]):
+    """
+    Queue a batch for background normalization; poll GET /jobs/{id} for results.
+    """
+    queue = get_job_queue()
+    if queue is None:
+        return JSONResponse(status_code=503, content={"detail": "job_queue_disabled"})
+    batch_id = queue.submit([job.model_dump() for job in req])
+    log.info("Queued batch %s with %d jobs", batch_id, len(req))
+    return queue.status(batch_id, include_results=False)
+
+@router.get("/jobs/{batch_id}")
+def get_jobs(batch_id: str, results: bool = True):
+    queue = get_job_queue()
+    if queue is None:
+        return JSONResponse(status_code=503, content={"detail": "job_queue_disabled"})
+    status = queue.status(batch_id, include_results=results)
+    if status is None:
+        return JSONResponse(status_code=404, content={"detail": "not_found"})
+    if "results" in status:
+        status["results"] = [
+            {**r, "result": _public(r["result"])} if "result" in r else r for r in status["results"]
+        ]
+    return status
+
+@router.get("/stats/job-queue")
+def job_queue_stats():
+    queue = get_job_queue()
+    return queue.stats() if queue is not None else {"enabled": False}
+
+@router.get("/metrics")
+def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/stats/rate-limits")
+def rate_limit_stats():
+    return rate_limiter.stats()
+
+@router.get("/stats/breakers")
+def breaker_stats():
+    return breakers.stats()
+
+@router.get("/stats/vocab")
+def vocab_stats():
+    return vocab_registry.stats()
+
+@router.get("/stats/usage")
+def llm_usage_stats():
+    return usage_ledger.stats()
+
+@router.get("/stats/llm-cache")
+def llm_cache_stats():
+    cache = get_extraction_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+@router.get("/stats/near-dup")
+def near_dup_stats():
+    index = get_near_dup_index()
+    return index.stats() if index is not None else {"enabled": False}
+
+@router.get("/stats/hedging")
+def hedging_stats():
+    return hedger.stats()
+
+@router.get("/stats/rules")
+def rules_stats():
+    return rule_stats.stats()
+
+@router.get("/stats/compaction")
+def compaction_stats_view():
+    return compaction_stats.stats()
+
+@router.get("/stats/company-cache")
+def company_website_cache_stats():
+    return company_cache_stats()
+
+@router.get("/stats/company-index")
+def company_index_stats():
+    index = get_company_index()
+    return index.stats() if index is not None else {"enabled": False}
@@ -0,0 +1,19 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CORPUS = Path(__file__).with_name("corpus.jsonl")
+
+def load_corpus(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Recorded job posts, one JSON object per line: {"job": <JobItem fields>, "expected": {...}}.
+    "expected" (hand-labelled output fields) is optional.
+    """
+    rows = []
+    with open(path or DEFAULT_CORPUS, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                row = json.loads(line)
+                rows.append(row if "job" in row else {"job": row})
+    return rows
@@ -0,0 +1,503 @@
+"""
+End-to-end graph benchmark without network: the structured-output models are
+replaced by a deterministic fake (rule-engine answers, injected latency and
+failures) and Supabase by an in-memory companies table. The corpus is replayed
+through job_graph at each concurrency level; the report (jobs/sec, per-node
+p50/p95/p99, peak memory, model calls) is JSON so runs can be diffed in review.
+
+    python -m app.bench.pipeline [--corpus corpus.jsonl] [--concurrency 1,8,32]
+        [--repeat 25] [--latency 0.4] [--jitter 0.2] [--failure-rate 0.02]
+        [--db-latency 0.01] [--warm] [--pack] [--trace-memory] [--out bench.json]
+        [--baseline old.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+
+from app.bench.corpus import load_corpus
+from app.normalizer.llm.prompt import estimate_tokens
+from app.normalizer.llm.schema import JobOutputSchema, PackedJobOutput, PackedJobsOutput
+
+FIXTURE_COMPANIES = Path(__file__).resolve().parents[1] / "integrations" / "fixtures" / "companies.json"
+
+# provider prompt caching: prefixes of at least this many tokens, in 128-token steps
+_CACHE_MIN_TOKENS = 1024
+_CACHE_STEP = 128
+
+
+class FakeLLMError(RuntimeError):
+    pass
+
+
+def _unit(*parts: Any) -> float:
+    """
+    Deterministic value in [0, 1) for the given parts, so latency and
+    failures don't depend on how concurrent calls happen to be scheduled.
+    """
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+class FakeChatModel(Runnable):
+    """
+    Stands in for ChatOpenAI(...).with_structured_output(schema, include_raw=True):
+    answers with the rule engine's extraction of the payload in the user turn,
+    after `latency` + up to `jitter` seconds, failing `failure_rate` of calls.
+    Usage metadata is estimated from the prompt, with the static prefix
+    reported as cached once it has been seen.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        schema: Type[BaseModel] = JobOutputSchema,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.model_id = model_id
+        self.schema = schema
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = {}
+        self._prefixes: set = set()
+        self.calls = 0
+        self.failures = 0
+
+    def _plan(self, messages: list) -> tuple:
+        text = "\n".join(str(m.content) for m in messages)
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+        with self._lock:
+            attempt = self._attempts[key] = self._attempts.get(key, 0) + 1
+            self.calls += 1
+        delay = self.latency + self.jitter * _unit(self.seed, self.model_id, key, attempt, "latency")
+        fail = _unit(self.seed, self.model_id, key, attempt, "fail") < self.failure_rate
+        return delay, fail
+
+    def _answer(self, messages: list) -> Dict[str, Any]:
+        from app.normalizer.utils.rules import rule_extract
+
+        user = next((str(m.content) for m in messages if m.type == "human"), "")
+        try:
+            payload, _ = json.JSONDecoder().raw_decode(user[user.index("{"):])
+        except ValueError:
+            payload = {}
+        if self.schema is PackedJobsOutput:
+            # packed call: payload is {id: job payload}
+            parsed = PackedJobsOutput(items=[
+                PackedJobOutput(id=item_id, **rule_extract(p)[0].model_dump()) for item_id, p in payload.items()
+            ])
+        else:
+            result, _, _ = rule_extract(payload)
+            parsed = self.schema(**{name: getattr(result, name) for name in self.schema.model_fields})
+
+        prefix = str(messages[0].content) if messages and messages[0].type == "system" else ""
+        prefix_tokens = estimate_tokens(prefix)
+        with self._lock:
+            seen = prefix in self._prefixes
+            self._prefixes.add(prefix)
+        cached = (prefix_tokens // _CACHE_STEP) * _CACHE_STEP if seen and prefix_tokens >= _CACHE_MIN_TOKENS else 0
+        prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        completion_tokens = estimate_tokens(parsed.model_dump_json())
+        raw = AIMessage(content="", usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "input_token_details": {"cache_read": cached},
+        })
+        return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+    def _fail(self) -> None:
+        with self._lock:
+            self.failures += 1
+        raise FakeLLMError(f"injected failure ({self.model_id})")
+
+    def invoke(self, input: Any, config: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        messages = input.to_messages()
+        delay, fail = self._plan(messages)
+        time.sleep(delay)
+        if fail:
+            self._fail()
+        return self._answer(messages)
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        messages = input.to_messages()
+        delay, fail = self._plan(messages)
+        await asyncio.sleep(delay)
+        if fail:
+            self._fail()
+        return self._answer(messages)
+
+
+class _FakeQuery:
+    def __init__(self, db: "FakeSupabase"):
+        self.db = db
+        self.filter: tuple = ("all", None)
+        self.n: Optional[int] = None
+
+    def select(self, _columns: str) -> "_FakeQuery":
+        return self
+
+    def eq(self, _column: str, value: str) -> "_FakeQuery":
+        self.filter = ("eq", value)
+        return self
+
+    def in_(self, _column: str, values: Sequence[str]) -> "_FakeQuery":
+        self.filter = ("in", list(values))
+        return self
+
+    def ilike(self, _column: str, pattern: str) -> "_FakeQuery":
+        self.filter = ("ilike", pattern.strip("%*"))
+        return self
+
+    def limit(self, n: int) -> "_FakeQuery":
+        self.n = n
+        return self
+
+    def execute(self) -> Any:
+        time.sleep(self.db.latency)
+        return type("Result", (), {"data": self.db.match(*self.filter, self.n)})()
+
+
+class FakeSupabase:
+    """
+    In-memory `companies` table answering both the supabase-py query builder
+    (sync path) and AsyncPostgrest.select (async path), after `latency` seconds.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], latency: float = 0.0):
+        self.rows = rows
+        self.latency = latency
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def match(self, kind: str, value: Any, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.queries += 1
+        if kind == "eq":
+            out = [r for r in self.rows if r["company_name"] == value]
+        elif kind == "in":
+            out = [r for r in self.rows if r["company_name"] in value]
+        elif kind == "ilike":
+            out = [r for r in self.rows if value.lower() in r["company_name"].lower()]
+        else:
+            out = list(self.rows)
+        return out[:limit] if limit else out
+
+    def table(self, _name: str) -> _FakeQuery:
+        return _FakeQuery(self)
+
+    async def select(self, _table: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self.latency)
+        operand = params.get("company_name", "")
+        limit = params.get("limit")
+        if operand.startswith("eq."):
+            return self.match("eq", operand[3:], limit)
+        if operand.startswith("in.("):
+            values = json.loads("[" + operand[4:-1] + "]")
+            return self.match("in", values, limit)
+        if operand.startswith("ilike."):
+            return self.match("ilike", operand[6:].strip("*"), limit)
+        return self.match("all", None, limit)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class NodeSamples:
+    """
+    Drop-in for the NODE_SECONDS histogram that keeps every observation, so
+    percentiles are exact rather than bucketed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+
+    def observe(self, value: float, node: str = "") -> None:
+        with self._lock:
+            self.samples.setdefault(node, []).append(value)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            items = {k: sorted(v) for k, v in self.samples.items()}
+        return {node: _distribution(values) for node, values in sorted(items.items())}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    # nearest-rank on sorted values
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))]
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean_ms": round(1000 * sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(1000 * _percentile(values, 0.50), 3),
+        "p95_ms": round(1000 * _percentile(values, 0.95), 3),
+        "p99_ms": round(1000 * _percentile(values, 0.99), 3),
+    }
+
+
+@contextlib.contextmanager
+def offline(
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    failure_rate: float = 0.0,
+    db_latency: float = 0.0,
+    seed: int = 0,
+    warm: bool = False,
+    companies: Optional[List[Dict[str, Any]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Patch the model registry, the Supabase clients and the node timers for the
+    duration of the block. Yields {"models", "db", "nodes"} for inspection.
+    With warm=False the extraction cache and near-duplicate index are off, so
+    every job reaches the model; with warm=True each block gets fresh in-memory ones.
+    """
+    import app.integrations.companies_repo as companies_repo
+    import app.integrations.postgrest as postgrest
+    import app.integrations.supabase_client as supabase_client
+    import app.normalizer.graph as graph
+    import app.normalizer.nodes.llm_cache as llm_cache_node
+    import app.normalizer.nodes.near_dup as near_dup_node
+    import app.normalizer.packing as packing
+    from app.core.cache import TTLCache
+    from app.normalizer.llm.breaker import breakers
+    from app.normalizer.llm.cache import ExtractionCache
+    from app.normalizer.llm.model import registry
+    from app.normalizer.llm.near_dup import NearDupIndex
+
+    if companies is None:
+        companies = json.loads(FIXTURE_COMPANIES.read_text(encoding="utf-8"))
+    models: Dict[tuple, FakeChatModel] = {}
+
+    def fake_model(model_id: str, schema: Type[BaseModel] = JobOutputSchema) -> FakeChatModel:
+        key = (model_id, schema)
+        if key not in models:
+            models[key] = FakeChatModel(model_id, schema, latency, jitter, failure_rate, seed)
+        return models[key]
+
+    db = FakeSupabase(companies, db_latency)
+    nodes = NodeSamples()
+    cache = ExtractionCache(TTLCache(100_000, 0)) if warm else None
+    index = NearDupIndex(":memory:") if warm else None
+    saved = [
+        (registry, "_model_locked", registry.__dict__.get("_model_locked")),
+        (supabase_client, "_client", supabase_client._client),
+        (postgrest, "_postgrest", postgrest._postgrest),
+        (graph, "NODE_SECONDS", graph.NODE_SECONDS),
+        (packing, "NODE_SECONDS", packing.NODE_SECONDS),
+        (llm_cache_node, "get_extraction_cache", llm_cache_node.get_extraction_cache),
+        (near_dup_node, "get_near_dup_index", near_dup_node.get_near_dup_index),
+    ]
+    registry._model_locked = fake_model
+    registry.reset()
+    # injected failures must not leak an open breaker into the next run
+    breakers.reset()
+    supabase_client._client = db
+    postgrest._postgrest = db
+    graph.NODE_SECONDS = nodes
+    packing.NODE_SECONDS = nodes
+    llm_cache_node.get_extraction_cache = lambda: cache
+    near_dup_node.get_near_dup_index = lambda: index
+    companies_repo._found.clear()
+    companies_repo._not_found.clear()
+    try:
+        yield {"models": models, "db": db, "nodes": nodes}
+    finally:
+        for owner, name, value in saved:
+            if owner is registry and value is None:
+                del registry._model_locked
+            else:
+                setattr(owner, name, value)
+        registry.reset()
+        breakers.reset()
+        if index is not None:
+            index.close()
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2 ** 20 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_level(
+    jobs: List[Dict[str, Any]], concurrency: int, trace_memory: bool = False, pack: bool = False, **fake: Any
+) -> Dict[str, Any]:
+    from app.normalizer import anormalize_job_posts, astream_job_posts
+
+    async def replay() -> int:
+        if pack:
+            # one gather for the whole batch: a failed job fails the run
+            await anormalize_job_posts(jobs, concurrency, pack=True)
+            return 0
+        errors = 0
+        async for _idx, _result, error in astream_job_posts(jobs, max_concurrency=concurrency):
+            errors += error is not None
+        return errors
+
+    with offline(**fake) as env:
+        if trace_memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        try:
+            errors = asyncio.run(replay())
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+
+        calls: Dict[str, int] = {}
+        failures = 0
+        for (model_id, _schema), model in env["models"].items():
+            calls[model_id] = calls.get(model_id, 0) + model.calls
+            failures += model.failures
+        return {
+            "concurrency": concurrency,
+            "jobs": len(jobs),
+            "errors": errors,
+            "seconds": round(elapsed, 3),
+            "jobs_per_sec": round(len(jobs) / elapsed, 2) if elapsed else 0.0,
+            # process high-water mark so far (levels run in order, so it only grows)
+            "max_rss_mb": _max_rss_mb(),
+            "peak_traced_mb": round(peak / 2 ** 20, 2) if peak is not None else None,
+            "llm_calls": dict(sorted(calls.items())),
+            "llm_injected_failures": failures,
+            "db_queries": env["db"].queries,
+            "nodes": env["nodes"].summary(),
+        }
+
+
+def run(
+    path: Optional[str] = None,
+    concurrency: Sequence[int] = (1, 8, 32),
+    repeat: int = 25,
+    trace_memory: bool = False,
+    pack: bool = False,
+    **fake: Any,
+) -> Dict[str, Any]:
+    jobs = [row["job"] for row in load_corpus(path)] * max(1, repeat)
+    levels = [run_level(jobs, c, trace_memory, pack, **fake) for c in concurrency]
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "corpus": str(path or "default"),
+            "jobs": len(jobs),
+            "pack": pack,
+            "fake": fake,
+            "max_rss_mb": _max_rss_mb(),
+        },
+        "levels": levels,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10) -> List[str]:
+    """
+    Lines describing changes beyond `threshold` (relative) in jobs/sec and
+    per-node p95 between two reports, matched by concurrency level.
+    """
+    old_levels = {lvl["concurrency"]: lvl for lvl in baseline.get("levels", [])}
+    lines = []
+    for lvl in current.get("levels", []):
+        old = old_levels.get(lvl["concurrency"])
+        if old is None:
+            continue
+        pairs = [("jobs_per_sec", old["jobs_per_sec"], lvl["jobs_per_sec"], True)]
+        for node, dist in lvl["nodes"].items():
+            if node in old["nodes"]:
+                pairs.append((f"{node}.p95_ms", old["nodes"][node]["p95_ms"], dist["p95_ms"], False))
+        for name, before, after, higher_is_better in pairs:
+            if not before:
+                continue
+            change = (after - before) / before
+            if abs(change) >= threshold:
+                worse = change < 0 if higher_is_better else change > 0
+                lines.append(
+                    f"c={lvl['concurrency']} {name}: {before} -> {after} ({change:+.0%})"
+                    + (" REGRESSION" if worse else "")
+                )
+    return lines
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", default=None)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated levels")
+    parser.add_argument("--repeat", type=int, default=25, help="corpus passes per level")
+    parser.add_argument("--latency", type=float, default=0.4, help="fake model base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="extra fake model latency, up to (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--db-latency", type=float, default=0.01, help="fake Supabase latency (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true", help="enable (fresh) extraction cache and near-dup index")
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="also report peak traced Python allocations per level (tracemalloc; slows every level down)",
+    )
+    parser.add_argument("--pack", action="store_true", help="pack short posts into shared model calls")
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    report = run(
+        args.corpus,
+        [int(c) for c in args.concurrency.split(",") if c.strip()],
+        args.repeat,
+        args.trace_memory,
+        args.pack,
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+        db_latency=args.db_latency, seed=args.seed, warm=args.warm,
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            lines = compare(report, json.load(f), args.threshold)
+        for line in lines or ["no changes beyond threshold"]:
+            print(line, file=sys.stderr)
+        if any(line.endswith("REGRESSION") for line in lines):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    _main()
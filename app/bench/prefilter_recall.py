@@ -0,0 +1,67 @@
+"""
+Vocabulary prefilter benchmark: candidate recall against hand-labelled
+answers, and controlled-list tokens sent vs. the full lists.
+
+    python -m app.bench.prefilter_recall [corpus.jsonl]
+"""
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from app.bench.corpus import load_corpus
+from app.normalizer.llm.prompt import estimate_tokens
+from app.normalizer.nodes.preprocess import node_preprocess
+from app.normalizer.vocab.matcher import VOCAB_LISTS, vocab_candidates
+
+# output field → controlled list name
+_FIELD_LIST = {
+    "job_category": "job_categories",
+    "job_type": "job_types",
+    "job_tags": "job_tags",
+    "benefits": "benefits",
+    "job_region": "regions",
+}
+
+def _lists_tokens(lists: Dict[str, List[str]]) -> int:
+    return sum(estimate_tokens(json.dumps(v, ensure_ascii=False)) for v in lists.values())
+
+def run(path: Optional[str] = None) -> Dict[str, Any]:
+    rows = load_corpus(path)
+    found = {name: 0 for name in VOCAB_LISTS}
+    expected_total = {name: 0 for name in VOCAB_LISTS}
+    full_tokens = _lists_tokens(VOCAB_LISTS)
+    sent_tokens = 0
+    scan_seconds = 0.0
+
+    for row in rows:
+        payload = node_preprocess({"job_dict": row["job"]})["payload"]
+        t0 = time.perf_counter()
+        candidates = vocab_candidates(payload)
+        scan_seconds += time.perf_counter() - t0
+        sent_tokens += _lists_tokens(candidates)
+
+        for field, name in _FIELD_LIST.items():
+            value = (row.get("expected") or {}).get(field)
+            values = [value] if isinstance(value, str) else (value or [])
+            for v in values:
+                if v and v in VOCAB_LISTS[name]:
+                    expected_total[name] += 1
+                    found[name] += int(v in candidates[name])
+
+    n = max(1, len(rows))
+    return {
+        "jobs": len(rows),
+        "recall": {
+            name: round(found[name] / expected_total[name], 4) if expected_total[name] else None
+            for name in VOCAB_LISTS
+        },
+        "recall_overall": round(sum(found.values()) / max(1, sum(expected_total.values())), 4),
+        "list_tokens_full": full_tokens,
+        "list_tokens_sent_avg": round(sent_tokens / n, 1),
+        "list_tokens_saved_pct": round(100 * (1 - sent_tokens / (full_tokens * n)), 1),
+        "scan_ms_avg": round(scan_seconds / n * 1000, 3),
+    }
+
+if __name__ == "__main__":
+    print(json.dumps(run(sys.argv[1] if len(sys.argv) > 1 else None), indent=2))
@@ -0,0 +1,73 @@
+"""
+strip_html microbenchmark: the regex tokenizer in app.normalizer.utils.text
+against the previous BeautifulSoup(html.parser) implementation, on the corpus
+descriptions and on synthetic scraped pages of ~10KB, ~50KB and ~100KB.
+
+    python -m app.bench.strip_html [corpus.jsonl]
+"""
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from app.bench.corpus import load_corpus
+from app.normalizer.utils.text import strip_html
+
+# scraped pages carry navigation, inline scripts and tracking around the post
+_CHROME = (
+    "<nav><ul><li><a href='/jobs'>Jobs</a></li><li><a href='/companies'>Companies</a></li></ul></nav>"
+    "<script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments)}</script>"
+    "<style>.job{font-family:sans-serif}.job li{margin:0 0 4px}</style>"
+    "<!-- tracking pixel --><img src='/p.gif' alt=''>"
+)
+
+def bs4_strip_html(html: Optional[str]) -> str:
+    """
+    The previous implementation, kept as the benchmark baseline.
+    """
+    if not html:
+        return ""
+    return " ".join(BeautifulSoup(html, "html.parser").get_text().split()).strip()
+
+def scraped_page(descriptions: List[str], size: int) -> str:
+    parts, total, i = [], 0, 0
+    while total < size:
+        chunk = _CHROME + f"<div class='job' data-i=\"{i}\">" + descriptions[i % len(descriptions)] + "</div>"
+        parts.append(chunk)
+        total += len(chunk)
+        i += 1
+    return "<html><body>" + "".join(parts) + "</body></html>"
+
+def _time(fn: Callable[[str], str], docs: List[str], min_seconds: float = 0.2) -> float:
+    runs, t0 = 0, time.perf_counter()
+    while True:
+        for d in docs:
+            fn(d)
+        runs += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_seconds:
+            return elapsed / (runs * len(docs))
+
+def run(path: Optional[str] = None) -> Dict[str, Any]:
+    descriptions = [r["job"].get("job_description") or "" for r in load_corpus(path)]
+    cases = {"corpus": descriptions}
+    for kb in (10, 50, 100):
+        cases[f"scraped_{kb}kb"] = [scraped_page(descriptions, kb * 1024)]
+
+    out: Dict[str, Any] = {}
+    for name, docs in cases.items():
+        old = _time(bs4_strip_html, docs)
+        new = _time(strip_html, docs)
+        out[name] = {
+            "docs": len(docs),
+            "avg_bytes": sum(len(d) for d in docs) // max(1, len(docs)),
+            "bs4_ms": round(old * 1000, 3),
+            "tokenizer_ms": round(new * 1000, 3),
+            "speedup": round(old / new, 1) if new else None,
+        }
+    return out
+
+if __name__ == "__main__":
+    print(json.dumps(run(sys.argv[1] if len(sys.argv) > 1 else None), indent=2))
@@ -0,0 +1,46 @@
+from langchain_core.messages import HumanMessage
+from langchain_core.prompt_values import ChatPromptValue
+
+from app.bench import pipeline
+from app.bench.corpus import load_corpus
+from app.normalizer.llm.model import registry
+
+
+def test_offline_replay_reaches_every_node_and_restores_patches():
+    jobs = [row["job"] for row in load_corpus()][:4]
+
+    level = pipeline.run_level(jobs, 2, db_latency=0.0)
+
+    assert level["jobs"] == 4 and level["errors"] == 0
+    assert level["llm_calls"]
+    assert {"preprocess", "llm_extract", "validate_normalize", "finalize"} <= set(level["nodes"])
+    assert level["nodes"]["llm_extract"]["count"] == 4
+    assert "_model_locked" not in registry.__dict__
+
+
+def test_injected_failures_are_deterministic():
+    def failures(seed):
+        out = []
+        with pipeline.offline(failure_rate=0.5, seed=seed):
+            model = registry.model("gpt-4o")
+            for i in range(20):
+                prompt = ChatPromptValue(messages=[HumanMessage(content='{"job_title": "x%d"}' % i)])
+                try:
+                    model.invoke(prompt)
+                    out.append(False)
+                except pipeline.FakeLLMError:
+                    out.append(True)
+        return out
+
+    assert failures(1) == failures(1)
+    assert 0 < sum(failures(1)) < 20
+
+
+def test_compare_flags_throughput_and_latency_regressions():
+    base = {"levels": [{"concurrency": 8, "jobs_per_sec": 100.0, "nodes": {"llm_extract": {"p95_ms": 400.0}}}]}
+    slower = {"levels": [{"concurrency": 8, "jobs_per_sec": 80.0, "nodes": {"llm_extract": {"p95_ms": 500.0}}}]}
+
+    lines = pipeline.compare(slower, base)
+
+    assert len(lines) == 2 and all(line.endswith("REGRESSION") for line in lines)
+    assert pipeline.compare(base, base) == []
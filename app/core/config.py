@@ -1,7 +1,161 @@
 import os
+import tempfile
 
 PRIMARY_MODEL = os.getenv("PRIMARY_MODEL", "gpt-4o")
 FALLBACK_MODEL = os.getenv("FALLBACK_MODEL", "gpt-4o-mini")
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+
+# max jobs of one /normalize-job batch that run through the graph at the same time
+NORMALIZE_MAX_CONCURRENCY = int(os.getenv("NORMALIZE_MAX_CONCURRENCY", "16"))
+
+# LLM extraction cache (in-memory LRU + optional SQLite tier; empty path = memory only)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "job-normalizer", "llm_cache.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_MAX_DISK_ENTRIES = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "500000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# shared OpenAI HTTP connection pool (one per process, reused by every chain)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+# SDK-internal retries; 0 leaves 429 handling to the rate limiter, which can see and adapt to it
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+# drop and rebuild cached chains/clients when OpenAI env settings change at runtime
+LLM_REGISTRY_REBUILD_ON_ENV_CHANGE = os.getenv("LLM_REGISTRY_REBUILD_ON_ENV_CHANGE", "true").lower() in ("1", "true", "yes")
+
+# "prefix": static rules + vocab first so provider prompt caching applies; "legacy": original layout;
+# "prefilter": only the vocab entries a keyword scan of the job finds (+ a safety margin) are sent
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "prefix").lower()
+
+# empty fields of the primary result that are worth a second (partial) call on the fallback model;
+# salary and benefits are legitimately empty for many posts so they are off by default
+FALLBACK_FIELDS = tuple(
+    f.strip() for f in os.getenv(
+        "FALLBACK_FIELDS", "company_name,job_category,job_tags,job_type,job_region"
+    ).split(",") if f.strip()
+)
+
+# hedged requests: race the fallback model when the primary is slower than its recent p<HEDGE_PERCENTILE>
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "500"))
+HEDGE_INITIAL_DELAY_MS = float(os.getenv("HEDGE_INITIAL_DELAY_MS", "5000"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "32"))
+
+# rule-based fast path: "off", "shadow" (run rules, always call the LLM, record agreement)
+# or "on" (skip the LLM when rule confidence >= RULES_CONFIDENCE_THRESHOLD)
+RULES_MODE = os.getenv("RULES_MODE", "shadow").lower()
+RULES_CONFIDENCE_THRESHOLD = float(os.getenv("RULES_CONFIDENCE_THRESHOLD", "0.85"))
+# finished-but-unsent results a /normalize-job/stream response may buffer before workers pause
+STREAM_BUFFER_SIZE = int(os.getenv("STREAM_BUFFER_SIZE", "32"))
+
+# company website lookups: positive results for COMPANY_CACHE_TTL_SECONDS,
+# "not found" for the (shorter) negative TTL so new companies show up
+COMPANY_CACHE_MAX_ENTRIES = int(os.getenv("COMPANY_CACHE_MAX_ENTRIES", "20000"))
+COMPANY_CACHE_TTL_SECONDS = float(os.getenv("COMPANY_CACHE_TTL_SECONDS", str(24 * 3600)))
+COMPANY_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("COMPANY_CACHE_NEGATIVE_TTL_SECONDS", "3600"))
+
+# optional in-process copy of the companies table (exact + trigram fuzzy match)
+COMPANY_INDEX_ENABLED = os.getenv("COMPANY_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+COMPANY_INDEX_MIN_SCORE = float(os.getenv("COMPANY_INDEX_MIN_SCORE", "0.6"))
+COMPANY_INDEX_REFRESH_SECONDS = float(os.getenv("COMPANY_INDEX_REFRESH_SECONDS", "300"))
+COMPANY_INDEX_CURSOR_COLUMN = os.getenv("COMPANY_INDEX_CURSOR_COLUMN", "updated_at")
+COMPANY_INDEX_PAGE_SIZE = int(os.getenv("COMPANY_INDEX_PAGE_SIZE", "1000"))
+# incremental refreshes never see deleted rows: reload the whole table this often (0 = never)
+COMPANY_INDEX_REBUILD_SECONDS = float(os.getenv("COMPANY_INDEX_REBUILD_SECONDS", str(6 * 3600)))
+
+# async PostgREST access (enrichment path): pool size, per-call timeout, requests in flight
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_CONCURRENCY = int(os.getenv("SUPABASE_MAX_CONCURRENCY", "10"))
+
+# description compaction before extraction: boilerplate/duplicate removal always,
+# relevance-ranked trimming above the budget (estimated tokens; <= 0 disables trimming).
+# Off by default: it changes what the model sees; when enabling it, sample agreement below.
+COMPACT_ENABLED = os.getenv("COMPACT_ENABLED", "false").lower() in ("1", "true", "yes")
+COMPACT_TOKEN_BUDGET = int(os.getenv("COMPACT_TOKEN_BUDGET", "1500"))
+# share of compacted jobs re-extracted from the full description to measure agreement
+COMPACT_AGREEMENT_SAMPLE_RATE = float(os.getenv("COMPACT_AGREEMENT_SAMPLE_RATE", "0"))
+
+# near-duplicate reuse: SimHash over title + description; posts within
+# NEAR_DUP_MAX_DISTANCE bits (of 64) with the same company/salary hints reuse
+# the stored extraction. Off by default; empty NEAR_DUP_PATH keeps it in memory.
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "false").lower() in ("1", "true", "yes")
+NEAR_DUP_PATH = os.getenv("NEAR_DUP_PATH", os.path.join(tempfile.gettempdir(), "job-normalizer", "near_dup.sqlite3"))
+NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "5"))
+NEAR_DUP_MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "2000000"))
+NEAR_DUP_TTL_SECONDS = float(os.getenv("NEAR_DUP_TTL_SECONDS", str(30 * 24 * 3600)))
+# descriptions shorter than this (words) fingerprint too loosely to be trusted
+NEAR_DUP_MIN_WORDS = int(os.getenv("NEAR_DUP_MIN_WORDS", "40"))
+
+# submit/poll API (/jobs): durable SQLite queue + in-process worker pool.
+# Off unless JOB_QUEUE_PATH is set; point it at persistent storage that every
+# replica serving /jobs shares (a batch can only be polled where it is stored,
+# and a container-local file is lost on restart). JOB_WORKERS is opt-in: only
+# processes that should drain the queue set it, and startup refuses to run
+# workers without JOB_QUEUE_PATH.
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "0"))
+# a leased job not finished within this long is handed to another worker
+JOB_VISIBILITY_TIMEOUT_SECONDS = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "0.5"))
+
+# token cost accounting: JSON overrides/additions to the built-in price table,
+# USD per 1M tokens, e.g. {"gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.6}}
+LLM_PRICES = os.getenv("LLM_PRICES", "")
+# Batch API calls are billed at this fraction of the online price
+BATCH_PRICE_FACTOR = float(os.getenv("BATCH_PRICE_FACTOR", "0.5"))
+# per-job usage in response bodies (the X-LLM-* headers and batch rollups are always there)
+LLM_USAGE_IN_RESPONSE = os.getenv("LLM_USAGE_IN_RESPONSE", "false").lower() in ("1", "true", "yes")
+
+# packed extraction for /normalize-job batches: short posts (<= PACK_MAX_ITEM_TOKENS of payload)
+# share one model call, filled up to PACK_TOKEN_BUDGET (payload + expected output tokens)
+PACK_ENABLED = os.getenv("PACK_ENABLED", "false").lower() in ("1", "true", "yes")
+PACK_TOKEN_BUDGET = int(os.getenv("PACK_TOKEN_BUDGET", "6000"))
+PACK_MAX_ITEMS = int(os.getenv("PACK_MAX_ITEMS", "8"))
+PACK_MAX_ITEM_TOKENS = int(os.getenv("PACK_MAX_ITEM_TOKENS", "600"))
+PACK_OUTPUT_TOKENS_PER_ITEM = int(os.getenv("PACK_OUTPUT_TOKENS_PER_ITEM", "120"))
+
+# client-side OpenAI limits per model: RPM/TPM token buckets (0 = not enforced), an AIMD
+# concurrency limit (halved on 429s, up to LLM_MAX_CONCURRENCY) and in-place 429 retries.
+# LLM_RATE_LIMITS overrides per model, e.g. {"gpt-4o": {"rpm": 500, "tpm": 30000, "max_concurrency": 16}}
+LLM_RPM = float(os.getenv("LLM_RPM", "0"))
+LLM_TPM = float(os.getenv("LLM_TPM", "0"))
+LLM_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS", "")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_RATE_MAX_RETRIES = int(os.getenv("LLM_RATE_MAX_RETRIES", "5"))
+LLM_RATE_MAX_WAIT_SECONDS = float(os.getenv("LLM_RATE_MAX_WAIT_SECONDS", "120"))
+# completion tokens reserved per call before the real usage is known
+LLM_OUTPUT_TOKENS_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKENS_ESTIMATE", "200"))
+
+# per-model circuit breaker: LLM_BREAKER_FAILURES consecutive failed calls open it; after
+# LLM_BREAKER_OPEN_SECONDS up to LLM_BREAKER_HALF_OPEN_PROBES trial calls go through and
+# it closes once they all succeed. An open primary goes straight to the fallback model,
+# an open fallback to the empty result.
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+LLM_BREAKER_HALF_OPEN_PROBES = int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", "1"))
+# extraction calls one job may make in total (retries, fallback and gap fill included);
+# a failed call is retried LLM_CALL_RETRIES times, backing off from LLM_RETRY_BASE_SECONDS
+LLM_CALL_BUDGET = int(os.getenv("LLM_CALL_BUDGET", "3"))
+LLM_CALL_RETRIES = int(os.getenv("LLM_CALL_RETRIES", "1"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+
+# startup warm-up (see app.normalizer.warmup): compile the graphs and build the model and
+# Supabase clients before /readyz reports ready; WARMUP_PRIME_CACHES also opens the
+# extraction cache and near-duplicate index
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_PRIME_CACHES = os.getenv("WARMUP_PRIME_CACHES", "true").lower() in ("1", "true", "yes")
+
+# controlled vocabularies: optional JSON file replacing built-in lists / adding aliases
+# (see app.normalizer.vocab.registry); re-read when it changes, checked every VOCAB_RELOAD_SECONDS
+VOCAB_PATH = os.getenv("VOCAB_PATH", "")
+VOCAB_RELOAD_SECONDS = float(os.getenv("VOCAB_RELOAD_SECONDS", "30"))
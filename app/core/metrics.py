@@ -0,0 +1,196 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus text exposition (format 0.0.4), so /metrics needs no extra
+# dependency. Every update is a dict lookup plus a few adds under one lock.
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(l, "")) for l in self.labels)
+
+    def _label_str(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labels, key)) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{self._label_str(k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[i] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        lines = self._header()
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                lines.append(f"{self.name}_bucket{self._label_str(key, ('le', _fmt(bound)))} {running}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {running}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+NODE_SECONDS = registry.register(Histogram(
+    "job_normalizer_node_duration_seconds", "Time spent in each graph node.", ("node",),
+))
+NODE_IN_FLIGHT = registry.register(Gauge(
+    "job_normalizer_node_in_flight", "Graph node executions currently running.", ("node",),
+))
+JOBS_IN_FLIGHT = registry.register(Gauge(
+    "job_normalizer_jobs_in_flight", "Job posts currently being normalized.",
+))
+JOBS_TOTAL = registry.register(Counter(
+    "job_normalizer_jobs_total", "Job posts normalized, by outcome.", ("status",),
+))
+LLM_CALLS = registry.register(Counter(
+    "job_normalizer_llm_calls_total", "Structured-output model calls, by model and role.", ("model", "role"),
+))
+LLM_FALLBACKS = registry.register(Counter(
+    "job_normalizer_llm_fallback_total",
+    "Fallback model invocations: full (primary failed or lost a hedge) or gap_fill.", ("kind",),
+))
+LLM_RETRIES = registry.register(Counter(
+    "job_normalizer_llm_retries_total", "Retries of a failed extraction call, within the job's call budget.", ("node",),
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    "job_normalizer_cache_lookups_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result"),
+))
+SUPABASE_QUERIES = registry.register(Counter(
+    "job_normalizer_supabase_queries_total", "Queries sent to the companies table.", ("query", "client"),
+))
+LLM_TOKENS = registry.register(Counter(
+    "job_normalizer_llm_tokens_total", "Model tokens by model and kind (prompt/cached/completion).", ("model", "kind"),
+))
+LLM_COST = registry.register(Counter(
+    "job_normalizer_llm_cost_usd_total", "Estimated model spend in USD from the configured price table.", ("model",),
+))
+LLM_CONCURRENCY_LIMIT = registry.register(Gauge(
+    "job_normalizer_llm_concurrency_limit", "Current AIMD concurrency limit per model.", ("model",),
+))
+LLM_QUEUE_DEPTH = registry.register(Gauge(
+    "job_normalizer_llm_queue_depth", "Calls waiting for the per-model rate limiter.", ("model",),
+))
+LLM_THROTTLES = registry.register(Counter(
+    "job_normalizer_llm_throttled_total",
+    "Calls that had to wait, by model and first reason (429/rpm/tpm/concurrency/queue).", ("model", "reason"),
+))
+LLM_BREAKER_STATE = registry.register(Gauge(
+    "job_normalizer_llm_breaker_state", "Circuit breaker per model: 0 closed, 1 half-open, 2 open.", ("model",),
+))
+LLM_BREAKER_OPENS = registry.register(Counter(
+    "job_normalizer_llm_breaker_opens_total", "Times a model's circuit breaker opened.", ("model",),
+))
+LLM_SKIPPED = registry.register(Counter(
+    "job_normalizer_llm_calls_skipped_total",
+    "Extraction calls not made, by model and reason (breaker_open/budget).", ("model", "reason"),
+))
+STARTUP_PHASE_SECONDS = registry.register(Gauge(
+    "job_normalizer_startup_phase_seconds", "Time each startup warm-up phase took.", ("phase",),
+))
+READY = registry.register(Gauge(
+    "job_normalizer_ready", "1 once the startup warm-up finished, else 0.",
+))
+VOCAB_RELOADS = registry.register(Counter(
+    "job_normalizer_vocab_reloads_total", "Vocabulary file reloads, by result (ok/error).", ("result",),
+))
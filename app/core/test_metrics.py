@@ -0,0 +1,27 @@
+from app.core.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_text_exposition():
+    registry = Registry()
+    calls = registry.register(Counter("x_calls_total", "Calls.", ("model",)))
+    in_flight = registry.register(Gauge("x_in_flight", "In flight."))
+    seconds = registry.register(Histogram("x_seconds", "Latency.", ("node",), buckets=(0.1, 1.0)))
+
+    calls.inc(model='gpt "4o"')
+    calls.inc(2, model='gpt "4o"')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    for v in (0.05, 0.5, 5.0):
+        seconds.observe(v, node="llm_extract")
+
+    text = registry.render()
+    assert '# TYPE x_calls_total counter' in text
+    assert 'x_calls_total{model="gpt \\"4o\\""} 3' in text
+    assert "x_in_flight 1" in text
+    assert 'x_seconds_bucket{node="llm_extract",le="0.1"} 1' in text
+    assert 'x_seconds_bucket{node="llm_extract",le="1"} 2' in text
+    assert 'x_seconds_bucket{node="llm_extract",le="+Inf"} 3' in text
+    assert 'x_seconds_sum{node="llm_extract"} 5.55' in text
+    assert 'x_seconds_count{node="llm_extract"} 3' in text
+    assert seconds.count(node="llm_extract") == 3
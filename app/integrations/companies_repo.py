@@ -1,29 +1,205 @@
-from app.integrations.supabase_client import supabase
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-def fetch_company_website(company_name: str) -> str:
-    if not company_name:
-        return ""
+from app.core.cache import TTLCache
+from app.core.config import (
+    COMPANY_CACHE_MAX_ENTRIES, COMPANY_CACHE_TTL_SECONDS, COMPANY_CACHE_NEGATIVE_TTL_SECONDS,
+)
+from app.core.metrics import CACHE_LOOKUPS, SUPABASE_QUERIES
+from app.integrations.postgrest import get_postgrest, in_filter
 
-    # exact match
+log = logging.getLogger("job-normalizer")
+
+# names per `in_` query, keeps the PostgREST URL short
+_IN_CHUNK = 100
+
+_found = TTLCache(COMPANY_CACHE_MAX_ENTRIES, COMPANY_CACHE_TTL_SECONDS)
+_not_found = TTLCache(COMPANY_CACHE_MAX_ENTRIES, COMPANY_CACHE_NEGATIVE_TTL_SECONDS)
+
+def _table(query: str):
+    from app.integrations.supabase_client import get_supabase
+
+    SUPABASE_QUERIES.inc(query=query, client="sync")
+    return get_supabase().table("companies")
+
+def _cached(company_name: str):
+    """
+    Cached website, "" for a cached miss, None if we don't know yet.
+    """
+    website = _found.get(company_name)
+    if website is None and _not_found.get(company_name):
+        website = ""
+    CACHE_LOOKUPS.inc(cache="company_website", result="miss" if website is None else "hit")
+    return website
+
+def _remember(company_name: str, website: str) -> None:
+    if website:
+        _found.set(company_name, website)
+        _not_found.pop(company_name)
+    else:
+        _not_found.set(company_name, True)
+
+def _split_cached(company_names: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+    names = list(dict.fromkeys(n for n in company_names if n))
+    out: Dict[str, str] = {}
+    misses: List[str] = []
+    for name in names:
+        cached = _cached(name)
+        if cached is None:
+            misses.append(name)
+        else:
+            out[name] = cached
+    return out, misses
+
+def _collect_websites(rows: Optional[List[Dict[str, Any]]], into: Dict[str, str]) -> None:
+    for row in rows or []:
+        if row.get("company_website") and row.get("company_name") not in into:
+            into[row["company_name"]] = row["company_website"]
+
+def _ilike_website(company_name: str) -> str:
+    # partial / ilike match fallback
     res = (
-        supabase.table("companies")
-        .select("company_website")
-        .eq("company_name", company_name)
+        _table("ilike")
+        .select("company_website, company_name")
+        .ilike("company_name", f"%{company_name}%")
         .limit(1)
         .execute()
     )
     if res.data and res.data[0].get("company_website"):
         return res.data[0]["company_website"]
+    return ""
 
-    # partial / ilike match fallback
+def _lookup_website(company_name: str) -> str:
+    # exact match
     res = (
-        supabase.table("companies")
-        .select("company_website, company_name")
-        .ilike("company_name", f"%{company_name}%")
+        _table("exact")
+        .select("company_website")
+        .eq("company_name", company_name)
         .limit(1)
         .execute()
     )
     if res.data and res.data[0].get("company_website"):
         return res.data[0]["company_website"]
 
+    return _ilike_website(company_name)
+
+def fetch_company_website(company_name: str) -> str:
+    if not company_name:
+        return ""
+
+    cached = _cached(company_name)
+    if cached is not None:
+        return cached
+
+    website = _lookup_website(company_name)
+    _remember(company_name, website)
+    return website
+
+def fetch_company_websites(company_names: Iterable[str]) -> Dict[str, str]:
+    """
+    Resolve many names at once: cache first, then one `in_` query per chunk of
+    misses, then the ilike fallback only for names that still have no website.
+    Every answer (including "not found") is cached.
+    """
+    out, misses = _split_cached(company_names)
+
+    exact: Dict[str, str] = {}
+    for i in range(0, len(misses), _IN_CHUNK):
+        res = (
+            _table("bulk")
+            .select("company_name, company_website")
+            .in_("company_name", misses[i:i + _IN_CHUNK])
+            .execute()
+        )
+        _collect_websites(res.data, exact)
+
+    for name in misses:
+        website = exact.get(name) or _ilike_website(name)
+        _remember(name, website)
+        out[name] = website
+    return out
+
+def prefetch_company_websites(company_names: Iterable[str]) -> None:
+    """
+    Warm the website cache for a batch; failures only cost the per-job lookups later.
+    """
+    try:
+        fetch_company_websites(company_names)
+    except Exception as e:
+        log.warning("Company website prefetch failed: %s", e)
+
+# async path: same caches, PostgREST over a pooled httpx client
+
+async def _aselect(query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    SUPABASE_QUERIES.inc(query=query, client="async")
+    return await get_postgrest().select("companies", params)
+
+async def _ailike_website(company_name: str) -> str:
+    rows = await _aselect("ilike", {
+        "select": "company_website,company_name",
+        "company_name": f"ilike.*{company_name}*",
+        "limit": 1,
+    })
+    if rows and rows[0].get("company_website"):
+        return rows[0]["company_website"]
     return ""
+
+async def _alookup_website(company_name: str) -> str:
+    rows = await _aselect("exact", {
+        "select": "company_website",
+        "company_name": f"eq.{company_name}",
+        "limit": 1,
+    })
+    if rows and rows[0].get("company_website"):
+        return rows[0]["company_website"]
+
+    return await _ailike_website(company_name)
+
+async def afetch_company_website(company_name: str) -> str:
+    if not company_name:
+        return ""
+
+    cached = _cached(company_name)
+    if cached is not None:
+        return cached
+
+    website = await _alookup_website(company_name)
+    _remember(company_name, website)
+    return website
+
+async def afetch_company_websites(company_names: Iterable[str]) -> Dict[str, str]:
+    """
+    Async fetch_company_websites; chunks and ilike fallbacks run concurrently
+    (bounded by the PostgREST client's semaphore).
+    """
+    out, misses = _split_cached(company_names)
+
+    exact: Dict[str, str] = {}
+    chunks = await asyncio.gather(*(
+        _aselect("bulk", {
+            "select": "company_name,company_website",
+            "company_name": in_filter(misses[i:i + _IN_CHUNK]),
+        })
+        for i in range(0, len(misses), _IN_CHUNK)
+    ))
+    for rows in chunks:
+        _collect_websites(rows, exact)
+
+    leftover = [n for n in misses if n not in exact]
+    for name, website in zip(leftover, await asyncio.gather(*(_ailike_website(n) for n in leftover))):
+        exact[name] = website
+
+    for name in misses:
+        _remember(name, exact[name])
+        out[name] = exact[name]
+    return out
+
+async def aprefetch_company_websites(company_names: Iterable[str]) -> None:
+    try:
+        await afetch_company_websites(company_names)
+    except Exception as e:
+        log.warning("Company website prefetch failed: %s", e)
+
+def company_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"found": _found.stats(), "not_found": _not_found.stats()}
@@ -0,0 +1,275 @@
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.config import (
+    COMPANY_INDEX_ENABLED, COMPANY_INDEX_MIN_SCORE, COMPANY_INDEX_REFRESH_SECONDS,
+    COMPANY_INDEX_CURSOR_COLUMN, COMPANY_INDEX_PAGE_SIZE, COMPANY_INDEX_REBUILD_SECONDS,
+)
+from app.core.metrics import SUPABASE_QUERIES
+
+log = logging.getLogger("job-normalizer")
+
+# dropped from the end of names so "Acme Inc." and "ACME" land on the same key
+_LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co",
+    "company", "gmbh", "ag", "sa", "sas", "srl", "bv", "plc", "pty", "oy", "ab",
+}
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+# trigrams shared by more names than this don't help rank candidates
+_MAX_POSTING = 5000
+
+# (cursor column value, id) of the last row seen; rows sharing a timestamp are told apart by id
+Cursor = Tuple[Any, Any]
+
+# (cursor, page_size) -> rows with id, company_name, company_website and the cursor column,
+# ordered by (cursor column, id) and strictly after `cursor`
+PageSource = Callable[[Optional[Cursor], int], List[Dict[str, Any]]]
+
+
+class CompanyMatch(NamedTuple):
+    company_name: str
+    company_website: str
+    score: float
+
+
+def normalize_name(name: str) -> str:
+    n = unicodedata.normalize("NFKD", name or "")
+    n = "".join(c for c in n if not unicodedata.combining(c)).casefold()
+    n = n.replace("&", " and ")
+    words = _NON_WORD.sub(" ", n).split()
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def trigrams(norm: str) -> Set[str]:
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _supabase_page(cursor: Optional[Cursor], page_size: int) -> List[Dict[str, Any]]:
+    from app.integrations.supabase_client import get_supabase
+
+    SUPABASE_QUERIES.inc(query="index_page", client="sync")
+    col = COMPANY_INDEX_CURSOR_COLUMN
+    q = get_supabase().table("companies").select(f"id, company_name, company_website, {col}")
+    if cursor is not None:
+        at, last_id = cursor
+        # keyset on (col, id): a page boundary inside a run of equal timestamps loses nothing
+        q = q.or_(f'{col}.gt."{at}",and({col}.eq."{at}",id.gt.{last_id})')
+    res = q.order(col).order("id").limit(page_size).execute()
+    return res.data or []
+
+
+class CompanyIndex:
+    """
+    In-process copy of the `companies` table for website lookups.
+
+    Exact lookups go through a normalized-name map; everything else through a
+    trigram inverted index scored by Jaccard similarity. `refresh()` pulls only
+    rows whose (cursor column, id) moved past the last one seen; a renamed row
+    drops its old name. Deleted rows can't be seen that way, so every
+    `rebuild_seconds` the refresh reloads the whole table instead.
+    """
+
+    def __init__(
+        self,
+        source: Optional[PageSource] = None,
+        cursor_column: str = COMPANY_INDEX_CURSOR_COLUMN,
+        page_size: int = COMPANY_INDEX_PAGE_SIZE,
+        rebuild_seconds: float = COMPANY_INDEX_REBUILD_SECONDS,
+    ):
+        self.source = source or _supabase_page
+        self.cursor_column = cursor_column
+        self.page_size = max(1, page_size)
+        self.rebuild_seconds = rebuild_seconds
+        self.cursor: Optional[Cursor] = None
+        self.loaded = False
+        self.built_at = 0.0
+        self.rebuilds = 0
+        self._by_norm: Dict[str, CompanyMatch] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        # row id -> the name it is indexed under, and back, so renames can be undone
+        self._norm_by_id: Dict[Hashable, str] = {}
+        self._ids_by_norm: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __len__(self) -> int:
+        return len(self._by_norm)
+
+    def _unlink_locked(self, row_id: Hashable) -> None:
+        norm = self._norm_by_id.pop(row_id, None)
+        if norm is None:
+            return
+        ids = self._ids_by_norm.get(norm)
+        if ids is not None:
+            ids.discard(row_id)
+            if ids:
+                return
+            del self._ids_by_norm[norm]
+        self._by_norm.pop(norm, None)
+        self._gram_counts.pop(norm, None)
+        for g in trigrams(norm):
+            posting = self._grams.get(g)
+            if posting is not None:
+                posting.discard(norm)
+                if not posting:
+                    del self._grams[g]
+
+    def upsert(self, rows: Iterable[Dict[str, Any]]) -> int:
+        n = 0
+        with self._lock:
+            for row in rows:
+                name = (row.get("company_name") or "").strip()
+                website = (row.get("company_website") or "").strip()
+                norm = normalize_name(name)
+                # rows without an id can't be renamed, only overwritten under their name
+                row_id = row.get("id", norm)
+                if not norm or not website or self._norm_by_id.get(row_id) != norm:
+                    self._unlink_locked(row_id)
+                if not norm or not website:
+                    continue
+                if norm not in self._by_norm:
+                    grams = trigrams(norm)
+                    self._gram_counts[norm] = len(grams)
+                    for g in grams:
+                        self._grams.setdefault(g, set()).add(norm)
+                self._by_norm[norm] = CompanyMatch(name, website, 1.0)
+                self._norm_by_id[row_id] = norm
+                self._ids_by_norm.setdefault(norm, set()).add(row_id)
+                n += 1
+        return n
+
+    def _pull(self) -> int:
+        total = 0
+        while True:
+            rows = self.source(self.cursor, self.page_size)
+            if not rows:
+                break
+            total += self.upsert(rows)
+            tail = rows[-1]
+            last = (tail.get(self.cursor_column), tail.get("id"))
+            if last[0] is None or last == self.cursor:
+                break
+            self.cursor = last
+            if len(rows) < self.page_size:
+                break
+        return total
+
+    def refresh(self) -> int:
+        """
+        Pull rows changed since the last refresh (everything on the first call),
+        or rebuild from scratch when the last full load is `rebuild_seconds` old.
+        """
+        if self.loaded and self.rebuild_seconds > 0 and time.monotonic() - self.built_at >= self.rebuild_seconds:
+            return self.rebuild()
+        first = not self.loaded
+        total = self._pull()
+        if first:
+            self.built_at = time.monotonic()
+        self.loaded = True
+        return total
+
+    def rebuild(self) -> int:
+        """
+        Load the whole table into a fresh index and swap it in, dropping deleted rows.
+        Lookups keep using the old one until the swap.
+        """
+        fresh = CompanyIndex(self.source, self.cursor_column, self.page_size, rebuild_seconds=0)
+        total = fresh._pull()
+        with self._lock:
+            self._by_norm = fresh._by_norm
+            self._grams = fresh._grams
+            self._gram_counts = fresh._gram_counts
+            self._norm_by_id = fresh._norm_by_id
+            self._ids_by_norm = fresh._ids_by_norm
+            self.cursor = fresh.cursor
+            self.built_at = time.monotonic()
+            self.loaded = True
+            self.rebuilds += 1
+        return total
+
+    def lookup(self, name: str, min_score: float = COMPANY_INDEX_MIN_SCORE) -> Optional[CompanyMatch]:
+        norm = normalize_name(name)
+        if not norm:
+            return None
+        with self._lock:
+            exact = self._by_norm.get(norm)
+            if exact is not None:
+                return exact
+
+            grams = trigrams(norm)
+            overlap: Counter = Counter()
+            for g in grams:
+                posting = self._grams.get(g)
+                if posting and len(posting) <= _MAX_POSTING:
+                    overlap.update(posting)
+
+            best, best_score = None, 0.0
+            for cand, shared in overlap.items():
+                score = shared / (len(grams) + self._gram_counts[cand] - shared)
+                # ties go to the shorter name
+                if score >= min_score and (
+                    score > best_score or (score == best_score and len(cand) < len(best))
+                ):
+                    best, best_score = cand, score
+            if best is None:
+                return None
+            hit = self._by_norm[best]
+            return CompanyMatch(hit.company_name, hit.company_website, round(best_score, 4))
+
+    def start_refresh(self, interval: float = COMPANY_INDEX_REFRESH_SECONDS) -> None:
+        """
+        Load now, then refresh incrementally every `interval` seconds on a daemon timer.
+        """
+        def tick() -> None:
+            try:
+                added = self.refresh()
+                if added:
+                    log.info("Company index refreshed: %d rows, %d companies", added, len(self))
+            except Exception as e:
+                log.warning("Company index refresh failed: %s", e)
+            if interval > 0:
+                self._timer = threading.Timer(interval, tick)
+                self._timer.daemon = True
+                self._timer.start()
+
+        tick()
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "loaded": self.loaded,
+            "companies": len(self),
+            "trigrams": len(self._grams),
+            "cursor": self.cursor,
+            "rebuilds": self.rebuilds,
+        }
+
+
+_index: Optional[CompanyIndex] = None
+
+
+def get_company_index() -> Optional[CompanyIndex]:
+    """
+    Shared index, or None when COMPANY_INDEX_ENABLED is off.
+    """
+    global _index
+    if not COMPANY_INDEX_ENABLED:
+        return None
+    if _index is None:
+        _index = CompanyIndex()
+    return _index
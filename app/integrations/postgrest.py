@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from app.core.config import (
+    SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY,
+    SUPABASE_TIMEOUT, SUPABASE_MAX_CONNECTIONS, SUPABASE_MAX_CONCURRENCY,
+)
+
+
+def in_filter(values: Iterable[str]) -> str:
+    """
+    PostgREST `in.(...)` operand with every value double-quoted.
+    """
+    quoted = ('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values)
+    return "in.(" + ",".join(quoted) + ")"
+
+
+class AsyncPostgrest:
+    """
+    Minimal async client for the Supabase REST endpoint.
+
+    One pooled httpx.AsyncClient per event loop, a per-call timeout and a
+    semaphore bounding how many requests are in flight. Nothing is created
+    (or validated) until the first query.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        key: Optional[str] = None,
+        timeout: float = SUPABASE_TIMEOUT,
+        max_connections: int = SUPABASE_MAX_CONNECTIONS,
+        max_concurrency: int = SUPABASE_MAX_CONCURRENCY,
+    ):
+        self.url = url
+        self.key = key
+        self.timeout = timeout
+        self.max_connections = max(1, max_connections)
+        self.max_concurrency = max(1, max_concurrency)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+
+    def _ensure(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return
+        url = self.url or SUPABASE_URL
+        key = self.key or SUPABASE_SERVICE_ROLE_KEY
+        if not url or not key:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        self._client = httpx.AsyncClient(
+            base_url=url.rstrip("/") + "/rest/v1",
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=self.max_connections),
+        )
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        self._loop = loop
+
+    async def select(self, table: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self._ensure()
+        async with self._sem:
+            res = await self._client.get(f"/{table}", params=params)
+        res.raise_for_status()
+        return res.json()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_postgrest: Optional[AsyncPostgrest] = None
+_lock = threading.Lock()
+
+
+def get_postgrest() -> AsyncPostgrest:
+    global _postgrest
+    if _postgrest is None:
+        with _lock:
+            if _postgrest is None:
+                _postgrest = AsyncPostgrest()
+    return _postgrest
@@ -1,4 +1,25 @@
+import threading
+from typing import Optional
+
 from supabase import create_client, Client
 from app.core.config import SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+_client: Optional[Client] = None
+_lock = threading.Lock()
+
+def get_supabase() -> Client:
+    """
+    Shared sync client, created on first use so importing the app needs no credentials.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return _client
+
+def __getattr__(name: str):
+    # keeps `from app.integrations.supabase_client import supabase` working
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(name)
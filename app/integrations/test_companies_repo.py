@@ -0,0 +1,71 @@
+import app.integrations.companies_repo as repo
+
+ROWS = [
+    {"company_name": "Acme", "company_website": "https://acme.io"},
+    {"company_name": "Globex Corporation", "company_website": "https://globex.com"},
+]
+
+
+class FakeQuery:
+    def __init__(self, log):
+        self.log = log
+        self.filters = []
+
+    def select(self, _cols):
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(("eq", value))
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(("in", list(values)))
+        return self
+
+    def ilike(self, col, pattern):
+        self.filters.append(("ilike", pattern.strip("%").lower()))
+        return self
+
+    def limit(self, _n):
+        return self
+
+    def execute(self):
+        self.log.append(self.filters[0][0])
+        kind, value = self.filters[0]
+        if kind == "eq":
+            data = [r for r in ROWS if r["company_name"] == value]
+        elif kind == "in":
+            data = [r for r in ROWS if r["company_name"] in value]
+        else:
+            data = [r for r in ROWS if value in r["company_name"].lower()]
+        return type("Res", (), {"data": data})()
+
+
+def _fresh(monkeypatch):
+    log = []
+    monkeypatch.setattr(repo, "_table", lambda query: FakeQuery(log))
+    repo._found.clear()
+    repo._not_found.clear()
+    return log
+
+
+def test_single_lookup_caches_hits_and_misses(monkeypatch):
+    log = _fresh(monkeypatch)
+    assert repo.fetch_company_website("Acme") == "https://acme.io"
+    assert repo.fetch_company_website("Nobody") == ""
+    calls = len(log)
+    assert repo.fetch_company_website("Acme") == "https://acme.io"
+    assert repo.fetch_company_website("Nobody") == ""
+    assert len(log) == calls
+
+
+def test_bulk_uses_one_in_query_then_ilike_for_misses(monkeypatch):
+    log = _fresh(monkeypatch)
+    out = repo.fetch_company_websites(["Acme", "Globex", "Acme", "Nobody", ""])
+    assert out == {"Acme": "https://acme.io", "Globex": "https://globex.com", "Nobody": ""}
+    assert log == ["in", "ilike", "ilike"]
+
+    log.clear()
+    assert repo.fetch_company_website("Globex") == "https://globex.com"
+    assert repo.fetch_company_website("Nobody") == ""
+    assert log == []
@@ -0,0 +1,117 @@
+import json
+from pathlib import Path
+
+from app.integrations.company_index import CompanyIndex, normalize_name
+
+FIXTURE = Path(__file__).parent / "fixtures" / "companies.json"
+
+
+class FixtureTable:
+    """
+    Stands in for the `companies` table: rows ordered by (updated_at, id), paged after the cursor.
+    """
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.calls = 0
+
+    def __call__(self, cursor, page_size):
+        self.calls += 1
+        ordered = sorted(self.rows, key=lambda r: (r["updated_at"], r["id"]))
+        rows = [r for r in ordered if cursor is None or (r["updated_at"], r["id"]) > cursor]
+        return rows[:page_size]
+
+
+def _index(page_size=3, rebuild_seconds=0):
+    table = FixtureTable(json.loads(FIXTURE.read_text()))
+    index = CompanyIndex(source=table, page_size=page_size, rebuild_seconds=rebuild_seconds)
+    index.refresh()
+    return index, table
+
+
+def test_normalize_name():
+    assert normalize_name("Acme, Inc.") == "acme"
+    assert normalize_name("  GLOBEX Corporation ") == "globex"
+    assert normalize_name("Société Générale") == "societe generale"
+    assert normalize_name("Stark & Wayne") == "stark and wayne"
+    assert normalize_name("Inc") == "inc"
+
+
+def test_full_load_pages_through_table():
+    index, table = _index(page_size=3)
+    assert index.loaded
+    assert len(index) == 6  # Hooli has no website
+    assert table.calls == 3
+    assert index.cursor == ("2026-01-07T00:00:00Z", 7)
+
+
+def test_exact_and_fuzzy_lookup():
+    index, _ = _index()
+    assert index.lookup("ACME") == ("Acme Inc.", "https://acme.io", 1.0)
+    assert index.lookup("Societe Generale").company_website == "https://societegenerale.com"
+
+    fuzzy = index.lookup("Umbrela Labs")
+    assert fuzzy.company_website == "https://umbrella-labs.dev"
+    assert 0.6 <= fuzzy.score < 1.0
+
+    assert index.lookup("Hooli") is None
+    assert index.lookup("Totally Unrelated") is None
+    assert index.lookup("") is None
+
+
+def test_incremental_refresh_only_reads_new_rows():
+    index, table = _index(page_size=10)
+    table.rows.append({
+        "id": 2, "company_name": "Globex Corporation",
+        "company_website": "https://globex.example", "updated_at": "2026-02-01T00:00:00Z",
+    })
+    table.rows.append({
+        "id": 8, "company_name": "Vandelay Industries",
+        "company_website": "https://vandelay.example", "updated_at": "2026-02-02T00:00:00Z",
+    })
+    assert index.refresh() == 2
+    assert index.lookup("Globex").company_website == "https://globex.example"
+    assert index.lookup("Vandelay Industries").score == 1.0
+    assert index.refresh() == 0
+
+
+def test_page_boundary_inside_equal_timestamps_loses_no_rows():
+    same = "2026-03-01T00:00:00Z"
+    table = FixtureTable([
+        {"id": i, "company_name": f"Company {i}", "company_website": f"https://c{i}.example", "updated_at": same}
+        for i in range(1, 8)
+    ])
+    index = CompanyIndex(source=table, page_size=3, rebuild_seconds=0)
+    assert index.refresh() == 7
+    assert len(index) == 7
+    assert index.cursor == (same, 7)
+
+
+def test_rename_drops_old_name():
+    index, table = _index(page_size=10)
+    table.rows.append({
+        "id": 3, "company_name": "Initrode",
+        "company_website": "https://initrode.example", "updated_at": "2026-02-01T00:00:00Z",
+    })
+    table.rows.append({
+        "id": 4, "company_name": "Umbrella Labs",
+        "company_website": "", "updated_at": "2026-02-02T00:00:00Z",
+    })
+    index.refresh()
+    assert index.lookup("Initrode").company_website == "https://initrode.example"
+    assert index.lookup("Initech") is None
+    assert index.lookup("Umbrella Labs") is None
+    assert len(index) == 5
+
+
+def test_rebuild_drops_deleted_rows():
+    index, table = _index(page_size=10, rebuild_seconds=3600)
+    table.rows = [r for r in table.rows if r["id"] != 1]
+    index.refresh()
+    assert index.lookup("Acme") is not None  # incremental refresh can't see the delete
+
+    index.built_at -= 3600
+    assert index.refresh() == 5
+    assert index.lookup("Acme") is None
+    assert index.rebuilds == 1
+    assert index.cursor == ("2026-01-07T00:00:00Z", 7)
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import app.integrations.companies_repo as repo
+from app.integrations.postgrest import AsyncPostgrest, in_filter
+
+ROWS = json.loads((Path(__file__).parent / "fixtures" / "companies.json").read_text())
+
+
+def _match(op_value, name):
+    op, _, value = op_value.partition(".")
+    if op == "eq":
+        return name == value
+    if op == "ilike":
+        return value.strip("*%").lower() in name.lower()
+    if op == "in":
+        values = re.findall(r'"((?:[^"\\]|\\.)*)"', value)
+        return name in [v.replace('\\"', '"').replace("\\\\", "\\") for v in values]
+    raise ValueError(op)
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """
+    Just enough PostgREST: GET /rest/v1/companies with eq/ilike/in on company_name.
+    """
+
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        StandIn.requests.append((url.path, q))
+        if self.headers.get("apikey") != "test-key" or url.path != "/rest/v1/companies":
+            self.send_response(401)
+            self.end_headers()
+            return
+        rows = [r for r in ROWS if _match(q["company_name"], r["company_name"])]
+        rows = rows[: int(q.get("limit", len(rows)))]
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def postgrest(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = AsyncPostgrest(url=f"http://127.0.0.1:{server.server_port}", key="test-key", timeout=5)
+    monkeypatch.setattr(repo, "get_postgrest", lambda: client)
+    repo._found.clear()
+    repo._not_found.clear()
+    StandIn.requests = []
+    yield client
+    server.shutdown()
+    server.server_close()
+
+
+def test_in_filter_quotes_values():
+    assert in_filter(['Acme', 'Say "hi"', "a,b"]) == 'in.("Acme","Say \\"hi\\"","a,b")'
+
+
+def test_async_single_lookup(postgrest):
+    async def run():
+        exact = await repo.afetch_company_website("Initech")
+        partial = await repo.afetch_company_website("Globex")
+        missing = await repo.afetch_company_website("Nobody")
+        again = await repo.afetch_company_website("Globex")
+        await postgrest.aclose()
+        return exact, partial, missing, again
+
+    assert asyncio.run(run()) == ("https://initech.example", "https://globex.com", "", "https://globex.com")
+    ops = [q["company_name"].split(".")[0] for _, q in StandIn.requests]
+    assert ops == ["eq", "eq", "ilike", "eq", "ilike"]
+
+
+def test_async_bulk_lookup(postgrest):
+    async def run():
+        out = await repo.afetch_company_websites(["Initech", "Acme", "Umbrella Labs", "Nobody"])
+        await postgrest.aclose()
+        return out
+
+    assert asyncio.run(run()) == {
+        "Initech": "https://initech.example",
+        "Acme": "https://acme.io",
+        "Umbrella Labs": "https://umbrella-labs.dev",
+        "Nobody": "",
+    }
+    ops = sorted(q["company_name"].split(".")[0] for _, q in StandIn.requests)
+    assert ops == ["ilike", "ilike", "in"]
+
+
+def test_missing_credentials_fail_on_first_query_not_import(monkeypatch):
+    import app.integrations.postgrest as postgrest_mod
+
+    monkeypatch.setattr(postgrest_mod, "SUPABASE_URL", None)
+    client = AsyncPostgrest()
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.select("companies", {}))
@@ -1,61 +1,24 @@
 # app/langchain_logic.py
 import os
 import json
-from typing import List, Optional, Dict, Any, Iterable
+from typing import List, Optional, Dict, Any
 
 import backoff #type: ignore
-from bs4 import BeautifulSoup
 from langchain_core.prompts import ChatPromptTemplate #type: ignore
 from langchain_openai import ChatOpenAI #type: ignore
 from pydantic import BaseModel #type: ignore
 import re
 
+from app.normalizer.utils.text import strip_html
+from app.normalizer.utils.validation import validate_many, validate_one
+from app.normalizer.vocab.registry import get_vocab
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Controlled vocabularies (closed sets)
 # ──────────────────────────────────────────────────────────────────────────────
 
-JOB_CATEGORIES = [
-    "Admin & Operations","Customer Support","Data","Design","Engineering","Finance","Human Resources","IT","Legal","Marketing","Product","Sales","All Others"
-]
-
-
-JOB_TYPES = [
-    "full-time", "Part Time", "Internship", "Freelance", "Temporary",
-    "4 day week", "AI", "German", "Multilingual", "Bilingual",
-    "jobs in crypto", "web3", "high salary"
-]
-
-# Job Tags whitelist (as provided)
-JOB_TAGS_WHITELIST = [
-    ".NET","1-3 years","3-5 years","5+ years","agile","AI","Android","Angular","ASP.NET","Bash","BigQuery",
-    "Bilingual","Blockchain","C#","DevOps","SecOps","Django","docker","Drupal","Elixir","Entry Level","Flask",
-    "Flutter","Git","Go","Golang","GraphQL","High-Salary","iOS","Java","Javascript","jobs in crypto","jQuery",
-    "Machine Learning","MongoDB","MySQL","Next.js","Node","node.js","noSQL","PHP","PostgreSQL","Python","R",
-    "Rails","React","react native","Reactjs","Redux","Rust","Scala","Snowflake","Solidity","Spark","SQL",
-    "Swift","Tableau","Tailwind","Terraform","Typescript","Ubutu","vue","vue.js","web3","WordPress",
-    "work from anywhere ","Visa support","Relocation support","company off-sites","home-office budget",
-    "Fertility benefits","coworking budget","wellbeing allowance","professional development budget",
-    "mental health support","parental leave","Health insurance","Unlimited Time Off","Childcare support",
-    "Flexible Schedule","Equity","Kubernetes","Linux","Ruby","Ruby on Rails","high-salary"
-]
-
-# Job Benefits whitelist (as provided)
-BENEFITS_WHITELIST = [
-    "home-office budget","Fertility benefits","company retreats","4 day work week ",
-    "coworking budget","wellbeing allowance","professional development allowance",
-    "mental health support","parental leave","Health insurance","Unlimited Time Off",
-    "Childcare support","Flexible Schedule","Equity / Stocks","work from anywhere policy"
-]
-
-# Region whitelist (as provided)
-REGION_VALUES = [
-    "Worldwide","EMEA","Africa","Ghana","Kenya","Egypt","South Africa","Europe","Armenia","Austria","Belgium",
-    "Bulgaria","Croatia","Cyprus","Czechia","Denmark","Estonia","Finland","France","Germany","Greece","Hungary",
-    "Iceland","Ireland","Italy","Latvia","Lithuania","Luxembourg","Macedonia","Malta","Netherlands","Norway",
-    "Portugal","Poland","Romania","Serbia","Slovakia","Slovenia","Spain","Switzerland","Sweden","Turkey",
-    "Ukraine","UK","Georgia","UAE","India","LATAM","Argentina","Brazil","Colombia","AMER","Canada","US",
-    "Mexico","APAC","Singapore","Australia","Asia"
-]
+# The closed sets live in the vocab registry (app/normalizer/vocab/registry.py),
+# shared with the graph pipeline and reloaded from VOCAB_PATH when it changes.
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Prompt (ALL fields are extracted by the LLM)
@@ -106,38 +69,12 @@ def _model(model_name: Optional[str] = None):
     return ChatOpenAI(model=model_id, temperature=0).with_structured_output(JobOutputSchema)
 
 def build_prompt(job_json: str) -> Dict[str, Any]:
-    return {
-        "job_json": job_json,
-        "job_categories": JOB_CATEGORIES,
-        "job_types": JOB_TYPES,
-        "job_tags": JOB_TAGS_WHITELIST,
-        "benefits": BENEFITS_WHITELIST,
-        "regions": REGION_VALUES,
-    }
+    return {"job_json": job_json, **get_vocab().as_lists()}
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Utilities (no extraction heuristics; only formatting/validation)
 # ──────────────────────────────────────────────────────────────────────────────
 
-def strip_html(html: Optional[str]) -> str:
-    if not html:
-        return ""
-    return " ".join(BeautifulSoup(html, "html.parser").get_text().split()).strip()
-
-def _unique_keep_order(items: Iterable[str]) -> List[str]:
-    seen, out = set(), []
-    for x in items or []:
-        if x not in seen:
-            seen.add(x); out.append(x)
-    return out
-
-def _validate_one(value: str, allowed: List[str]) -> str:
-    return value if value in allowed else ""
-
-def _validate_many(values: Iterable[str], allowed: List[str]) -> List[str]:
-    allowed_set = set(allowed)
-    return [v for v in _unique_keep_order(values or []) if v in allowed_set]
-
 def _normalize_company_shape(name: str) -> str:
     n = (name or "").strip()
     if not n:
@@ -334,11 +271,12 @@ def extract_job_info(job_dict: dict) -> Dict[str, Any]:
     # ─────────────────────────────────────────────────────────────
     # Validate against closed sets (multi-region support)
     # ─────────────────────────────────────────────────────────────
-    job_category_final = _validate_one((result_merged.job_category or "").strip(), JOB_CATEGORIES)
-    benefits_final = _validate_many(_coerce_list(result_merged.benefits), BENEFITS_WHITELIST)
-    job_tags_final = _validate_many(_coerce_list(result_merged.job_tags), JOB_TAGS_WHITELIST)
-    job_type_final = _validate_many(_coerce_list(result_merged.job_type), JOB_TYPES)
-    job_region_final = _validate_many(_coerce_list(result_merged.job_region), REGION_VALUES)
+    vocab = get_vocab()
+    job_category_final = validate_one((result_merged.job_category or "").strip(), vocab["job_categories"])
+    benefits_final = validate_many(_coerce_list(result_merged.benefits), vocab["benefits"])
+    job_tags_final = validate_many(_coerce_list(result_merged.job_tags), vocab["job_tags"])
+    job_type_final = validate_many(_coerce_list(result_merged.job_type), vocab["job_types"])
+    job_region_final = validate_many(_coerce_list(result_merged.job_region), vocab["regions"])
 
     # ─────────────────────────────────────────────────────────────
     # Salary post-processing
@@ -1,9 +1,15 @@
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi import Request
 
 from app.api.routes import router
 from app.core.logging import setup_logging
+from app.core.config import JOB_WORKERS, JOB_POLL_INTERVAL_SECONDS, WARMUP_ENABLED, WARMUP_PRIME_CACHES
+from app.integrations.company_index import get_company_index
+from app.normalizer.job_queue import JobWorkerPool, get_job_queue
+from app.normalizer.warmup import default_phases, warmup
 
 # Initialize logging
 setup_logging()
@@ -13,14 +19,59 @@ app = FastAPI(title="Job Normalizer API", version="2.0-langgraph")
 # Routes
 app.include_router(router)
 
+@app.on_event("startup")
+def start_warmup():
+    if WARMUP_ENABLED:
+        warmup.start(default_phases(WARMUP_PRIME_CACHES))
+    else:
+        warmup.skip()
+
+@app.on_event("startup")
+def load_company_index():
+    index = get_company_index()
+    if index is not None:
+        index.start_refresh()
+
+@app.on_event("shutdown")
+def stop_company_index():
+    index = get_company_index()
+    if index is not None:
+        index.stop()
+
+# background workers for POST /jobs
+job_workers: Optional[JobWorkerPool] = None
+
+@app.on_event("startup")
+async def start_job_workers():
+    global job_workers
+    if JOB_WORKERS <= 0:
+        return
+    queue = get_job_queue()
+    if queue is None:
+        # a per-container default would strand batches on one replica and lose them on restart
+        raise RuntimeError("JOB_WORKERS is set but JOB_QUEUE_PATH is not; point it at shared, persistent storage")
+    job_workers = JobWorkerPool(queue, JOB_WORKERS, poll_interval=JOB_POLL_INTERVAL_SECONDS)
+    job_workers.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    if job_workers is not None:
+        await job_workers.stop()
+
 @app.get("/")
 def root():
     return {"message": "this is langgraph api"}
 
 @app.get("/healthz")
 def health_check():
+    # liveness only: the process is up, possibly still warming up
     return {"status": "ok"}
 
+@app.get("/readyz")
+def readiness_check():
+    status = warmup.status()
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=status)
+
 @app.exception_handler(Exception)
 async def catch_all_exception_handler(request: Request, exc: Exception):
     # last-resort safety
@@ -1,7 +1,135 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
 def normalize_job_post(job: dict) -> dict:
     """
     Public entrypoint used by FastAPI.
     """
     from .graph import job_graph
+    from app.core.metrics import JOBS_IN_FLIGHT, JOBS_TOTAL
+
+    JOBS_IN_FLIGHT.inc()
+    status = "error"
+    try:
+        result = job_graph.invoke({"job_dict": job})
+        status = "ok"
+        return result
+    finally:
+        JOBS_IN_FLIGHT.dec()
+        JOBS_TOTAL.inc(status=status)
+
+
+async def anormalize_job_post(job: dict) -> dict:
+    """
+    Async variant of normalize_job_post (LLM calls don't block the event loop).
+    """
+    from .graph import job_graph
+    from app.core.metrics import JOBS_IN_FLIGHT, JOBS_TOTAL
+
+    JOBS_IN_FLIGHT.inc()
+    status = "error"
+    try:
+        result = await job_graph.ainvoke({"job_dict": job})
+        status = "ok"
+        return result
+    finally:
+        JOBS_IN_FLIGHT.dec()
+        JOBS_TOTAL.inc(status=status)
+
+
+async def _prefetch_company_websites(jobs: List[dict]) -> None:
+    """
+    One bulk website query for the batch's provided company names, so the
+    per-job website_lookup nodes mostly hit the cache.
+    """
+    from app.integrations.companies_repo import aprefetch_company_websites
+    from app.normalizer.utils.company import normalize_company_shape
+
+    names = {
+        normalize_company_shape(job.get("company_name") or "")
+        for job in jobs
+        if not (job.get("company_website") or "").strip()
+    }
+    names.discard("")
+    if names:
+        await aprefetch_company_websites(sorted(names))
+
+
+async def anormalize_job_posts(
+    jobs: List[dict], max_concurrency: Optional[int] = None, pack: Optional[bool] = None
+) -> Tuple[List[dict], Dict[str, Any]]:
+    """
+    Run a whole batch through the graph concurrently, at most `max_concurrency`
+    jobs in flight. Results keep the input order.
+
+    Returns (results, stats) where stats holds the configured limit and the
+    peak number of jobs that were actually in flight together.
+
+    With `pack` (default PACK_ENABLED) short posts share model calls, see
+    app.normalizer.packing.
+    """
+    from app.core.config import NORMALIZE_MAX_CONCURRENCY, PACK_ENABLED
+
+    limit = max(1, max_concurrency or NORMALIZE_MAX_CONCURRENCY)
+    if PACK_ENABLED if pack is None else pack:
+        from .packing import apack_job_posts
+
+        await _prefetch_company_websites(jobs)
+        return await apack_job_posts(jobs, limit)
+
+    sem = asyncio.Semaphore(limit)
+    in_flight = 0
+    peak = 0
+
+    async def run_one(job: dict) -> dict:
+        nonlocal in_flight, peak
+        async with sem:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await anormalize_job_post(job)
+            finally:
+                in_flight -= 1
+
+    await _prefetch_company_websites(jobs)
+    results = await asyncio.gather(*(run_one(job) for job in jobs))
+    return list(results), {"max_concurrency": limit, "peak_concurrency": peak}
+
+
+async def astream_job_posts(
+    jobs: List[dict],
+    max_concurrency: Optional[int] = None,
+    buffer_size: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[BaseException]]]:
+    """
+    Yield (input_index, result, error) as each job finishes, in completion order.
+
+    At most `max_concurrency` jobs run at once and at most `buffer_size`
+    finished results wait for the consumer; when the consumer is slow the
+    workers block on the full buffer instead of piling results up in memory.
+    Closing the iterator cancels the remaining work.
+    """
+    from app.core.config import NORMALIZE_MAX_CONCURRENCY, STREAM_BUFFER_SIZE
+
+    limit = max(1, max_concurrency or NORMALIZE_MAX_CONCURRENCY)
+    done: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer_size or STREAM_BUFFER_SIZE))
+    pending = iter(enumerate(jobs))
+
+    async def worker() -> None:
+        for idx, job in pending:
+            try:
+                item = (idx, await anormalize_job_post(job), None)
+            except Exception as e:
+                item = (idx, None, e)
+            await done.put(item)
 
-    return job_graph.invoke({"job_dict": job})
+    await _prefetch_company_websites(jobs)
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(limit, len(jobs)))]
+    try:
+        for _ in range(len(jobs)):
+            yield await done.get()
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
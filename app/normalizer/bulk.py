@@ -0,0 +1,392 @@
+"""
+Offline bulk normalization through the OpenAI Batch API.
+
+    preprocess (+ LLM cache lookup) → Batch API JSONL → submit → poll →
+    parse into JobOutputSchema → post_llm_graph (cache store, validate,
+    experience, website lookup, finalize)
+
+LocalBatchService is a file-based stand-in for the Batch API so the whole
+path runs offline (it answers with the rule engine unless given a responder).
+Its answers never reach the shared extraction cache or near-dup index.
+
+A batch request is one model call with no gap-fill, so its result is cached
+under a key that says so: the online path only reuses it when it is itself
+configured with that single model and no FALLBACK_FIELDS.
+
+    python -m app.normalizer.bulk jobs.jsonl out.jsonl [--local DIR]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.normalizer.llm.model import model_ids
+from app.normalizer.llm.prompt import prompt_inputs, prompt_messages
+from app.normalizer.llm.schema import JobOutputSchema
+from app.core.metrics import CACHE_LOOKUPS
+from app.normalizer.llm.cache import get_extraction_cache
+from app.normalizer.nodes.llm_cache import extraction_key, node_llm_cache_lookup
+from app.normalizer.nodes.near_dup import node_near_dup_lookup
+from app.normalizer.nodes.preprocess import node_preprocess
+from app.normalizer.state import JobState
+
+log = logging.getLogger("job-normalizer")
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch API statuses after which nothing changes any more
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def _to_openai_message(message: BaseMessage) -> Dict[str, str]:
+    return {"role": _ROLES.get(message.type, message.type), "content": message.content}
+
+
+def batch_request(custom_id: str, payload: Dict[str, Any], model_id: str) -> Dict[str, Any]:
+    """
+    One Batch API request line: the same prompt the online path sends, with
+    JobOutputSchema as the JSON-schema response format.
+    """
+    messages = ChatPromptTemplate.from_messages(prompt_messages()).invoke(prompt_inputs(payload)).to_messages()
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": model_id,
+            "temperature": 0,
+            "messages": [_to_openai_message(m) for m in messages],
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": "JobOutputSchema", "schema": JobOutputSchema.model_json_schema()},
+            },
+        },
+    }
+
+
+def _answered(state: JobState) -> bool:
+    return bool(state.get("llm_cache_hit") or state.get("near_dup_hit"))
+
+
+def _batch_cache_lookup(state: JobState, model_id: str) -> JobState:
+    """
+    An earlier bulk run's answer for this payload, cached under the batch key.
+    """
+    cache = get_extraction_cache()
+    key = extraction_key(state["payload"], [model_id], fallback_fields=[])
+    if cache is None or key == state.get("llm_cache_key"):
+        return state
+    cached = cache.get(key)
+    CACHE_LOOKUPS.inc(cache="llm_batch", result="miss" if cached is None else "hit")
+    if cached is None:
+        return state
+    return {
+        **state, "llm_cache_key": key, "llm_cache_hit": True,
+        "llm_primary": cached, "llm_fallback": None, "llm_merged": cached,
+    }
+
+
+def prepare(jobs: List[Dict[str, Any]], model_id: Optional[str] = None) -> Tuple[List[JobState], List[Dict[str, Any]]]:
+    """
+    Preprocess every job and build request lines for the ones neither the LLM
+    cache nor the near-duplicate index can answer. States keep input order; custom_id is the input index.
+    """
+    model_id = model_id or model_ids()[0]
+    states: List[JobState] = []
+    requests: List[Dict[str, Any]] = []
+    for idx, job in enumerate(jobs):
+        state = node_llm_cache_lookup(node_preprocess({"job_dict": job}))
+        if not state.get("llm_cache_hit"):
+            state = node_near_dup_lookup(state)
+        if not _answered(state):
+            state = _batch_cache_lookup(state, model_id)
+        states.append(state)
+        if not _answered(state):
+            requests.append(batch_request(str(idx), state["payload"], model_id))
+    return states, requests
+
+
+def write_jsonl(path: str, rows: Iterable[Dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def read_jsonl(text: str) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def parse_results(lines: Iterable[Dict[str, Any]]) -> Dict[str, Optional[JobOutputSchema]]:
+    """
+    Batch output lines → {custom_id: JobOutputSchema, or None if that request failed}.
+    """
+    out: Dict[str, Optional[JobOutputSchema]] = {}
+    for line in lines:
+        custom_id = line.get("custom_id")
+        response = line.get("response") or {}
+        result = None
+        if not line.get("error") and response.get("status_code") == 200:
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                result = JobOutputSchema.model_validate_json(content)
+            except (KeyError, IndexError, TypeError, ValueError):
+                log.warning("Unparseable batch result for %s", custom_id)
+        out[custom_id] = result
+    return out
+
+
+def parse_usage(lines: Iterable[Dict[str, Any]], model_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Batch output lines → {custom_id: llm_calls record} from each response's
+    `usage`, flagged `batch` so it is priced at the Batch API discount.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for line in lines:
+        body = (line.get("response") or {}).get("body") or {}
+        usage = body.get("usage")
+        if not usage:
+            continue
+        out[line.get("custom_id")] = {
+            "model": body.get("model") or model_id or "",
+            "role": "batch",
+            "prompt_tokens": usage.get("prompt_tokens") or 0,
+            "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0,
+            "completion_tokens": usage.get("completion_tokens") or 0,
+            "batch": True,
+        }
+    return out
+
+
+def finish(
+    states: List[JobState],
+    results: Dict[str, Optional[JobOutputSchema]],
+    calls: Optional[Dict[str, Dict[str, Any]]] = None,
+    model_id: Optional[str] = None,
+    store: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Attach batch results (and their usage records, see parse_usage) to their
+    states and run the rest of the graph. Jobs whose request failed continue
+    with an empty extraction, like the online path does when every model call fails.
+
+    Batch results are cached under the single-model, no-gap-fill key, or not
+    at all when `store` is off; they never go into the near-dup index, whose
+    entries stand for the full online extraction.
+    """
+    from app.normalizer.graph import post_llm_graph
+
+    model_id = model_id or model_ids()[0]
+    finished = []
+    for idx, state in enumerate(states):
+        if not _answered(state):
+            result = results.get(str(idx))
+            state = {k: v for k, v in state.items() if k != "near_dup_fingerprint"}
+            state["llm_cache_key"] = extraction_key(state["payload"], [model_id], fallback_fields=[]) if store else ""
+            if result is None:
+                state = {**state, "llm_cache_key": "", "batch_error": True}
+                result = JobOutputSchema(
+                    company_name="", company_website="", job_category="", benefits=[], job_tags=[],
+                    job_type=[], job_region=[], salary=""
+                )
+            record = (calls or {}).get(str(idx))
+            state = {
+                **state, "llm_primary": result, "llm_fallback": None, "llm_merged": result,
+                "llm_calls": [record] if record else [],
+            }
+        finished.append(post_llm_graph.invoke(state))
+    return finished
+
+
+class OpenAIBatchService:
+    """
+    Thin wrapper over the OpenAI Files + Batches endpoints.
+    """
+
+    # real model answers: worth keeping in the extraction cache
+    stores_results = True
+
+    def __init__(self, client: Any = None):
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI()
+        self.client = client
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            file_obj = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=file_obj.id, endpoint=BATCH_ENDPOINT, completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.client.batches.retrieve(batch_id)
+        return {
+            "id": batch.id,
+            "status": batch.status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id,
+        }
+
+    def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        info = self.status(batch_id)
+        lines: List[Dict[str, Any]] = []
+        for file_id in (info["output_file_id"], info["error_file_id"]):
+            if file_id:
+                lines.extend(read_jsonl(self.client.files.content(file_id).text))
+        return lines
+
+
+def rule_responder(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Default LocalBatchService answer: run the rule engine on the payload JSON
+    found in the user message.
+    """
+    from app.normalizer.utils.rules import rule_extract
+
+    user = next(m["content"] for m in body["messages"] if m["role"] == "user")
+    payload, _ = json.JSONDecoder().raw_decode(user[user.index("{"):])
+    result, _, _ = rule_extract(payload)
+    return result.model_dump()
+
+
+class LocalBatchService:
+    """
+    File-based Batch API stand-in. Each batch is a directory under `root`
+    with input.jsonl, status.json and (once processed) output.jsonl in the
+    Batch API output format. Batches are processed on the first poll.
+    """
+
+    # stand-in answers must not be served to the online path later
+    stores_results = False
+
+    def __init__(self, root: str, responder: Callable[[Dict[str, Any]], Dict[str, Any]] = rule_responder):
+        self.root = root
+        self.responder = responder
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, batch_id: str) -> str:
+        return os.path.join(self.root, batch_id)
+
+    def _write_status(self, batch_id: str, status: str) -> None:
+        with open(os.path.join(self._dir(batch_id), "status.json"), "w", encoding="utf-8") as f:
+            json.dump({"id": batch_id, "status": status}, f)
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        os.makedirs(self._dir(batch_id))
+        with open(input_path, encoding="utf-8") as src:
+            data = src.read()
+        with open(os.path.join(self._dir(batch_id), "input.jsonl"), "w", encoding="utf-8") as dst:
+            dst.write(data)
+        self._write_status(batch_id, "validating")
+        return batch_id
+
+    def _process(self, batch_id: str) -> None:
+        with open(os.path.join(self._dir(batch_id), "input.jsonl"), encoding="utf-8") as f:
+            requests = read_jsonl(f.read())
+        lines = []
+        for req in requests:
+            line: Dict[str, Any] = {"id": f"req_{uuid.uuid4().hex[:12]}", "custom_id": req["custom_id"], "error": None}
+            try:
+                content = self.responder(req["body"])
+                line["response"] = {
+                    "status_code": 200,
+                    "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content)}}]},
+                }
+            except Exception as e:
+                line["response"] = None
+                line["error"] = {"code": "local_responder_error", "message": str(e)}
+            lines.append(line)
+        write_jsonl(os.path.join(self._dir(batch_id), "output.jsonl"), lines)
+        self._write_status(batch_id, "completed")
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        with open(os.path.join(self._dir(batch_id), "status.json"), encoding="utf-8") as f:
+            info = json.load(f)
+        if info["status"] not in TERMINAL_STATUSES:
+            self._process(batch_id)
+            info["status"] = "completed"
+        return info
+
+    def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        with open(os.path.join(self._dir(batch_id), "output.jsonl"), encoding="utf-8") as f:
+            return read_jsonl(f.read())
+
+
+def wait_for(service: Any, batch_id: str, poll_interval: float = 60.0, timeout: float = 25 * 3600) -> Dict[str, Any]:
+    deadline = time.monotonic() + timeout
+    while True:
+        info = service.status(batch_id)
+        if info["status"] in TERMINAL_STATUSES:
+            return info
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"batch {batch_id} still {info['status']} after {timeout:.0f}s")
+        log.info("Batch %s is %s", batch_id, info["status"])
+        time.sleep(poll_interval)
+
+
+def run_bulk(
+    jobs: List[Dict[str, Any]],
+    service: Any,
+    work_dir: str,
+    model_id: Optional[str] = None,
+    poll_interval: float = 60.0,
+) -> List[Dict[str, Any]]:
+    """
+    Normalize `jobs` through a batch service; returns final states in input order.
+    """
+    t0 = time.time()
+    states, requests = prepare(jobs, model_id)
+    results: Dict[str, Optional[JobOutputSchema]] = {}
+    calls: Dict[str, Dict[str, Any]] = {}
+    if requests:
+        os.makedirs(work_dir, exist_ok=True)
+        input_path = os.path.join(work_dir, "batch_input.jsonl")
+        write_jsonl(input_path, requests)
+        batch_id = service.submit(input_path)
+        info = wait_for(service, batch_id, poll_interval)
+        if info["status"] != "completed":
+            log.warning("Batch %s ended as %s", batch_id, info["status"])
+        lines = service.results(batch_id)
+        results = parse_results(lines)
+        calls = parse_usage(lines, model_id or model_ids()[0])
+
+    finished = finish(states, results, calls, model_id, store=getattr(service, "stores_results", True))
+    log.info(
+        "Bulk-normalized %d jobs (%d from cache, %d via batch) in %.1fs",
+        len(jobs), len(jobs) - len(requests), len(requests), time.time() - t0,
+    )
+    return finished
+
+
+def _main() -> None:
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", help="JSONL of JobItem objects")
+    parser.add_argument("output", help="JSONL of normalized results")
+    parser.add_argument("--local", metavar="DIR", help="use the file-based stand-in instead of OpenAI")
+    parser.add_argument("--work-dir", default=".bulk", help="where the batch input file is written")
+    parser.add_argument("--poll-interval", type=float, default=60.0)
+    args = parser.parse_args()
+
+    setup_logging()
+    with open(args.input, encoding="utf-8") as f:
+        jobs = read_jsonl(f.read())
+    service = LocalBatchService(args.local) if args.local else OpenAIBatchService()
+    finished = run_bulk(jobs, service, args.work_dir, poll_interval=args.poll_interval)
+    write_jsonl(args.output, ({k: v for k, v in s.items() if k in ("normalized", "company_website", "experience_level")} for s in finished))
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,38 +1,173 @@
 # app/normalizer/graph.py
+import asyncio
+import functools
+import time
+from typing import Awaitable, Callable, Optional
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
+from app.core.metrics import NODE_IN_FLIGHT, NODE_SECONDS
 from app.normalizer.state import JobState
 from app.normalizer.nodes.preprocess import node_preprocess
-from app.normalizer.nodes.llm_extract import node_llm_extract
+from app.normalizer.nodes.llm_cache import node_llm_cache_lookup, node_llm_cache_store
+from app.normalizer.nodes.near_dup import node_near_dup_lookup, node_near_dup_store
+from app.normalizer.nodes.rule_extract import node_rule_extract, node_rules_shadow
+from app.normalizer.nodes.llm_extract import (
+    node_llm_extract, anode_llm_extract, node_compaction_shadow, anode_compaction_shadow,
+)
 from app.normalizer.nodes.validate_normalize import node_validate_normalize
 from app.normalizer.nodes.derive_experience import node_derive_experience
-from app.normalizer.nodes.enrich_company_website import node_company_website_lookup
+from app.normalizer.nodes.enrich_company_website import (
+    node_company_website_lookup, anode_company_website_lookup,
+)
 from app.normalizer.nodes.finalize import node_finalize
 
-graph = StateGraph(JobState)
+def _timed(name: str, func: Callable[[JobState], JobState]) -> Callable[[JobState], JobState]:
+    @functools.wraps(func)
+    def run(state: JobState) -> JobState:
+        NODE_IN_FLIGHT.inc(node=name)
+        t0 = time.perf_counter()
+        try:
+            return func(state)
+        finally:
+            NODE_SECONDS.observe(time.perf_counter() - t0, node=name)
+            NODE_IN_FLIGHT.dec(node=name)
+    return run
+
+def _atimed(name: str, afunc: Callable[[JobState], Awaitable[JobState]]) -> Callable[[JobState], Awaitable[JobState]]:
+    @functools.wraps(afunc)
+    async def run(state: JobState) -> JobState:
+        NODE_IN_FLIGHT.inc(node=name)
+        t0 = time.perf_counter()
+        try:
+            return await afunc(state)
+        finally:
+            NODE_SECONDS.observe(time.perf_counter() - t0, node=name)
+            NODE_IN_FLIGHT.dec(node=name)
+    return run
 
-graph.add_node("preprocess", node_preprocess)
-graph.add_node("llm_extract", node_llm_extract)
-graph.add_node("validate_normalize", node_validate_normalize)
-graph.add_node("derive_experience", node_derive_experience)
-graph.add_node("website_lookup", node_company_website_lookup)
-graph.add_node("finalize", node_finalize)
+def _in_thread(func: Callable[[JobState], JobState]) -> Callable[[JobState], Awaitable[JobState]]:
+    @functools.wraps(func)
+    async def run(state: JobState) -> JobState:
+        return await asyncio.to_thread(func, state)
+    return run
 
-graph.set_entry_point("preprocess")
-graph.add_edge("preprocess", "llm_extract")
-graph.add_edge("llm_extract", "validate_normalize")
-graph.add_edge("validate_normalize", "derive_experience")
+def _node(g: StateGraph, name: str, func, afunc: Optional[Callable] = None) -> None:
+    """
+    add_node with duration / in-flight metrics. Under ainvoke a node runs its
+    async twin, or, if it has none, its sync function in a worker thread:
+    HTML parsing, SQLite cache I/O and rule matching must not stall the event
+    loop every other in-flight job shares.
+    """
+    g.add_node(name, RunnableLambda(_timed(name, func), afunc=_atimed(name, afunc or _in_thread(func)), name=name))
 
 def website_router(state: JobState):
     return "website_lookup" if state.get("needs_company_website_lookup") else "finalize"
 
-graph.add_conditional_edges(
-    "derive_experience",
-    website_router,
-    {"website_lookup": "website_lookup", "finalize": "finalize"}
-)
+def _add_post_llm(g: StateGraph) -> None:
+    """
+    Everything after the extraction is known: cache stores → validate → experience → website → finalize.
+    """
+    _node(g, "llm_cache_store", node_llm_cache_store)
+    _node(g, "near_dup_store", node_near_dup_store)
+    _node(g, "validate_normalize", node_validate_normalize)
+    _node(g, "derive_experience", node_derive_experience)
+    _node(g, "website_lookup", node_company_website_lookup, anode_company_website_lookup)
+    _node(g, "finalize", node_finalize)
+
+    g.add_edge("llm_cache_store", "near_dup_store")
+    g.add_edge("near_dup_store", "validate_normalize")
+    g.add_edge("validate_normalize", "derive_experience")
+    g.add_conditional_edges(
+        "derive_experience",
+        website_router,
+        {"website_lookup": "website_lookup", "finalize": "finalize"}
+    )
+    g.add_edge("website_lookup", "finalize")
+    g.add_edge("finalize", END)
+
+def llm_cache_router(state: JobState):
+    return "validate_normalize" if state.get("llm_cache_hit") else "near_dup_lookup"
+
+def near_dup_router(state: JobState):
+    return "validate_normalize" if state.get("near_dup_hit") else "rule_extract"
+
+def rule_router(state: JobState):
+    return "validate_normalize" if state.get("rule_bypass") else "llm_extract"
+
+def _add_pre_llm(g: StateGraph, answered: str = "validate_normalize", extract: str = "llm_extract") -> None:
+    """
+    preprocess → llm cache → near-dup → rules. `answered` / `extract` are where
+    a job goes once it has a result, or once it needs the model.
+    """
+    _node(g, "preprocess", node_preprocess)
+    _node(g, "llm_cache_lookup", node_llm_cache_lookup)
+    _node(g, "near_dup_lookup", node_near_dup_lookup)
+    _node(g, "rule_extract", node_rule_extract)
+
+    g.set_entry_point("preprocess")
+    g.add_edge("preprocess", "llm_cache_lookup")
+    g.add_conditional_edges(
+        "llm_cache_lookup",
+        llm_cache_router,
+        {"validate_normalize": answered, "near_dup_lookup": "near_dup_lookup"}
+    )
+    g.add_conditional_edges(
+        "near_dup_lookup",
+        near_dup_router,
+        {"validate_normalize": answered, "rule_extract": "rule_extract"}
+    )
+    g.add_conditional_edges(
+        "rule_extract",
+        rule_router,
+        {"validate_normalize": answered, "llm_extract": extract}
+    )
 
-graph.add_edge("website_lookup", "finalize")
-graph.add_edge("finalize", END)
+def _add_llm(g: StateGraph) -> None:
+    # sync invoke uses node_llm_extract, ainvoke/abatch use the non-blocking twin
+    _node(g, "llm_extract", node_llm_extract, anode_llm_extract)
+    _node(g, "compaction_shadow", node_compaction_shadow, anode_compaction_shadow)
+    _node(g, "rules_shadow", node_rules_shadow)
+
+    g.add_edge("llm_extract", "compaction_shadow")
+    g.add_edge("compaction_shadow", "rules_shadow")
+    g.add_edge("rules_shadow", "llm_cache_store")
+
+graph = StateGraph(JobState)
+_add_pre_llm(graph)
+_add_llm(graph)
+_add_post_llm(graph)
 
 job_graph = graph.compile()
+
+# Entry point for states whose llm_merged was produced outside the graph
+# (offline Batch API results): cache store + validation onwards.
+post_llm = StateGraph(JobState)
+_add_post_llm(post_llm)
+post_llm.set_entry_point("llm_cache_store")
+
+post_llm_graph = post_llm.compile()
+
+# Split run for packed extraction: pre_llm_graph stops where a job would need
+# the model; resume_graph picks a state up from there, whether it was answered
+# earlier, got llm_merged from a packed call, or still needs its own call.
+pre_llm = StateGraph(JobState)
+_add_pre_llm(pre_llm, answered=END, extract=END)
+
+pre_llm_graph = pre_llm.compile()
+
+def resume_router(state: JobState):
+    if state.get("llm_cache_hit") or state.get("near_dup_hit") or state.get("rule_bypass"):
+        return "validate_normalize"
+    return "compaction_shadow" if state.get("llm_merged") is not None else "llm_extract"
+
+resume = StateGraph(JobState)
+_add_llm(resume)
+_add_post_llm(resume)
+resume.set_conditional_entry_point(
+    resume_router,
+    {"validate_normalize": "validate_normalize", "compaction_shadow": "compaction_shadow", "llm_extract": "llm_extract"}
+)
+
+resume_graph = resume.compile()
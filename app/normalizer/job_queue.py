@@ -0,0 +1,343 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from app.normalizer.llm.usage import merge_usage
+
+log = logging.getLogger("job-normalizer")
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+class Lease(NamedTuple):
+    batch_id: str
+    idx: int
+    job: Dict[str, Any]
+    token: str
+    attempts: int
+
+
+class JobQueue:
+    """
+    Durable SQLite queue of submitted batches, one row per job post.
+
+    Workers lease items for `visibility_timeout` seconds; a lease that is
+    neither completed nor failed in time (crashed worker, killed process)
+    becomes visible again. After `max_attempts` leases an item is failed.
+    Finished batches are deleted `retention_seconds` after they finish.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        visibility_timeout: float = 300,
+        max_attempts: int = 3,
+        retention_seconds: float = 7 * 24 * 3600,
+    ):
+        self.path = path
+        self.visibility_timeout = float(visibility_timeout)
+        self.max_attempts = max(1, int(max_attempts))
+        self.retention_seconds = float(retention_seconds)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            " id TEXT PRIMARY KEY, total INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS batches_finished ON batches(finished_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " batch_id TEXT NOT NULL, idx INTEGER NOT NULL, job TEXT NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_token TEXT, lease_until REAL NOT NULL DEFAULT 0,"
+            " result TEXT, error TEXT, enqueued_at REAL NOT NULL,"
+            " PRIMARY KEY (batch_id, idx))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS items_ready ON items(status, lease_until, enqueued_at)")
+
+    def submit(self, jobs: List[Dict[str, Any]]) -> str:
+        batch_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT INTO batches (id, total, created_at, finished_at) VALUES (?, ?, ?, ?)",
+                (batch_id, len(jobs), now, now if not jobs else None),
+            )
+            self._conn.executemany(
+                "INSERT INTO items (batch_id, idx, job, status, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+                [(batch_id, i, json.dumps(job, ensure_ascii=False), QUEUED, now) for i, job in enumerate(jobs)],
+            )
+            self._conn.execute("COMMIT")
+        return batch_id
+
+    def lease(self, n: int = 1) -> List[Lease]:
+        """
+        Up to `n` items that are queued or whose lease ran out, oldest first.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT batch_id, idx, job, attempts FROM items"
+                " WHERE status = ? OR (status = ? AND lease_until < ?)"
+                " ORDER BY enqueued_at, idx LIMIT ?",
+                (QUEUED, LEASED, now, n),
+            ).fetchall()
+            leases, exhausted = [], []
+            for batch_id, idx, job, attempts in rows:
+                if attempts >= self.max_attempts:
+                    exhausted.append((batch_id, idx))
+                    continue
+                leases.append(Lease(batch_id, idx, json.loads(job), token, attempts + 1))
+            self._conn.executemany(
+                "UPDATE items SET status = ?, attempts = attempts + 1, lease_token = ?, lease_until = ?"
+                " WHERE batch_id = ? AND idx = ?",
+                [(LEASED, token, now + self.visibility_timeout, l.batch_id, l.idx) for l in leases],
+            )
+            # leased max_attempts times and never finished: the worker keeps dying on it
+            for batch_id, idx in exhausted:
+                self._finish_locked(batch_id, idx, None, FAILED, None, "lease_expired", now)
+            self._conn.execute("COMMIT")
+        return leases
+
+    def complete(self, lease: Lease, result: Any) -> bool:
+        return self._settle(lease, DONE, json.dumps(result, ensure_ascii=False), None)
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        """
+        Record a failed attempt: back to the queue, or failed for good once
+        the item has used up its attempts.
+        """
+        if lease.attempts < self.max_attempts:
+            with self._lock:
+                cur = self._conn.execute(
+                    "UPDATE items SET status = ?, lease_token = NULL, lease_until = 0, error = ?"
+                    " WHERE batch_id = ? AND idx = ? AND lease_token = ?",
+                    (QUEUED, error, lease.batch_id, lease.idx, lease.token),
+                )
+                return cur.rowcount == 1
+        return self._settle(lease, FAILED, None, error)
+
+    def _settle(self, lease: Lease, status: str, result: Optional[str], error: Optional[str]) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            ok = self._finish_locked(lease.batch_id, lease.idx, lease.token, status, result, error, now)
+            self._conn.execute("COMMIT")
+            return ok
+
+    def _finish_locked(
+        self, batch_id: str, idx: int, token: Optional[str], status: str,
+        result: Optional[str], error: Optional[str], now: float,
+    ) -> bool:
+        # a lease that expired and was handed to another worker no longer owns the item
+        cur = self._conn.execute(
+            "UPDATE items SET status = ?, result = ?, error = ?, lease_token = NULL"
+            " WHERE batch_id = ? AND idx = ? AND status = ? AND (? IS NULL OR lease_token = ?)",
+            (status, result, error, batch_id, idx, LEASED, token, token),
+        )
+        if cur.rowcount != 1:
+            return False
+        (open_items,) = self._conn.execute(
+            "SELECT COUNT(*) FROM items WHERE batch_id = ? AND status IN (?, ?)",
+            (batch_id, QUEUED, LEASED),
+        ).fetchone()
+        if open_items == 0:
+            self._conn.execute("UPDATE batches SET finished_at = ? WHERE id = ?", (now, batch_id))
+        return True
+
+    def status(self, batch_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            batch = self._conn.execute(
+                "SELECT total, created_at, finished_at FROM batches WHERE id = ?", (batch_id,)
+            ).fetchone()
+            if batch is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM items WHERE batch_id = ? GROUP BY status", (batch_id,)
+            ).fetchall())
+            rows = self._conn.execute(
+                "SELECT idx, status, result, error FROM items WHERE batch_id = ? AND status IN (?, ?) ORDER BY idx",
+                (batch_id, DONE, FAILED),
+            ).fetchall() if include_results else []
+
+        total, created_at, finished_at = batch
+        done, failed = counts.get(DONE, 0), counts.get(FAILED, 0)
+        if finished_at is not None:
+            state = "done"
+        elif counts.get(LEASED, 0) or done or failed:
+            state = "running"
+        else:
+            state = "queued"
+        out: Dict[str, Any] = {
+            "id": batch_id,
+            "status": state,
+            "total": total,
+            "done": done,
+            "failed": failed,
+            "pending": total - done - failed,
+            "created_at": created_at,
+            "finished_at": finished_at,
+        }
+        if finished_at is not None and self.retention_seconds > 0:
+            out["expires_at"] = finished_at + self.retention_seconds
+        if include_results:
+            out["results"] = [
+                {"index": idx, "result": json.loads(result)} if status == DONE
+                else {"index": idx, "error": error or "internal_error"}
+                for idx, status, result, error in rows
+            ]
+            # per-job llm_usage rolled up for the batch (jobs finished so far)
+            out["usage"] = merge_usage(
+                r["result"].get("llm_usage") for r in out["results"] if isinstance(r.get("result"), dict)
+            )
+        return out
+
+    def purge(self) -> int:
+        """
+        Delete batches that finished more than `retention_seconds` ago.
+        """
+        if self.retention_seconds <= 0:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            ids = [r[0] for r in self._conn.execute(
+                "SELECT id FROM batches WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            )]
+            for batch_id in ids:
+                self._conn.execute("DELETE FROM items WHERE batch_id = ?", (batch_id,))
+                self._conn.execute("DELETE FROM batches WHERE id = ?", (batch_id,))
+            self._conn.execute("COMMIT")
+        return len(ids)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+            (batches,) = self._conn.execute("SELECT COUNT(*) FROM batches").fetchone()
+            (open_batches,) = self._conn.execute(
+                "SELECT COUNT(*) FROM batches WHERE finished_at IS NULL"
+            ).fetchone()
+        return {
+            "batches": batches,
+            "open_batches": open_batches,
+            "items": {s: counts.get(s, 0) for s in (QUEUED, LEASED, DONE, FAILED)},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobWorkerPool:
+    """
+    `workers` asyncio tasks, each leasing one item at a time and running it
+    through `process` (the graph by default). Also purges expired batches.
+    """
+
+    _PURGE_EVERY = 300.0
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = 4,
+        process: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None,
+        poll_interval: float = 0.5,
+    ):
+        self.queue = queue
+        self.workers = max(0, int(workers))
+        self.process = process
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._last_purge = 0.0
+
+    async def _process(self, job: Dict[str, Any]) -> Any:
+        if self.process is not None:
+            return await self.process(job)
+        from fastapi.encoders import jsonable_encoder
+        from app.normalizer import anormalize_job_post
+
+        return jsonable_encoder(await anormalize_job_post(job))
+
+    async def run_once(self) -> bool:
+        """
+        Lease and process one item; False if there was nothing to do.
+        """
+        leases = await asyncio.to_thread(self.queue.lease, 1)
+        if not leases:
+            return False
+        lease = leases[0]
+        try:
+            result = await self._process(lease.job)
+        except Exception as e:
+            log.warning("Queued job %s/%d failed (attempt %d): %s", lease.batch_id, lease.idx, lease.attempts, e)
+            await asyncio.to_thread(self.queue.fail, lease, "internal_error")
+        else:
+            if not await asyncio.to_thread(self.queue.complete, lease, result):
+                log.warning("Queued job %s/%d finished after its lease expired", lease.batch_id, lease.idx)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                if time.time() - self._last_purge > self._PURGE_EVERY:
+                    self._last_purge = time.time()
+                    purged = await asyncio.to_thread(self.queue.purge)
+                    if purged:
+                        log.info("Purged %d expired job batches", purged)
+                if not await self.run_once():
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("Job worker error: %s", e)
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """
+    Shared queue, or None when JOB_QUEUE_PATH is not configured.
+    """
+    global _queue
+    from app.core.config import (
+        JOB_QUEUE_PATH, JOB_VISIBILITY_TIMEOUT_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETENTION_SECONDS,
+    )
+
+    if not JOB_QUEUE_PATH:
+        return None
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(
+                    JOB_QUEUE_PATH, JOB_VISIBILITY_TIMEOUT_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETENTION_SECONDS,
+                )
+    return _queue
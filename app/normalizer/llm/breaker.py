@@ -0,0 +1,215 @@
+# app/normalizer/llm/breaker.py
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.core.config import LLM_BREAKER_FAILURES, LLM_BREAKER_HALF_OPEN_PROBES, LLM_BREAKER_OPEN_SECONDS
+from app.core.metrics import LLM_BREAKER_OPENS, LLM_BREAKER_STATE
+
+log = logging.getLogger("job-normalizer")
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    The model's breaker is open: the call was not made.
+    """
+
+
+class CallBudgetExhausted(RuntimeError):
+    """
+    The job has used up its LLM_CALL_BUDGET: the call was not made.
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-model breaker. `failures` consecutive failed calls open it; while
+    open every call is refused. After `open_seconds` it is half-open and lets
+    up to `half_open_probes` calls through: if they all succeed it closes,
+    the first failure opens it again for another `open_seconds`.
+
+    Only exceptions raised by the call itself count; an answer that fails to
+    parse is still an answer.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        failures: int = LLM_BREAKER_FAILURES,
+        open_seconds: float = LLM_BREAKER_OPEN_SECONDS,
+        half_open_probes: int = LLM_BREAKER_HALF_OPEN_PROBES,
+    ):
+        self.model_id = model_id
+        self.failure_threshold = max(1, failures)
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.opens = 0
+        self.rejected = 0
+        LLM_BREAKER_STATE.set(0, model=model_id)
+
+    def _set_state_locked(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        LLM_BREAKER_STATE.set(_STATE_VALUE[state], model=self.model_id)
+        if state == OPEN:
+            self.opens += 1
+            LLM_BREAKER_OPENS.inc(model=self.model_id)
+        log.warning("Circuit breaker for %s is now %s", self.model_id, state)
+
+    def _open_locked(self, now: float) -> None:
+        self.opened_at = now
+        self._set_state_locked(OPEN)
+
+    def allow(self) -> bool:
+        """
+        Admit one call; the caller must then report it with `record`.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self._set_state_locked(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self.probes_in_flight + self.probe_successes >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self.probes_in_flight += 1
+            return True
+
+    def record(self, ok: Optional[bool]) -> None:
+        """
+        Outcome of an admitted call: True/False, or None when it was cancelled
+        before it could tell (it then neither closes nor opens the breaker).
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+                if ok is None:
+                    return
+                if not ok:
+                    self._open_locked(time.monotonic())
+                    return
+                self.probe_successes += 1
+                if self.probe_successes >= self.half_open_probes:
+                    self.consecutive_failures = 0
+                    self._set_state_locked(CLOSED)
+                return
+            if ok is None or self.state == OPEN:
+                return
+            if ok:
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self._open_locked(time.monotonic())
+
+    def call(self, fn: Callable[[], T]) -> T:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.model_id}: circuit open")
+        try:
+            out = fn()
+        except Exception:
+            self.record(False)
+            raise
+        except BaseException:
+            self.record(None)
+            raise
+        self.record(True)
+        return out
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.model_id}: circuit open")
+        try:
+            out = await fn()
+        except Exception:
+            self.record(False)
+            raise
+        except BaseException:
+            self.record(None)
+            raise
+        self.record(True)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            open_for = self.open_seconds - (time.monotonic() - self.opened_at) if self.state == OPEN else 0.0
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "open_for_s": round(max(0.0, open_for), 3),
+                "opens": self.opens,
+                "rejected": self.rejected,
+            }
+
+
+class Breakers:
+    """
+    Process-wide CircuitBreaker per model id, created on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, CircuitBreaker] = {}
+
+    def model(self, model_id: str) -> CircuitBreaker:
+        breaker = self._models.get(model_id)
+        if breaker is None:
+            with self._lock:
+                breaker = self._models.get(model_id)
+                if breaker is None:
+                    breaker = self._models[model_id] = CircuitBreaker(model_id)
+        return breaker
+
+    def reset(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = dict(self._models)
+        return {model_id: breaker.stats() for model_id, breaker in models.items()}
+
+
+class CallBudget:
+    """
+    Model calls one job may still make; first attempts, retries and
+    fallbacks all draw from it. Thread-safe because hedged legs share it.
+    """
+
+    def __init__(self, calls: int):
+        self._lock = threading.Lock()
+        self.remaining = max(0, calls)
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def refund(self) -> None:
+        with self._lock:
+            self.remaining += 1
+
+
+breakers = Breakers()
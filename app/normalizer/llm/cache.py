@@ -0,0 +1,198 @@
+# app/normalizer/llm/cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.cache import TTLCache
+from app.normalizer.llm.schema import JobOutputSchema
+
+log = logging.getLogger("job-normalizer")
+
+
+def cache_key(payload: Dict[str, Any], model_ids: Iterable[str], version: str) -> str:
+    """
+    Content address for one extraction: canonical payload JSON + models + prompt version.
+    """
+    canonical = {
+        k: (" ".join(v.split()) if isinstance(v, str) else v)
+        for k, v in (payload or {}).items()
+    }
+    material = json.dumps(
+        {"payload": canonical, "models": list(model_ids), "version": version},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SQLiteStore:
+    """
+    Persistent key/value tier. Rows older than `ttl_seconds` are ignored and
+    purged; the table is trimmed back to `max_entries` by last access.
+    """
+
+    _EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_seconds: float = 0):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._writes += 1
+            if self._writes % self._EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds > 0:
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN"
+                " (SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict(time.time())
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ExtractionCache:
+    """
+    Two-tier cache for merged LLM extractions: in-process LRU in front of SQLite.
+    """
+
+    def __init__(self, memory: TTLCache, disk: Optional[SQLiteStore] = None):
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, key: str) -> Optional[JobOutputSchema]:
+        result = self.memory.get(key)
+        if result is not None:
+            with self._lock:
+                self.hits_memory += 1
+            return result
+
+        if self.disk is not None:
+            raw = self.disk.get(key)
+            if raw is not None:
+                try:
+                    result = JobOutputSchema.model_validate_json(raw)
+                except ValueError:
+                    log.warning("Dropping unreadable LLM cache entry %s", key)
+                    result = None
+                if result is not None:
+                    self.memory.set(key, result)
+                    with self._lock:
+                        self.hits_disk += 1
+                    return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, result: JobOutputSchema) -> None:
+        self.memory.set(key, result)
+        if self.disk is not None:
+            self.disk.set(key, result.model_dump_json())
+        with self._lock:
+            self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.hits_memory + self.hits_disk
+            lookups = hits + self.misses
+            out = {
+                "hits": hits,
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        out["memory_entries"] = len(self.memory)
+        out["disk_entries"] = len(self.disk) if self.disk is not None else 0
+        return out
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    Process-wide cache built from config on first use; None when disabled.
+    """
+    global _cache
+    from app.core.config import (
+        LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES,
+        LLM_CACHE_MAX_DISK_ENTRIES, LLM_CACHE_TTL_SECONDS,
+    )
+
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                memory = TTLCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+                disk = None
+                if LLM_CACHE_PATH:
+                    disk = SQLiteStore(LLM_CACHE_PATH, LLM_CACHE_MAX_DISK_ENTRIES, LLM_CACHE_TTL_SECONDS)
+                _cache = ExtractionCache(memory, disk)
+    return _cache
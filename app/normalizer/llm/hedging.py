@@ -0,0 +1,183 @@
+# app/normalizer/llm/hedging.py
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import (
+    HEDGE_PERCENTILE, HEDGE_MIN_DELAY_MS, HEDGE_INITIAL_DELAY_MS, HEDGE_WINDOW, HEDGE_MAX_WORKERS,
+)
+
+PRIMARY = "primary"
+FALLBACK = "fallback"
+
+# need this many primary samples before the percentile replaces the initial delay
+_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent primary-call latencies (seconds).
+    """
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self._samples: deque = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < _MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+        return ordered[idx]
+
+
+class Hedger:
+    """
+    Runs the primary call and, if it hasn't answered within the hedge delay,
+    fires the fallback call in parallel. The first successful answer wins.
+    """
+
+    def __init__(self, percentile: float = HEDGE_PERCENTILE, window: int = HEDGE_WINDOW):
+        self.percentile = percentile
+        self.latencies = LatencyTracker(window)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.fallback_after_error = 0
+        self.both_failed = 0
+
+    def delay(self) -> float:
+        observed = self.latencies.percentile(self.percentile)
+        if observed is None:
+            return HEDGE_INITIAL_DELAY_MS / 1000.0
+        return max(HEDGE_MIN_DELAY_MS / 1000.0, observed)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+            return self._executor
+
+    def _count(self, hedged: bool, winner: Optional[str]) -> None:
+        with self._lock:
+            self.requests += 1
+            if hedged:
+                self.hedges_fired += 1
+            if winner == PRIMARY:
+                self.primary_wins += 1
+            elif winner == FALLBACK and hedged:
+                self.hedge_wins += 1
+            elif winner == FALLBACK:
+                self.fallback_after_error += 1
+            else:
+                self.both_failed += 1
+
+    def _timed(self, fn: Callable[[], Any]) -> Callable[[], Any]:
+        def run():
+            t0 = time.perf_counter()
+            out = fn()
+            self.latencies.record(time.perf_counter() - t0)
+            return out
+        return run
+
+    def invoke(self, primary: Callable[[], Any], fallback: Callable[[], Any]) -> Tuple[Any, Optional[str]]:
+        """
+        Returns (result, winner). winner is None (and result None) if both failed.
+        A losing thread can't be interrupted; its result is simply discarded.
+        """
+        pool = self._pool()
+        legs: Dict[Any, str] = {pool.submit(self._timed(primary)): PRIMARY}
+        done, _ = wait(legs, timeout=self.delay())
+        hedged = not done
+        if hedged:
+            legs[pool.submit(fallback)] = FALLBACK
+
+        pending = set(legs)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    self._count(hedged, legs[fut])
+                    return fut.result(), legs[fut]
+            if FALLBACK not in legs.values():
+                # primary failed before the hedge delay: fall back right away
+                fb = pool.submit(fallback)
+                legs[fb] = FALLBACK
+                pending.add(fb)
+
+        self._count(hedged, None)
+        return None, None
+
+    async def ainvoke(
+        self, primary: Callable[[], Awaitable[Any]], fallback: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Async variant; the losing call is cancelled.
+        """
+        async def timed_primary():
+            t0 = time.perf_counter()
+            try:
+                out = await primary()
+            except asyncio.CancelledError:
+                # censored sample: it took at least this long. Dropping it would leave
+                # only the fast primaries in the window and drag the delay down.
+                self.latencies.record(time.perf_counter() - t0)
+                raise
+            self.latencies.record(time.perf_counter() - t0)
+            return out
+
+        legs: Dict[asyncio.Task, str] = {asyncio.ensure_future(timed_primary()): PRIMARY}
+        done, _ = await asyncio.wait(legs, timeout=self.delay())
+        hedged = not done
+        if hedged:
+            legs[asyncio.ensure_future(fallback())] = FALLBACK
+
+        pending = set(legs)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._count(hedged, legs[task])
+                        return task.result(), legs[task]
+                if FALLBACK not in legs.values():
+                    fb = asyncio.ensure_future(fallback())
+                    legs[fb] = FALLBACK
+                    pending.add(fb)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self._count(hedged, None)
+        return None, None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests, fired = self.requests, self.hedges_fired
+            return {
+                "requests": requests,
+                "hedges_fired": fired,
+                "hedge_wins": self.hedge_wins,
+                "primary_wins": self.primary_wins,
+                "fallback_after_error": self.fallback_after_error,
+                "both_failed": self.both_failed,
+                "fire_rate": round(fired / requests, 4) if requests else 0.0,
+                "win_rate": round(self.hedge_wins / fired, 4) if fired else 0.0,
+                "current_delay_ms": round(self.delay() * 1000, 1),
+            }
+
+
+hedger = Hedger()
@@ -1,8 +1,177 @@
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional, Tuple, Type
+
+import httpx
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
-from app.normalizer.llm.schema import JobOutputSchema
+from pydantic import BaseModel
+
+from app.core.config import (
+    OPENAI_MAX_CONNECTIONS, OPENAI_MAX_KEEPALIVE_CONNECTIONS, OPENAI_KEEPALIVE_EXPIRY,
+    OPENAI_TIMEOUT, OPENAI_MAX_RETRIES, LLM_REGISTRY_REBUILD_ON_ENV_CHANGE,
+)
+from app.normalizer.llm.prompt import prompt_messages, partial_prompt_messages, packed_prompt_messages
+from app.normalizer.llm.schema import JobOutputSchema, PackedJobsOutput, partial_schema
+from app.normalizer.vocab.registry import get_vocab
+
+# env vars that change how a client talks to the provider
+_WATCHED_ENV = ("OPENAI_API_KEY", "OPENAI_BASE_URL", "OPENAI_API_BASE", "OPENAI_ORGANIZATION", "OPENAI_PROXY")
+
+
+class ModelRegistry:
+    """
+    Builds each structured-output chain once per process and shares one
+    keep-alive connection pool (sync + async) between all of them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chains: Dict[Tuple[str, Optional[Tuple[str, ...]]], Runnable] = {}
+        self._packed_chains: Dict[str, Runnable] = {}
+        self._models: Dict[Tuple[str, Type[BaseModel]], Runnable] = {}
+        self._clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+        self._fingerprint = self._env_fingerprint()
+        self._vocab_version: Optional[str] = None
+
+    @staticmethod
+    def _env_fingerprint() -> Tuple[Optional[str], ...]:
+        return tuple(os.getenv(k) for k in _WATCHED_ENV)
+
+    def _http_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        if self._clients is None:
+            limits = httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+            )
+            timeout = httpx.Timeout(OPENAI_TIMEOUT)
+            self._clients = (
+                httpx.Client(limits=limits, timeout=timeout),
+                httpx.AsyncClient(limits=limits, timeout=timeout),
+            )
+        return self._clients
+
+    def _check_env(self) -> None:
+        if not LLM_REGISTRY_REBUILD_ON_ENV_CHANGE:
+            return
+        fingerprint = self._env_fingerprint()
+        if fingerprint != self._fingerprint:
+            self._reset_locked()
+            self._fingerprint = fingerprint
+
+    def _check_vocab(self) -> None:
+        # the prompts embed the controlled lists: a reloaded vocab needs new chains (the models stay)
+        version = get_vocab().version
+        if version != self._vocab_version:
+            self._chains.clear()
+            self._packed_chains.clear()
+            self._vocab_version = version
+
+    def _model_locked(self, model_id: str, schema: Type[BaseModel] = JobOutputSchema) -> Runnable:
+        model = self._models.get((model_id, schema))
+        if model is None:
+            http_client, http_async_client = self._http_clients()
+            model = ChatOpenAI(
+                model=model_id,
+                temperature=0,
+                timeout=OPENAI_TIMEOUT,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=http_client,
+                http_async_client=http_async_client,
+            ).with_structured_output(schema, include_raw=True)
+            self._models[(model_id, schema)] = model
+        return model
+
+    def model(self, model_id: str) -> Runnable:
+        with self._lock:
+            self._check_env()
+            return self._model_locked(model_id)
+
+    def chain(self, model_id: str, fields: Optional[Tuple[str, ...]] = None) -> Runnable:
+        """
+        `fields` selects a gap-filling chain that only asks for those fields.
+        """
+        key = (model_id, fields)
+        with self._lock:
+            self._check_env()
+            self._check_vocab()
+            chain = self._chains.get(key)
+            if chain is None:
+                if fields is None:
+                    prompt = ChatPromptTemplate.from_messages(prompt_messages())
+                    chain = prompt | self._model_locked(model_id)
+                else:
+                    prompt = ChatPromptTemplate.from_messages(partial_prompt_messages(fields))
+                    chain = prompt | self._model_locked(model_id, partial_schema(fields))
+                self._chains[key] = chain
+            return chain
+
+    def packed_chain(self, model_id: str) -> Runnable:
+        """
+        Chain answering several payloads at once (PackedJobsOutput).
+        """
+        with self._lock:
+            self._check_env()
+            self._check_vocab()
+            chain = self._packed_chains.get(model_id)
+            if chain is None:
+                prompt = ChatPromptTemplate.from_messages(packed_prompt_messages())
+                chain = prompt | self._model_locked(model_id, PackedJobsOutput)
+                self._packed_chains[model_id] = chain
+            return chain
+
+    def _reset_locked(self) -> None:
+        # in-flight calls keep their references; old clients are released with them
+        self._chains.clear()
+        self._packed_chains.clear()
+        self._models.clear()
+        self._clients = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_locked()
+            self._fingerprint = self._env_fingerprint()
+
+
+registry = ModelRegistry()
+
+
+def model_ids() -> Tuple[str, str]:
+    """
+    (primary, fallback) model ids from the environment.
+    """
+    return os.getenv("PRIMARY_MODEL") or "gpt-4o", os.getenv("FALLBACK_MODEL", "gpt-4o-mini")
+
 
 def _model(model_name: Optional[str] = None):
     model_id = model_name or os.getenv("PRIMARY_MODEL", "gpt-4o")
-    return ChatOpenAI(model=model_id, temperature=0).with_structured_output(JobOutputSchema)
+    return registry.model(model_id)
+
+
+def get_chain(model_name: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None) -> Runnable:
+    """
+    Cached `prompt | structured model` chain for a model id. The chain returns
+    {"raw": AIMessage, "parsed": JobOutputSchema | None, "parsing_error": ...}
+    so callers can read token usage off the raw message. With `fields`, the
+    chain is the partial gap-filling variant (see partial_prompt_messages).
+    """
+    model_id = model_name or os.getenv("PRIMARY_MODEL", "gpt-4o")
+    return registry.chain(model_id, fields)
+
+
+def get_packed_chain(model_name: Optional[str] = None) -> Runnable:
+    """
+    Cached packed chain for a model id (see packed_prompt_messages); same
+    {"raw", "parsed", "parsing_error"} output as get_chain.
+    """
+    model_id = model_name or os.getenv("PRIMARY_MODEL", "gpt-4o")
+    return registry.packed_chain(model_id)
+
+
+def reset_registry() -> None:
+    """
+    Drop every cached chain and the shared HTTP pool; next use rebuilds them.
+    """
+    registry.reset()
@@ -0,0 +1,266 @@
+# app/normalizer/llm/near_dup.py
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.normalizer.llm.schema import JobOutputSchema
+
+log = logging.getLogger("job-normalizer")
+
+_WORD = re.compile(r"\w+")
+_BITS = 64
+# TTL / max_entries trimming runs every _EVICT_EVERY stores, not on each one
+_EVICT_EVERY = 500
+
+
+def _h64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(features: Iterable[str]) -> int:
+    """
+    64-bit SimHash of a feature set: each bit is the majority vote of that
+    bit across the features' hashes.
+    """
+    bits = [format(_h64(f), "064b") for f in set(features)]
+    if not bits:
+        return 0
+    half = len(bits) / 2
+    out = 0
+    for column in zip(*bits):
+        out = (out << 1) | (column.count("1") > half)
+    return out
+
+
+def features(title: str, description: str) -> List[str]:
+    """
+    Words and word bigrams of the description plus the title's words (prefixed
+    so a title word never collides with a description word). Bigrams alone
+    swing too many bits on job-post-sized texts when a word or two changes.
+    """
+    words = _WORD.findall((description or "").casefold())
+    bigrams = [words[i] + " " + words[i + 1] for i in range(len(words) - 1)]
+    return words + bigrams + ["t:" + w for w in _WORD.findall((title or "").casefold())]
+
+
+def bands(fingerprint: int, n_bands: int) -> List[int]:
+    """
+    Split the fingerprint into n_bands slices: two fingerprints within
+    n_bands - 1 bits of each other agree on at least one slice.
+    """
+    width = -(-_BITS // n_bands)
+    mask = (1 << width) - 1
+    return [(fingerprint >> (i * width)) & mask for i in range(n_bands)]
+
+
+def _signed(v: int) -> int:
+    # SQLite INTEGER is signed 64-bit
+    return v - (1 << 64) if v >= 1 << 63 else v
+
+
+class NearDupMatch(NamedTuple):
+    result: JobOutputSchema
+    distance: int
+
+
+class NearDupIndex:
+    """
+    SimHash index of already-normalized posts, kept entirely in SQLite so
+    memory stays flat however many posts are indexed.
+
+    Candidates come from the band table (pigeonhole: max_distance + 1 bands),
+    then the exact Hamming distance decides. Entries are scoped by `group`
+    (fields that must match exactly) and `version` (prompt/models), aged out
+    after `ttl_seconds` and trimmed back to `max_entries` by last access.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_distance: int = 5,
+        max_entries: int = 1_000_000,
+        ttl_seconds: float = 0,
+    ):
+        self.path = path
+        self.max_distance = max(0, int(max_distance))
+        self.n_bands = self.max_distance + 1
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.candidates = 0
+
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " id INTEGER PRIMARY KEY, simhash INTEGER NOT NULL, grp TEXT NOT NULL,"
+            " version TEXT NOT NULL, result TEXT NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fingerprints_accessed ON fingerprints(accessed_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " band INTEGER NOT NULL, value INTEGER NOT NULL, fp_id INTEGER NOT NULL,"
+            " PRIMARY KEY (band, value, fp_id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_fp ON bands(fp_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._ensure_band_layout()
+
+    def _ensure_band_layout(self) -> None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'n_bands'").fetchone()
+        if row is not None and int(row[0]) == self.n_bands:
+            return
+        # max_distance changed: re-slice every stored fingerprint
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM bands")
+        for fp_id, value in self._conn.execute("SELECT id, simhash FROM fingerprints").fetchall():
+            self._insert_bands(fp_id, value & ((1 << 64) - 1))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('n_bands', ?)", (str(self.n_bands),)
+        )
+        self._conn.execute("COMMIT")
+
+    def _insert_bands(self, fp_id: int, fingerprint: int) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO bands (band, value, fp_id) VALUES (?, ?, ?)",
+            [(i, v, fp_id) for i, v in enumerate(bands(fingerprint, self.n_bands))],
+        )
+
+    def lookup(self, fingerprint: int, group: str, version: str) -> Optional[NearDupMatch]:
+        now = time.time()
+        clauses = " OR ".join(["(b.band = ? AND b.value = ?)"] * self.n_bands)
+        params: List[Any] = []
+        for i, v in enumerate(bands(fingerprint, self.n_bands)):
+            params.extend((i, v))
+        with self._lock:
+            self.lookups += 1
+            rows = self._conn.execute(
+                "SELECT DISTINCT f.id, f.simhash, f.created_at FROM bands b"
+                " JOIN fingerprints f ON f.id = b.fp_id"
+                f" WHERE ({clauses}) AND f.grp = ? AND f.version = ?",
+                (*params, group, version),
+            ).fetchall()
+            self.candidates += len(rows)
+
+            best: Optional[Tuple[int, int]] = None
+            for fp_id, stored, created_at in rows:
+                if self.ttl_seconds > 0 and now - created_at > self.ttl_seconds:
+                    continue
+                distance = ((stored & ((1 << 64) - 1)) ^ fingerprint).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (fp_id, distance)
+            if best is None:
+                return None
+            (raw,) = self._conn.execute("SELECT result FROM fingerprints WHERE id = ?", (best[0],)).fetchone()
+            try:
+                parsed = JobOutputSchema.model_validate_json(raw)
+            except ValueError:
+                log.warning("Dropping unreadable near-duplicate entry %d", best[0])
+                self._delete([best[0]])
+                return None
+            self._conn.execute("UPDATE fingerprints SET accessed_at = ? WHERE id = ?", (now, best[0]))
+            self.hits += 1
+            return NearDupMatch(parsed, best[1])
+
+    def add(self, fingerprint: int, group: str, version: str, result: JobOutputSchema) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            cur = self._conn.execute(
+                "INSERT INTO fingerprints (simhash, grp, version, result, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (_signed(fingerprint), group, version, result.model_dump_json(), now, now),
+            )
+            self._insert_bands(cur.lastrowid, fingerprint)
+            self._conn.execute("COMMIT")
+            self.stores += 1
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _delete(self, ids: List[int]) -> None:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            self._conn.execute(f"DELETE FROM bands WHERE fp_id IN ({marks})", chunk)
+            self._conn.execute(f"DELETE FROM fingerprints WHERE id IN ({marks})", chunk)
+
+    def _evict(self, now: float) -> None:
+        stale: List[int] = []
+        if self.ttl_seconds > 0:
+            stale = [r[0] for r in self._conn.execute(
+                "SELECT id FROM fingerprints WHERE created_at < ?", (now - self.ttl_seconds,)
+            )]
+            self._delete(stale)
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._delete([r[0] for r in self._conn.execute(
+                "SELECT id FROM fingerprints ORDER BY accessed_at ASC LIMIT ?", (excess,)
+            )])
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict(time.time())
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "avg_candidates": round(self.candidates / self.lookups, 2) if self.lookups else 0.0,
+                "max_distance": self.max_distance,
+            }
+        out["entries"] = len(self)
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[NearDupIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_near_dup_index() -> Optional[NearDupIndex]:
+    """
+    Process-wide index built from config on first use; None when disabled.
+    """
+    global _index
+    from app.core.config import (
+        NEAR_DUP_ENABLED, NEAR_DUP_PATH, NEAR_DUP_MAX_DISTANCE,
+        NEAR_DUP_MAX_ENTRIES, NEAR_DUP_TTL_SECONDS,
+    )
+
+    if not NEAR_DUP_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDupIndex(
+                    NEAR_DUP_PATH or ":memory:", NEAR_DUP_MAX_DISTANCE,
+                    NEAR_DUP_MAX_ENTRIES, NEAR_DUP_TTL_SECONDS,
+                )
+    return _index
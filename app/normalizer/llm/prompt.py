@@ -1,20 +1,20 @@
 #app/normalizer/llm/prompt.py
-from typing import Dict, Any
-from app.normalizer.vocab.categories import JOB_CATEGORIES
-from app.normalizer.vocab.types import JOB_TYPES
-from app.normalizer.vocab.tags import JOB_TAGS_WHITELIST
-from app.normalizer.vocab.benefits import BENEFITS_WHITELIST
-from app.normalizer.vocab.regions import REGION_VALUES
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from langchain_core.messages import SystemMessage
+from app.core.config import PROMPT_LAYOUT
+from app.normalizer.vocab.matcher import vocab_candidates
+from app.normalizer.vocab.registry import VocabSnapshot, get_vocab
 
-SYSTEM = (
+_SYSTEM_HEADER = (
     "You extract structured job info and classify into CLOSED SETS. "
     "Return ONLY valid JSON for the provided schema.\n"
     "Guidelines:\n"
-    "- company_name: exact employer/brand (plain text, no URL). If unknown, return empty string.\n"
-    "- company_website: if explicitly present in text, return it as a URL, else empty string.\n"
-    "- job_category: choose ONE from Job Categories or empty string if unclear (title has priority).\n"
-    "- job_tags: choose ONLY items that EXACTLY match the Job Tags whitelist (verbatim strings).\n"
-    "- benefits: choose ONLY items that EXACTLY match the Job Benefits whitelist (verbatim strings).\n"
+)
+
+_BENEFITS_MAPPING = (
     "\n"
     "Benefits mapping (map common phrases to the EXACT whitelist string):\n"
     "- Any mention of remote-first, fully remote, distributed, work remotely, work from anywhere → 'work from anywhere policy'\n"
@@ -28,16 +28,37 @@ SYSTEM = (
     "- Any mention of coworking stipend → 'coworking budget'\n"
     "- Any mention of home office stipend/equipment budget → 'home-office budget'\n"
     "\n"
-    "- job_type: choose ONLY items from the Job Types whitelist; map synonyms from hints/description "
-    "  (e.g., 'Full time'/'FT' → 'full-time'). Include multiple if explicitly present.\n"
-    "- job_region: choose ONE OR MORE from Job Regions (if multiple regions are explicitly mentioned); otherwise empty string.map hints or text.\n"
-    "- salary: return a normalized string based on the text: "
-    "  • convert 'k' to full numbers with thousand separators (e.g., '90k' → '90,000'); "
-    "  • keep the currency symbol/code; "
-    "  • ranges as '£90,000–£120,000'; "
-    "  • if the text is a lower bound (e.g., 'from £90k'), format as '£90,000+'; "
-    "  • drop non-monetary add-ons like '+ bonus' or 'plus benefits'. If unknown, return empty string.\n"
-    "Return JSON with keys: company_name, company_website, job_category, benefits[], job_tags[], job_type[], job_region, salary."
+)
+
+# one guideline per output field, in prompt order
+FIELD_GUIDELINES = {
+    "company_name": "- company_name: exact employer/brand (plain text, no URL). If unknown, return empty string.\n",
+    "company_website": "- company_website: if explicitly present in text, return it as a URL, else empty string.\n",
+    "job_category": "- job_category: choose ONE from Job Categories or empty string if unclear (title has priority).\n",
+    "job_tags": "- job_tags: choose ONLY items that EXACTLY match the Job Tags whitelist (verbatim strings).\n",
+    "benefits": (
+        "- benefits: choose ONLY items that EXACTLY match the Job Benefits whitelist (verbatim strings).\n"
+        + _BENEFITS_MAPPING
+    ),
+    "job_type": (
+        "- job_type: choose ONLY items from the Job Types whitelist; map synonyms from hints/description "
+        "  (e.g., 'Full time'/'FT' → 'full-time'). Include multiple if explicitly present.\n"
+    ),
+    "job_region": "- job_region: choose ONE OR MORE from Job Regions (if multiple regions are explicitly mentioned); otherwise empty string.map hints or text.\n",
+    "salary": (
+        "- salary: return a normalized string based on the text: "
+        "  • convert 'k' to full numbers with thousand separators (e.g., '90k' → '90,000'); "
+        "  • keep the currency symbol/code; "
+        "  • ranges as '£90,000–£120,000'; "
+        "  • if the text is a lower bound (e.g., 'from £90k'), format as '£90,000+'; "
+        "  • drop non-monetary add-ons like '+ bonus' or 'plus benefits'. If unknown, return empty string.\n"
+    ),
+}
+
+SYSTEM = (
+    _SYSTEM_HEADER
+    + "".join(FIELD_GUIDELINES.values())
+    + "Return JSON with keys: company_name, company_website, job_category, benefits[], job_tags[], job_type[], job_region, salary."
 )
 
 
@@ -52,12 +73,148 @@ CONTROLLED LISTS
 - Job Regions: {regions}
 """
 
-def build_prompt(job_json: str) -> Dict[str, Any]:
-    return {
-        "job_json": job_json,
-        "job_categories": JOB_CATEGORIES,
-        "job_types": JOB_TYPES,
-        "job_tags": JOB_TAGS_WHITELIST,
-        "benefits": BENEFITS_WHITELIST,
-        "regions": REGION_VALUES,
-    }
+def build_prompt(job_json: str, candidates: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    Template inputs. `candidates` (see vocab.matcher.vocab_candidates) replaces
+    the full controlled lists with a per-job subset.
+    """
+    candidates = candidates or {}
+    return {"job_json": job_json, **{name: candidates.get(name, values) for name, values in _lists(get_vocab()).items()}}
+
+@lru_cache(maxsize=8)
+def _lists(vocab: VocabSnapshot) -> Dict[str, List[str]]:
+    return vocab.as_lists()
+
+def prompt_inputs(payload: Dict[str, Any], layout: str = PROMPT_LAYOUT) -> Dict[str, Any]:
+    """
+    Template inputs for one preprocess payload in the configured layout.
+    """
+    job_json = json.dumps(payload, ensure_ascii=False)
+    if layout == "prefilter":
+        return build_prompt(job_json, vocab_candidates(payload))
+    return build_prompt(job_json)
+
+# ── prefix-cache layout ──────────────────────────────────────────────────────
+# Everything static (rules + controlled lists) goes into one byte-identical
+# system message so the provider can serve it from its prompt cache; the job
+# payload is the only thing that varies and comes last.
+
+# controlled list per output field, in prompt order
+_FIELD_VOCAB = {
+    "job_category": ("Job Categories", "job_categories"),
+    "job_type": ("Job Types", "job_types"),
+    "job_tags": ("Job Tags", "job_tags"),
+    "benefits": ("Job Benefits", "benefits"),
+    "job_region": ("Job Regions", "regions"),
+}
+
+_LIST_FIELDS = {"benefits", "job_tags", "job_type"}
+
+def _vocab_block(vocab: VocabSnapshot, fields: Optional[Iterable[str]] = None) -> str:
+    wanted = set(_FIELD_VOCAB if fields is None else fields)
+    lines = [
+        f"- {label}: {json.dumps(list(vocab[name].values), ensure_ascii=False)}\n"
+        for field, (label, name) in _FIELD_VOCAB.items()
+        if field in wanted
+    ]
+    return "CONTROLLED LISTS\n" + "".join(lines) if lines else ""
+
+@lru_cache(maxsize=8)
+def _static_prefix(vocab: VocabSnapshot) -> str:
+    return SYSTEM + "\n\n" + _vocab_block(vocab)
+
+def static_prefix() -> str:
+    """
+    Rules + controlled lists for the current vocab version, byte-identical
+    between calls so the provider can serve it from its prompt cache.
+    """
+    return _static_prefix(get_vocab())
+
+PREFIX_USER_TMPL = """INPUT (free text + hints):
+{job_json}
+"""
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars/token for English prose; providers report the exact count
+    return (len(text or "") + 3) // 4
+
+def prompt_messages(layout: str = PROMPT_LAYOUT) -> list:
+    """
+    Message list for ChatPromptTemplate.from_messages in the given layout.
+    "prefix": static system prefix + payload-only user turn; "legacy": original USER_TMPL;
+    "prefilter": static SYSTEM, then the payload with per-job candidate lists
+    (the lists vary per job, so only SYSTEM is a shared prefix).
+    """
+    if layout == "prefix":
+        # a message object, not a template: the static block is sent verbatim
+        return [SystemMessage(content=static_prefix()), ("user", PREFIX_USER_TMPL)]
+    return [("system", SYSTEM), ("user", USER_TMPL)]
+
+def partial_prompt_messages(fields: Tuple[str, ...], vocab: Optional[VocabSnapshot] = None) -> list:
+    """
+    Shorter gap-filling prompt: only the guidelines and controlled lists for
+    `fields`. Static per field set, so it is prefix-cacheable too.
+    """
+    ordered = [f for f in FIELD_GUIDELINES if f in fields]
+    keys = ", ".join(f + ("[]" if f in _LIST_FIELDS else "") for f in ordered)
+    system = (
+        _SYSTEM_HEADER
+        + "".join(FIELD_GUIDELINES[f] for f in ordered)
+        + f"Return JSON with keys: {keys}."
+    )
+    block = _vocab_block(vocab or get_vocab(), ordered)
+    if block:
+        system += "\n\n" + block
+    return [SystemMessage(content=system), ("user", PREFIX_USER_TMPL)]
+
+# ── packed layout ───────────────────────────────────────────────────────────
+# Several short posts share one call: the static prefix is sent once, followed
+# by the packing rules and a JSON object of id → payload.
+
+_PACKED_RULES = (
+    "\n\nMULTIPLE INPUTS: the user turn is a JSON object mapping item ids to job posts. "
+    "Extract each post on its own; never carry values from one post to another. "
+    "Return JSON {\"items\": [...]} with exactly one entry per input id: its \"id\" plus the keys above."
+)
+
+PACKED_USER_TMPL = """INPUTS (id → free text + hints):
+{jobs_json}
+"""
+
+def packed_prompt_messages() -> list:
+    return [SystemMessage(content=static_prefix() + _PACKED_RULES), ("user", PACKED_USER_TMPL)]
+
+def packed_inputs(payloads: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {"jobs_json": json.dumps(payloads, ensure_ascii=False)}
+
+def packed_static_tokens() -> int:
+    return static_prompt_tokens(layout="packed")
+
+def static_prompt_tokens(layout: str = PROMPT_LAYOUT, fields: Optional[Tuple[str, ...]] = None) -> int:
+    """
+    Estimated tokens of the part of the prompt that is identical for every job
+    (for the partial gap-filling prompt when `fields` is given, for packed
+    calls with layout "packed").
+    """
+    return _static_prompt_tokens(get_vocab(), layout, fields)
+
+@lru_cache(maxsize=256)
+def _static_prompt_tokens(vocab: VocabSnapshot, layout: str, fields: Optional[Tuple[str, ...]]) -> int:
+    if fields is not None:
+        return estimate_tokens(partial_prompt_messages(fields, vocab)[0].content)
+    if layout == "packed":
+        return estimate_tokens(_static_prefix(vocab) + _PACKED_RULES)
+    if layout == "prefix":
+        return estimate_tokens(_static_prefix(vocab))
+    return estimate_tokens(SYSTEM)
+
+@lru_cache(maxsize=8)
+def _prompt_version(vocab: VocabSnapshot) -> str:
+    material = json.dumps([PROMPT_LAYOUT, SYSTEM, USER_TMPL, vocab.version], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:12]
+
+def prompt_version() -> str:
+    """
+    Changes whenever the layout, prompt text or vocab version changes (used in cache keys).
+    """
+    return _prompt_version(get_vocab())
@@ -0,0 +1,409 @@
+# app/normalizer/llm/rate_limit.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.core.config import (
+    LLM_RATE_LIMITS, LLM_RPM, LLM_TPM, LLM_MAX_CONCURRENCY, LLM_MIN_CONCURRENCY,
+    LLM_RATE_MAX_RETRIES, LLM_RATE_MAX_WAIT_SECONDS,
+)
+from app.core.metrics import LLM_CONCURRENCY_LIMIT, LLM_QUEUE_DEPTH, LLM_THROTTLES
+
+log = logging.getLogger("job-normalizer")
+
+T = TypeVar("T")
+
+# a 429 halves the concurrency limit at most once per this many seconds, so one
+# burst of rejections (every in-flight call failing together) counts once
+_DECREASE_COOLDOWN = 2.0
+# pause after a 429 that carries no retry-after header
+_DEFAULT_RETRY_AFTER = 1.0
+# upper bound on one sleep of a queued caller; it re-checks its turn afterwards
+_MAX_SLEEP = 1.0
+
+
+class RateLimitedError(RuntimeError):
+    """
+    Still throttled after LLM_RATE_MAX_RETRIES retries / LLM_RATE_MAX_WAIT_SECONDS.
+    """
+
+
+def rate_limit_details(exc: BaseException) -> Optional[float]:
+    """
+    None unless `exc` is a provider 429; otherwise the retry-after it carried
+    in seconds (0.0 when it carried none).
+    """
+    if getattr(exc, "status_code", None) != 429:
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return 0.0
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return isinstance(exc, RateLimitedError) or rate_limit_details(exc) is not None
+
+
+class TokenBucket:
+    """
+    Continuous refill at `per_minute / 60` per second up to `per_minute`.
+    Reservations may overdraw (the next callers wait the debt off), so a
+    request larger than the bucket is still served eventually.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        if self.level >= min(amount, self.capacity):
+            return 0.0
+        return (min(amount, self.capacity) - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= amount
+
+    def give(self, amount: float) -> None:
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    __slots__ = ("event", "future", "loop")
+
+    def __init__(self):
+        self.event: Optional[threading.Event] = None
+        self.future: Optional[asyncio.Future] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif self.future is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Permit:
+    __slots__ = ("tokens", "released")
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.released = False
+
+
+class ModelLimiter:
+    """
+    Client-side limits for one model: request and token buckets (RPM / TPM)
+    plus an AIMD concurrency limit that halves on 429s and grows by about one
+    per limit's worth of successful calls. Callers queue in arrival order
+    (sync threads and coroutines alike); only the head of the queue may take
+    a slot, so a big request can't be starved by a stream of small ones.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_concurrency: int = 32,
+        min_concurrency: int = 1,
+    ):
+        self.model_id = model_id
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_concurrency = max(1, min(int(min_concurrency), self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._queue: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.queued_total = 0
+        self.wait_seconds = 0.0
+        self.throttles: Dict[str, int] = {"429": 0, "rpm": 0, "tpm": 0, "concurrency": 0, "queue": 0}
+        LLM_CONCURRENCY_LIMIT.set(self.limit, model=model_id)
+
+    # ── admission ──────────────────────────────────────────────────────────
+
+    def _wait_locked(self, tokens: int, now: float) -> Optional[float]:
+        """
+        0 if the head of the queue may go now, seconds to wait for a time-based
+        limit, or None when it has to wait for a slot to be released.
+        """
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        rpm_wait = self.requests.wait_time(1, now)
+        if rpm_wait > 0:
+            return rpm_wait
+        return self.tokens.wait_time(tokens, now)
+
+    def _grant_locked(self, tokens: int, now: float) -> Permit:
+        self._queue.popleft()
+        self.requests.take(1, now)
+        self.tokens.take(tokens, now)
+        self.in_flight += 1
+        self.granted += 1
+        LLM_QUEUE_DEPTH.set(len(self._queue), model=self.model_id)
+        if self._queue:
+            self._queue[0].wake()
+        return Permit(tokens)
+
+    def _reason_locked(self, head: bool, wait: Optional[float], now: float) -> str:
+        if not head:
+            return "queue"
+        if wait is None:
+            return "concurrency"
+        if now < self.paused_until:
+            return "429"
+        return "rpm" if self.requests.wait_time(1, now) > 0 else "tpm"
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        with self._lock:
+            self._queue.append(waiter)
+            LLM_QUEUE_DEPTH.set(len(self._queue), model=self.model_id)
+
+    def _step(self, waiter: _Waiter, tokens: int, counted: list) -> tuple:
+        """
+        One admission attempt: (permit, None) or (None, seconds to sleep).
+        """
+        now = time.monotonic()
+        with self._lock:
+            head = self._queue[0] is waiter
+            wait = self._wait_locked(tokens, now) if head else None
+            if wait == 0:
+                return self._grant_locked(tokens, now), None
+            if not counted:
+                # count each caller that had to wait once, under its first reason
+                counted.append(True)
+                self.queued_total += 1
+                reason = self._reason_locked(head, wait, now)
+                self.throttles[reason] += 1
+                LLM_THROTTLES.inc(model=self.model_id, reason=reason)
+        return None, _MAX_SLEEP if wait is None else min(_MAX_SLEEP, wait)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            head = bool(self._queue) and self._queue[0] is waiter
+            try:
+                self._queue.remove(waiter)
+            except ValueError:
+                return
+            LLM_QUEUE_DEPTH.set(len(self._queue), model=self.model_id)
+            if head and self._queue:
+                self._queue[0].wake()
+
+    def acquire(self, tokens: int) -> Permit:
+        waiter = _Waiter()
+        waiter.event = threading.Event()
+        self._enqueue(waiter)
+        t0, counted = time.monotonic(), []
+        try:
+            while True:
+                permit, sleep = self._step(waiter, tokens, counted)
+                if permit is not None:
+                    self._record_wait(time.monotonic() - t0)
+                    return permit
+                waiter.event.wait(sleep)
+                waiter.event.clear()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def aacquire(self, tokens: int) -> Permit:
+        waiter = _Waiter()
+        waiter.loop = asyncio.get_running_loop()
+        self._enqueue(waiter)
+        t0, counted = time.monotonic(), []
+        try:
+            while True:
+                waiter.future = waiter.loop.create_future()
+                permit, sleep = self._step(waiter, tokens, counted)
+                if permit is not None:
+                    self._record_wait(time.monotonic() - t0)
+                    return permit
+                await asyncio.wait([waiter.future], timeout=sleep)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds += seconds
+
+    # ── feedback ───────────────────────────────────────────────────────────
+
+    def release(self, permit: Permit, used_tokens: Optional[int] = None, throttled: bool = False) -> None:
+        if permit.released:
+            return
+        permit.released = True
+        with self._lock:
+            self.in_flight -= 1
+            if used_tokens is not None:
+                # settle the estimate against what the call actually used
+                self.tokens.give(permit.tokens - used_tokens)
+            if not throttled and self.limit < self.max_concurrency:
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+                LLM_CONCURRENCY_LIMIT.set(self.limit, model=self.model_id)
+            if self._queue:
+                self._queue[0].wake()
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.paused_until = max(self.paused_until, now + (retry_after or _DEFAULT_RETRY_AFTER))
+            if now - self._last_decrease >= _DECREASE_COOLDOWN:
+                self._last_decrease = now
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+                LLM_CONCURRENCY_LIMIT.set(self.limit, model=self.model_id)
+                log.warning(
+                    "429 from %s: concurrency limit -> %d, pausing %.1fs",
+                    self.model_id, int(self.limit), retry_after or _DEFAULT_RETRY_AFTER,
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            return {
+                "concurrency_limit": int(self.limit),
+                "concurrency_max": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "queued": len(self._queue),
+                "rpm": self.requests.capacity or None,
+                "tpm": self.tokens.capacity or None,
+                "requests_available": None if self.requests.unlimited else round(self.requests.level, 1),
+                "tokens_available": None if self.tokens.unlimited else round(self.tokens.level),
+                "paused_for_s": round(max(0.0, self.paused_until - now), 3),
+                "granted": self.granted,
+                "queued_total": self.queued_total,
+                "avg_wait_ms": round(1000 * self.wait_seconds / self.granted, 2) if self.granted else 0.0,
+                "throttles": dict(self.throttles),
+            }
+
+
+def _limits_for(model_id: str) -> Dict[str, float]:
+    try:
+        overrides = json.loads(LLM_RATE_LIMITS) if LLM_RATE_LIMITS else {}
+    except ValueError:
+        log.warning("Ignoring unreadable LLM_RATE_LIMITS")
+        overrides = {}
+    return {"rpm": LLM_RPM, "tpm": LLM_TPM, "max_concurrency": LLM_MAX_CONCURRENCY, **overrides.get(model_id, {})}
+
+
+class RateLimiter:
+    """
+    Process-wide ModelLimiter per model id, created on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, ModelLimiter] = {}
+
+    def model(self, model_id: str) -> ModelLimiter:
+        limiter = self._models.get(model_id)
+        if limiter is None:
+            with self._lock:
+                limiter = self._models.get(model_id)
+                if limiter is None:
+                    limits = _limits_for(model_id)
+                    limiter = ModelLimiter(
+                        model_id, limits["rpm"], limits["tpm"], int(limits["max_concurrency"]), LLM_MIN_CONCURRENCY,
+                    )
+                    self._models[model_id] = limiter
+        return limiter
+
+    def call(self, model_id: str, tokens: int, fn: Callable[[], T], used: Callable[[T], Optional[int]] = lambda _: None) -> T:
+        """
+        Run `fn` under the model's limits. A 429 pauses the model for its
+        retry-after and `fn` is re-queued, up to LLM_RATE_MAX_RETRIES times.
+        """
+        limiter = self.model(model_id)
+        deadline = time.monotonic() + LLM_RATE_MAX_WAIT_SECONDS
+        for attempt in range(LLM_RATE_MAX_RETRIES + 1):
+            permit = limiter.acquire(tokens)
+            try:
+                out = fn()
+            except Exception as e:
+                retry_after = rate_limit_details(e)
+                limiter.release(permit, throttled=retry_after is not None)
+                if retry_after is None:
+                    raise
+                limiter.on_rate_limited(retry_after)
+                if attempt == LLM_RATE_MAX_RETRIES or time.monotonic() > deadline:
+                    raise RateLimitedError(f"{model_id}: still rate limited after {attempt + 1} attempts") from e
+                continue
+            except BaseException:
+                limiter.release(permit, throttled=True)
+                raise
+            limiter.release(permit, used(out))
+            return out
+        raise AssertionError("unreachable")
+
+    async def acall(
+        self, model_id: str, tokens: int, fn: Callable[[], Awaitable[T]], used: Callable[[T], Optional[int]] = lambda _: None
+    ) -> T:
+        limiter = self.model(model_id)
+        deadline = time.monotonic() + LLM_RATE_MAX_WAIT_SECONDS
+        for attempt in range(LLM_RATE_MAX_RETRIES + 1):
+            permit = await limiter.aacquire(tokens)
+            try:
+                out = await fn()
+            except Exception as e:
+                retry_after = rate_limit_details(e)
+                limiter.release(permit, throttled=retry_after is not None)
+                if retry_after is None:
+                    raise
+                limiter.on_rate_limited(retry_after)
+                if attempt == LLM_RATE_MAX_RETRIES or time.monotonic() > deadline:
+                    raise RateLimitedError(f"{model_id}: still rate limited after {attempt + 1} attempts") from e
+                continue
+            except BaseException:
+                limiter.release(permit, throttled=True)
+                raise
+            limiter.release(permit, used(out))
+            return out
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = dict(self._models)
+        return {model_id: limiter.stats() for model_id, limiter in sorted(models.items())}
+
+
+rate_limiter = RateLimiter()
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from functools import lru_cache
+from pydantic import BaseModel, create_model
+from typing import List, Optional, Tuple, Type
 
 class JobOutputSchema(BaseModel):
     company_name: str
@@ -10,3 +11,24 @@ class JobOutputSchema(BaseModel):
     job_region: List[str]
     salary: str
     company_website: Optional[str] = ""  # LLM can fill if it sees it
+
+class PackedJobOutput(JobOutputSchema):
+    id: str
+
+class PackedJobsOutput(BaseModel):
+    """
+    Output of a packed call: one entry per input id (see packed_prompt_messages).
+    """
+    items: List[PackedJobOutput]
+
+@lru_cache(maxsize=None)
+def partial_schema(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Output schema restricted to `fields` (same types as JobOutputSchema),
+    used for gap-filling calls that only ask for the missing fields.
+    """
+    definitions = {}
+    for name in fields:
+        info = JobOutputSchema.model_fields[name]
+        definitions[name] = (info.annotation, info)
+    return create_model("JobOutputPartial", **definitions)
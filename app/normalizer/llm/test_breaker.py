@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.normalizer.llm.breaker import CLOSED, HALF_OPEN, OPEN, CallBudget, CircuitBreaker, CircuitOpenError
+
+
+def _fail():
+    raise TimeoutError("provider down")
+
+
+def test_consecutive_failures_open_and_refuse_without_calling():
+    breaker = CircuitBreaker("m", failures=3, open_seconds=60)
+    calls = []
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            breaker.call(_fail)
+    breaker.call(lambda: "ok")  # a success resets the streak
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            breaker.call(_fail)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert breaker.stats()["opens"] == 1 and breaker.stats()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("m", failures=1, open_seconds=0.0, half_open_probes=1)
+    with pytest.raises(TimeoutError):
+        breaker.call(_fail)
+
+    # open_seconds elapsed: one probe goes through, a second concurrent one is refused
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+
+    assert asyncio.run(breaker.acall(lambda: asyncio.sleep(0, "ok"))) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_frees_its_slot():
+    breaker = CircuitBreaker("m", failures=1, open_seconds=0.0)
+    with pytest.raises(TimeoutError):
+        breaker.call(_fail)
+
+    assert breaker.allow()
+    breaker.record(None)
+
+    assert breaker.state == HALF_OPEN and breaker.allow()
+
+
+def test_call_budget():
+    budget = CallBudget(2)
+
+    assert budget.take() and budget.take() and not budget.take()
+    budget.refund()
+    assert budget.take()
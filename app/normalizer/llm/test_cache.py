@@ -0,0 +1,57 @@
+import time
+
+from app.core.cache import TTLCache
+from app.normalizer.llm.cache import ExtractionCache, SQLiteStore, cache_key
+from app.normalizer.llm.schema import JobOutputSchema
+
+
+def _result(company: str = "Acme") -> JobOutputSchema:
+    return JobOutputSchema(
+        company_name=company, job_category="Engineering", benefits=[], job_tags=["Python"],
+        job_type=["full-time"], job_region=["US"], salary="",
+    )
+
+
+def test_cache_key_ignores_whitespace_and_key_order():
+    a = cache_key({"title": "Dev ", "description": "a  b"}, ["gpt-4o", "gpt-4o-mini"], "v1")
+    b = cache_key({"description": "a b", "title": "Dev"}, ["gpt-4o", "gpt-4o-mini"], "v1")
+
+    assert a == b
+    assert a != cache_key({"title": "Dev", "description": "a b"}, ["gpt-4o", "gpt-4o-mini"], "v2")
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_fresh_memory_tier(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    first = ExtractionCache(TTLCache(10), SQLiteStore(path))
+    first.set("k", _result())
+
+    second = ExtractionCache(TTLCache(10), SQLiteStore(path))
+    assert second.get("k") == _result()
+    assert second.get("k") == _result()
+    assert second.get("missing") is None
+
+    stats = second.stats()
+    assert (stats["hits_disk"], stats["hits_memory"], stats["misses"]) == (1, 1, 1)
+
+
+def test_disk_tier_ttl_and_size_eviction(tmp_path):
+    store = SQLiteStore(str(tmp_path / "llm.sqlite3"), max_entries=3, ttl_seconds=0.05)
+    for i in range(5):
+        store.set(f"k{i}", "{}")
+    store.evict()
+    assert len(store) == 3
+
+    time.sleep(0.1)
+    assert store.get("k4") is None
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from app.normalizer.llm.hedging import FALLBACK, PRIMARY, Hedger
+
+
+def _hedger(delay: float) -> Hedger:
+    hedger = Hedger()
+    hedger.delay = lambda: delay
+    return hedger
+
+
+def test_fast_primary_never_fires_hedge():
+    hedger = _hedger(0.2)
+
+    result, winner = hedger.invoke(lambda: "p", lambda: "f")
+
+    assert (result, winner) == ("p", PRIMARY)
+    assert hedger.stats()["hedges_fired"] == 0
+
+
+def test_slow_primary_loses_to_hedge():
+    hedger = _hedger(0.02)
+
+    def slow():
+        time.sleep(0.3)
+        return "p"
+
+    result, winner = hedger.invoke(slow, lambda: "f")
+
+    assert (result, winner) == ("f", FALLBACK)
+    stats = hedger.stats()
+    assert (stats["hedges_fired"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_failed_primary_falls_back_without_waiting_for_delay():
+    hedger = _hedger(5)
+
+    def boom():
+        raise RuntimeError("primary down")
+
+    t0 = time.perf_counter()
+    result, winner = hedger.invoke(boom, lambda: "f")
+
+    assert (result, winner) == ("f", FALLBACK)
+    assert time.perf_counter() - t0 < 1
+    assert hedger.stats()["fallback_after_error"] == 1
+
+
+def test_async_hedge_cancels_the_loser():
+    hedger = _hedger(0.02)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "p"
+
+    async def fast():
+        return "f"
+
+    async def run():
+        out = await hedger.ainvoke(slow, fast)
+        await asyncio.sleep(0)
+        return out
+
+    assert asyncio.run(run()) == ("f", FALLBACK)
+    assert cancelled == [True]
+
+
+def test_cancelled_primaries_keep_the_delay_up(monkeypatch):
+    import app.normalizer.llm.hedging as hedging
+
+    monkeypatch.setattr(hedging, "HEDGE_MIN_DELAY_MS", 0)
+    hedger = Hedger(percentile=95, window=20)
+    for _ in range(20):
+        hedger.latencies.record(0.03)
+
+    async def fast():
+        return "p"
+
+    async def slow():
+        await asyncio.sleep(1)
+        return "p"
+
+    async def fallback():
+        return "f"
+
+    async def run():
+        # every other primary is slow and cancelled once the hedge wins
+        for i in range(40):
+            await hedger.ainvoke(slow if i % 2 else fast, fallback)
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert hedger.stats()["hedge_wins"] == 20
+    assert hedger.delay() >= 0.03
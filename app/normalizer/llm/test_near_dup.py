@@ -0,0 +1,125 @@
+from app.normalizer.llm.near_dup import NearDupIndex, bands, features, simhash
+from app.normalizer.llm.schema import JobOutputSchema
+
+BASE = (
+    "Lumen Labs builds analytics tooling for logistics teams. You will design REST and GraphQL APIs "
+    "in Python and Django, own our PostgreSQL schema and Redis caches, and ship with Docker and "
+    "Kubernetes on AWS. We want five or more years of backend experience. Fully remote across the US "
+    "with health and dental insurance, a learning budget and flexible hours."
+)
+REPOSTED = BASE.replace("You will design", "You'll design").replace("flexible hours", "flexible working hours")
+OTHER = (
+    "Northwind is hiring a product designer to own onboarding flows in Figma, run usability studies "
+    "and work closely with research. Hybrid in Berlin, German required, relocation support offered."
+)
+
+
+def _result(category="Engineering") -> JobOutputSchema:
+    return JobOutputSchema(
+        company_name="Lumen Labs", company_website="", job_category=category, benefits=[],
+        job_tags=["Python"], job_type=["full-time"], job_region=["USA"], salary="",
+    )
+
+
+def _fp(text, title="Senior Backend Engineer"):
+    return simhash(features(title, text))
+
+
+def test_simhash_distance_tracks_similarity():
+    assert (_fp(BASE) ^ _fp(REPOSTED)).bit_count() <= 8
+    assert (_fp(BASE) ^ _fp(OTHER)).bit_count() > 16
+    assert _fp(BASE) == _fp(BASE)
+
+
+def test_bands_pigeonhole():
+    a = 0xFFFF_0000_FFFF_0000
+    b = a ^ 0b111  # 3 bits apart
+    assert any(x == y for x, y in zip(bands(a, 4), bands(b, 4)))
+
+
+def test_lookup_respects_distance_group_and_version():
+    index = NearDupIndex(":memory:", max_distance=3)
+    fp = _fp(BASE)
+    index.add(fp, "g", "v1", _result())
+
+    match = index.lookup(fp ^ 0b101, "g", "v1")
+    assert match is not None and match.distance == 2 and match.result.job_category == "Engineering"
+    assert index.lookup(fp ^ 0b1111, "g", "v1") is None
+    assert index.lookup(fp, "other-group", "v1") is None
+    assert index.lookup(fp, "g", "v2") is None
+    assert index.stats()["hits"] == 1
+
+
+def test_persists_and_rebands_on_threshold_change(tmp_path):
+    path = str(tmp_path / "near_dup.sqlite3")
+    fp = _fp(BASE)
+    first = NearDupIndex(path, max_distance=3)
+    first.add(fp, "g", "v", _result("Data"))
+    first.close()
+
+    wider = NearDupIndex(path, max_distance=6)
+    match = wider.lookup(fp ^ 0b111111, "g", "v")
+    assert match is not None and match.result.job_category == "Data"
+    assert len(wider) == 1
+
+
+def test_trims_to_max_entries():
+    index = NearDupIndex(":memory:", max_distance=3, max_entries=10)
+    for i in range(25):
+        index.add(i << 40, "g", "v", _result())
+    index.evict()
+    assert len(index) == 10
+    (orphans,) = index._conn.execute(
+        "SELECT COUNT(*) FROM bands WHERE fp_id NOT IN (SELECT id FROM fingerprints)"
+    ).fetchone()
+    assert orphans == 0
+
+
+def test_nodes_reuse_result_for_reposted_job(monkeypatch):
+    import app.normalizer.nodes.near_dup as nodes
+
+    index = NearDupIndex(":memory:", max_distance=8)
+    monkeypatch.setattr(nodes, "get_near_dup_index", lambda: index)
+    monkeypatch.setattr(nodes, "NEAR_DUP_MIN_WORDS", 10)
+
+    payload = {"title": "Senior Backend Engineer", "description": BASE, "provided_company_field": "Lumen Labs"}
+    first = nodes.node_near_dup_lookup({"payload": payload})
+    assert first["near_dup_hit"] is False
+    nodes.node_near_dup_store({**first, "llm_merged": _result("Data")})
+
+    repost = nodes.node_near_dup_lookup({"payload": {**payload, "description": REPOSTED}})
+    assert repost["near_dup_hit"] is True
+    assert repost["llm_merged"].job_category == "Data"
+
+    other_company = nodes.node_near_dup_lookup(
+        {"payload": {**payload, "description": REPOSTED, "provided_company_field": "Other Co"}}
+    )
+    assert other_company["near_dup_hit"] is False
+
+
+def test_same_description_under_another_title_is_not_reused(monkeypatch):
+    import app.normalizer.nodes.near_dup as nodes
+
+    index = NearDupIndex(":memory:", max_distance=5)
+    monkeypatch.setattr(nodes, "get_near_dup_index", lambda: index)
+    monkeypatch.setattr(nodes, "NEAR_DUP_MIN_WORDS", 10)
+
+    description = " ".join([
+        BASE, OTHER,
+        "Our team ships weekly, pairs often, writes tests first, reviews every change, documents decisions, "
+        "mentors juniors, runs blameless postmortems and celebrates small wins together with customers.",
+    ])
+    backend = {"title": "Senior Backend Engineer", "description": description, "provided_company_field": "Lumen Labs"}
+    marketing = {**backend, "title": "Marketing Manager"}
+    # on a long enough description the title barely moves the fingerprint
+    assert (_fp(description, backend["title"]) ^ _fp(description, marketing["title"])).bit_count() <= 5
+
+    first = nodes.node_near_dup_lookup({"payload": backend})
+    nodes.node_near_dup_store({**first, "llm_merged": _result("Engineering")})
+    assert nodes.node_near_dup_lookup({"payload": marketing})["near_dup_hit"] is False
+
+    second = nodes.node_near_dup_lookup({"payload": marketing})
+    nodes.node_near_dup_store({**second, "llm_merged": _result("Marketing")})
+    assert nodes.node_near_dup_lookup({"payload": backend})["llm_merged"].job_category == "Engineering"
+    # case and punctuation in the title don't matter
+    assert nodes.node_near_dup_lookup({"payload": {**backend, "title": "senior backend-engineer"}})["near_dup_hit"] is True
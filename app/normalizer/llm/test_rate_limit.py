@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+import app.normalizer.llm.rate_limit as rl
+from app.normalizer.llm.rate_limit import ModelLimiter, RateLimitedError, RateLimiter, TokenBucket
+
+
+class Throttled(Exception):
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.response = type("Response", (), {"headers": headers})()
+
+
+def test_retry_after_headers():
+    assert rl.rate_limit_details(Throttled({"retry-after-ms": "250"})) == 0.25
+    assert rl.rate_limit_details(Throttled({"retry-after": "3"})) == 3.0
+    assert rl.rate_limit_details(Throttled({})) == 0.0
+    assert rl.rate_limit_details(ValueError("boom")) is None
+    assert rl.is_rate_limited(RateLimitedError("x"))
+
+
+def test_token_bucket_refills_per_minute():
+    bucket = TokenBucket(6)
+    now = bucket.updated
+    bucket.take(6, now)
+
+    assert bucket.wait_time(1, now) == pytest.approx(10.0)
+    assert bucket.wait_time(1, now + 10.0) == 0.0
+    assert TokenBucket(0).wait_time(10 ** 9, now) == 0.0
+
+
+def test_aimd_halves_once_per_burst_and_grows_back():
+    limiter = ModelLimiter("m", max_concurrency=16, min_concurrency=2)
+
+    limiter.on_rate_limited(0.01)
+    limiter.on_rate_limited(0.01)
+    assert limiter.limit == 8
+
+    for _ in range(8):
+        limiter.release(limiter.acquire(1))
+    assert 8.9 < limiter.limit < 9.1
+
+
+def test_async_callers_are_served_in_order_within_the_limit():
+    limiter = ModelLimiter("m", max_concurrency=2)
+    order, peak = [], []
+
+    async def call(i):
+        await asyncio.sleep(0.001 * i)  # arrival order
+        permit = await limiter.aacquire(1)
+        order.append(i)
+        peak.append(limiter.in_flight)
+        await asyncio.sleep(0.02)
+        limiter.release(permit)
+
+    async def main():
+        await asyncio.gather(*(call(i) for i in range(6)))
+
+    asyncio.run(main())
+
+    assert order == list(range(6))
+    assert max(peak) == 2
+    assert limiter.stats()["queued_total"] >= 4
+
+
+def test_call_retries_429_in_place_then_gives_up(monkeypatch):
+    monkeypatch.setattr(rl, "LLM_RATE_MAX_RETRIES", 2)
+    limiter = RateLimiter()
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 2:
+            raise Throttled({"retry-after-ms": "50"})
+        return "ok"
+
+    assert limiter.call("m", 10, flaky) == "ok"
+    assert attempts[1] - attempts[0] >= 0.045
+    assert limiter.stats()["m"]["throttles"]["429"] >= 1
+
+    def always():
+        raise Throttled({"retry-after-ms": "1"})
+
+    with pytest.raises(RateLimitedError):
+        limiter.call("m", 10, always)
+
+    async def broken():
+        raise ValueError("not a 429")
+
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.acall("m", 10, broken))
+    assert limiter.model("m").in_flight == 0
@@ -0,0 +1,70 @@
+import pytest
+
+from app.normalizer.bulk import parse_usage
+from app.normalizer.llm.usage import UsageLedger, call_cost, merge_usage, summarize_calls
+
+
+def _call(model: str, prompt: int, cached: int, completion: int, **extra) -> dict:
+    return {"model": model, "prompt_tokens": prompt, "cached_tokens": cached, "completion_tokens": completion, **extra}
+
+
+def test_cached_prompt_tokens_price_at_cached_rate():
+    # gpt-4o-mini: 0.15 input, 0.075 cached input, 0.60 output per 1M
+    cost = call_cost(_call("gpt-4o-mini", 1_000_000, 400_000, 100_000))
+
+    assert cost == pytest.approx(0.6 * 0.15 + 0.4 * 0.075 + 0.1 * 0.60)
+
+
+def test_dated_snapshot_uses_base_price_and_unknown_model_is_unpriced():
+    assert call_cost(_call("gpt-4o-mini-2024-07-18", 1_000_000, 0, 0)) == pytest.approx(0.15)
+    assert call_cost(_call("some-local-model", 1000, 0, 10)) is None
+    assert call_cost(_call("gpt-4o-mini", 0, 0, 0, unpriced=True)) is None
+
+
+def test_batch_calls_are_discounted():
+    online = call_cost(_call("gpt-4o", 10_000, 0, 1_000))
+
+    assert call_cost(_call("gpt-4o", 10_000, 0, 1_000, batch=True)) == pytest.approx(online * 0.5)
+
+
+def test_summary_and_rollup_per_model():
+    job_a = summarize_calls([_call("gpt-4o-mini", 1200, 1024, 150), _call("gpt-4o", 300, 0, 40)])
+    job_b = summarize_calls([_call("gpt-4o-mini", 900, 0, 120), _call("mystery", 10, 0, 1)])
+    cache_hit = summarize_calls([])
+
+    assert job_a["calls"] == 2 and job_a["cached_tokens"] == 1024
+    assert set(job_a["by_model"]) == {"gpt-4o-mini", "gpt-4o"}
+    assert job_b["unpriced_calls"] == 1
+    assert cache_hit["calls"] == 0 and cache_hit["cost_usd"] == 0
+
+    total = merge_usage([job_a, job_b, cache_hit, None])
+    assert total["jobs"] == 3
+    assert total["prompt_tokens"] == 1200 + 300 + 900 + 10
+    assert total["by_model"]["gpt-4o-mini"]["calls"] == 2
+    assert total["cost_usd"] == pytest.approx(job_a["cost_usd"] + job_b["cost_usd"], abs=1e-6)
+
+
+def test_ledger_totals_per_model():
+    ledger = UsageLedger()
+    ledger.record([_call("gpt-4o-mini", 1000, 0, 100)])
+    ledger.record([])
+
+    stats = ledger.stats()
+    assert stats["jobs"] == 2
+    assert stats["by_model"]["gpt-4o-mini"]["prompt_tokens"] == 1000
+    assert stats["cost_per_job_usd"] == pytest.approx(stats["cost_usd"] / 2, abs=1e-7)
+
+
+def test_parse_usage_reads_batch_output_lines():
+    lines = [
+        {"custom_id": "0", "response": {"status_code": 200, "body": {
+            "model": "gpt-4o-mini-2024-07-18",
+            "usage": {"prompt_tokens": 800, "completion_tokens": 90, "prompt_tokens_details": {"cached_tokens": 512}},
+        }}},
+        {"custom_id": "1", "response": None, "error": {"code": "x"}},
+    ]
+
+    calls = parse_usage(lines, "gpt-4o-mini")
+
+    assert set(calls) == {"0"}
+    assert calls["0"]["cached_tokens"] == 512 and calls["0"]["batch"] is True
@@ -0,0 +1,160 @@
+# app/normalizer/llm/usage.py
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import LLM_PRICES, BATCH_PRICE_FACTOR
+from app.core.metrics import LLM_COST, LLM_TOKENS
+
+log = logging.getLogger("job-normalizer")
+
+# USD per 1M tokens: uncached input, cached input, output
+DEFAULT_PRICES: Dict[str, Dict[str, float]] = {
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+}
+
+_TOKEN_KEYS = ("prompt_tokens", "cached_tokens", "completion_tokens")
+
+
+def _load_prices(raw: str) -> Dict[str, Dict[str, float]]:
+    prices = {k: dict(v) for k, v in DEFAULT_PRICES.items()}
+    if raw:
+        try:
+            for model, entry in json.loads(raw).items():
+                prices[model] = {**prices.get(model, {}), **{k: float(v) for k, v in entry.items()}}
+        except (ValueError, AttributeError, TypeError) as e:
+            log.warning("Ignoring unreadable LLM_PRICES: %s", e)
+    return prices
+
+
+PRICES = _load_prices(LLM_PRICES)
+
+
+def price_for(model: str) -> Optional[Dict[str, float]]:
+    """
+    Exact match first, then the longest configured prefix
+    (dated snapshots like gpt-4o-2024-08-06 price as gpt-4o).
+    """
+    if model in PRICES:
+        return PRICES[model]
+    prefixes = [m for m in PRICES if model.startswith(m + "-")]
+    return PRICES[max(prefixes, key=len)] if prefixes else None
+
+
+def call_cost(record: Dict[str, Any]) -> Optional[float]:
+    # e.g. a losing hedge leg: billed, but its usage never came back
+    if record.get("unpriced"):
+        return None
+    price = price_for(record.get("model") or "")
+    if price is None:
+        return None
+    prompt = record.get("prompt_tokens") or 0
+    cached = min(record.get("cached_tokens") or 0, prompt)
+    cost = (
+        (prompt - cached) * price.get("input", 0.0)
+        + cached * price.get("cached_input", price.get("input", 0.0))
+        + (record.get("completion_tokens") or 0) * price.get("output", 0.0)
+    ) / 1_000_000
+    if record.get("batch"):
+        cost *= BATCH_PRICE_FACTOR
+    return cost
+
+
+def _empty() -> Dict[str, Any]:
+    return {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+
+def summarize_calls(calls: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Token and cost totals for one job's llm_calls, overall and per model.
+    Calls to models missing from the price table count tokens but no cost;
+    so do calls flagged `unpriced`.
+    """
+    out = {**_empty(), "unpriced_calls": 0, "by_model": {}}
+    for record in calls or []:
+        model = record.get("model") or ""
+        cost = call_cost(record)
+        per_model = out["by_model"].setdefault(model, _empty())
+        for bucket in (out, per_model):
+            bucket["calls"] += 1
+            for k in _TOKEN_KEYS:
+                bucket[k] += record.get(k) or 0
+            bucket["cost_usd"] += cost or 0.0
+        if cost is None:
+            out["unpriced_calls"] += 1
+    return _rounded(out)
+
+
+def merge_usage(usages: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Roll several summarize_calls() results (jobs of one request/batch) into one.
+    """
+    out = {**_empty(), "unpriced_calls": 0, "jobs": 0, "by_model": {}}
+    for usage in usages:
+        if not usage:
+            continue
+        out["jobs"] += 1
+        out["unpriced_calls"] += usage.get("unpriced_calls", 0)
+        for k in ("calls", "cost_usd") + _TOKEN_KEYS:
+            out[k] += usage.get(k, 0)
+        for model, per in (usage.get("by_model") or {}).items():
+            bucket = out["by_model"].setdefault(model, _empty())
+            for k in ("calls", "cost_usd") + _TOKEN_KEYS:
+                bucket[k] += per.get(k, 0)
+    return _rounded(out)
+
+
+def _rounded(usage: Dict[str, Any]) -> Dict[str, Any]:
+    usage["cost_usd"] = round(usage["cost_usd"], 6)
+    for per in usage["by_model"].values():
+        per["cost_usd"] = round(per["cost_usd"], 6)
+    return usage
+
+
+class UsageLedger:
+    """
+    Process-wide totals per model since start, fed once per finished job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.by_model: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, calls: Iterable[Dict[str, Any]]) -> None:
+        calls = list(calls or [])
+        with self._lock:
+            self.jobs += 1
+            for record in calls:
+                model = record.get("model") or ""
+                cost = call_cost(record)
+                bucket = self.by_model.setdefault(model, _empty())
+                bucket["calls"] += 1
+                for k in _TOKEN_KEYS:
+                    bucket[k] += record.get(k) or 0
+                bucket["cost_usd"] += cost or 0.0
+        for record in calls:
+            model = record.get("model") or ""
+            for k in _TOKEN_KEYS:
+                LLM_TOKENS.inc(record.get(k) or 0, model=model, kind=k[: -len("_tokens")])
+            LLM_COST.inc(call_cost(record) or 0.0, model=model)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_model = {m: {**v, "cost_usd": round(v["cost_usd"], 6)} for m, v in sorted(self.by_model.items())}
+            jobs = self.jobs
+        total = sum(v["cost_usd"] for v in by_model.values())
+        return {
+            "jobs": jobs,
+            "cost_usd": round(total, 6),
+            "cost_per_job_usd": round(total / jobs, 8) if jobs else 0.0,
+            "by_model": by_model,
+        }
+
+
+usage_ledger = UsageLedger()
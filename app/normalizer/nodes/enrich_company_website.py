@@ -1,8 +1,24 @@
+from app.core.metrics import CACHE_LOOKUPS
 from app.normalizer.state import JobState
-from app.integrations.companies_repo import fetch_company_website
+from app.integrations.companies_repo import fetch_company_website, afetch_company_website
+from app.integrations.company_index import get_company_index
+
+def _index_lookup(state: JobState) -> bool:
+    # in-process index first; the database only sees names it can't place
+    index = get_company_index()
+    company_name = state["normalized"].get("company_name", "")
+    if index is None or not index.loaded:
+        return False
+    match = index.lookup(company_name)
+    CACHE_LOOKUPS.inc(cache="company_index", result="miss" if match is None else "hit")
+    if match is None:
+        return False
+    state["company_website"] = match.company_website
+    state["company_match_score"] = match.score
+    return True
 
 def node_company_website_lookup(state: JobState) -> JobState:
-    if not state.get("needs_company_website_lookup"):
+    if not state.get("needs_company_website_lookup") or _index_lookup(state):
         return state
 
     company_name = state["normalized"].get("company_name", "")
@@ -12,3 +28,18 @@ def node_company_website_lookup(state: JobState) -> JobState:
         state["company_website"] = website
 
     return state
+
+async def anode_company_website_lookup(state: JobState) -> JobState:
+    """
+    Async twin: PostgREST over the pooled async client instead of the blocking sync client.
+    """
+    if not state.get("needs_company_website_lookup") or _index_lookup(state):
+        return state
+
+    company_name = state["normalized"].get("company_name", "")
+    website = await afetch_company_website(company_name)
+
+    if website:
+        state["company_website"] = website
+
+    return state
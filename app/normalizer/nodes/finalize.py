@@ -1,8 +1,12 @@
 from app.normalizer.state import JobState
+from app.normalizer.llm.usage import summarize_calls, usage_ledger
 from typing import Dict, Any
 
 def node_finalize(state: JobState) -> Dict[str, Any]:
     out = dict(state["normalized"])
     out["company_website"] = state.get("company_website", "")
     out["experience_level"] = state.get("experience_level", "")
+    calls = state.get("llm_calls") or []
+    usage_ledger.record(calls)
+    out["llm_usage"] = summarize_calls(calls)
     return out
@@ -0,0 +1,62 @@
+from typing import Optional, Sequence
+
+from app.core.config import FALLBACK_FIELDS
+from app.core.metrics import CACHE_LOOKUPS
+from app.normalizer.state import JobState
+from app.normalizer.llm.cache import cache_key, get_extraction_cache
+from app.normalizer.llm.model import model_ids
+from app.normalizer.llm.prompt import prompt_version
+from app.normalizer.llm.schema import JobOutputSchema
+from app.normalizer.utils.validation import coerce_list
+
+def worth_storing(merged: JobOutputSchema) -> bool:
+    # don't pin the all-empty "every model call failed" result
+    return any([
+        (merged.company_name or "").strip(),
+        (merged.job_category or "").strip(),
+        (merged.salary or "").strip(),
+        coerce_list(merged.job_tags),
+        coerce_list(merged.job_type),
+        coerce_list(merged.job_region),
+        coerce_list(merged.benefits),
+    ])
+
+def extraction_key(payload: dict, models: Sequence[str], fallback_fields: Optional[Sequence[str]] = None) -> str:
+    """
+    Cache key for an extraction made by `models` with gap-fill on `fallback_fields`
+    (the configured FALLBACK_FIELDS when None).
+    """
+    # the gap-fill policy changes what ends up merged, so it is part of the version
+    fields = FALLBACK_FIELDS if fallback_fields is None else fallback_fields
+    return cache_key(payload, models, f"{prompt_version()}:{','.join(fields)}")
+
+def node_llm_cache_lookup(state: JobState) -> JobState:
+    cache = get_extraction_cache()
+    if cache is None:
+        return {**state, "llm_cache_hit": False}
+
+    key = extraction_key(state["payload"], model_ids())
+    cached = cache.get(key)
+    CACHE_LOOKUPS.inc(cache="llm", result="miss" if cached is None else "hit")
+    if cached is None:
+        return {**state, "llm_cache_key": key, "llm_cache_hit": False}
+
+    return {
+        **state,
+        "llm_cache_key": key,
+        "llm_cache_hit": True,
+        "llm_primary": cached,
+        "llm_fallback": None,
+        "llm_merged": cached,
+    }
+
+def node_llm_cache_store(state: JobState) -> JobState:
+    cache = get_extraction_cache()
+    key = state.get("llm_cache_key")
+    merged = state.get("llm_merged")
+    if cache is None or not key or merged is None or state.get("llm_cache_hit"):
+        return state
+
+    if worth_storing(merged):
+        cache.set(key, merged)
+    return state
@@ -1,78 +1,418 @@
-import os
+import asyncio
 import json
-import backoff
-from typing import Optional
+import logging
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+from app.core.config import (
+    FALLBACK_FIELDS, HEDGE_ENABLED, PROMPT_LAYOUT, COMPACT_AGREEMENT_SAMPLE_RATE, LLM_OUTPUT_TOKENS_ESTIMATE,
+    LLM_CALL_BUDGET, LLM_CALL_RETRIES, LLM_RETRY_BASE_SECONDS,
+)
+from app.core.metrics import LLM_CALLS, LLM_FALLBACKS, LLM_RETRIES, LLM_SKIPPED
 from app.normalizer.state import JobState
-from app.normalizer.llm.prompt import SYSTEM, USER_TMPL, build_prompt
-from app.normalizer.llm.model import _model
+from app.normalizer.llm.breaker import CallBudget, CallBudgetExhausted, CircuitBreaker, CircuitOpenError, breakers
+from app.normalizer.llm.prompt import estimate_tokens, prompt_inputs, static_prompt_tokens
+from app.normalizer.llm.hedging import FALLBACK, hedger
+from app.normalizer.llm.model import get_chain, model_ids
+from app.normalizer.llm.rate_limit import is_rate_limited, rate_limiter
 from app.normalizer.llm.schema import JobOutputSchema
+from app.normalizer.nodes.preprocess import build_payload
+from app.normalizer.utils.agreement import field_agreement
+from app.normalizer.utils.compact import compaction_stats
 from app.normalizer.utils.validation import coerce_list
 
-def merge_results(primary: JobOutputSchema, fallback: Optional[JobOutputSchema]) -> JobOutputSchema:
+log = logging.getLogger("job-normalizer")
+
+_LIST_FIELDS = ("benefits", "job_tags", "job_type", "job_region")
+
+def merge_results(
+    primary: JobOutputSchema,
+    fallback: Optional[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+) -> JobOutputSchema:
+    """
+    Per-field merge: prefer primary; if empty, use fallback's value. `fallback`
+    may be a partial result, in which case only `fields` are taken from it.
+    """
     if fallback is None:
         return primary
 
     def first_non_empty(a, b) -> str:
         return (a or "").strip() if (a or "").strip() else (b or "").strip()
 
+    merged = primary.model_dump()
+    for name in (fields if fields is not None else JobOutputSchema.model_fields):
+        if name not in type(fallback).model_fields:
+            continue
+        a, b = getattr(primary, name, None), getattr(fallback, name, None)
+        if name in _LIST_FIELDS:
+            merged[name] = coerce_list(a) or coerce_list(b)
+        else:
+            merged[name] = first_non_empty(a, b)
+    return JobOutputSchema(**merged)
+
+def _empty_result() -> JobOutputSchema:
     return JobOutputSchema(
-        company_name=first_non_empty(primary.company_name, fallback.company_name),
-        company_website=first_non_empty(getattr(primary, "company_website", ""), getattr(fallback, "company_website", "")),
-        job_category=first_non_empty(primary.job_category, fallback.job_category),
-        benefits=coerce_list(primary.benefits) or coerce_list(fallback.benefits),
-        job_tags=coerce_list(primary.job_tags) or coerce_list(fallback.job_tags),
-        job_type=coerce_list(primary.job_type) or coerce_list(fallback.job_type),
-        job_region=coerce_list(primary.job_region) or coerce_list(fallback.job_region),
-        salary=first_non_empty(primary.salary, fallback.salary),
+        company_name="", company_website="", job_category="", benefits=[], job_tags=[],
+        job_type=[], job_region=[], salary=""
     )
 
-@backoff.on_exception(backoff.expo, Exception, max_tries=3)
-def node_llm_extract(state: JobState) -> JobState:
-    payload = state["payload"]
+def missing_fields(result: JobOutputSchema, policy: Iterable[str] = FALLBACK_FIELDS) -> Tuple[str, ...]:
+    """
+    Fields that came back empty AND are worth a second call per FALLBACK_FIELDS.
+    """
+    wanted = set(policy)
+    missing = []
+    for name in JobOutputSchema.model_fields:
+        if name not in wanted:
+            continue
+        value = getattr(result, name, None)
+        empty = not coerce_list(value) if name in _LIST_FIELDS else not (value or "").strip()
+        if empty:
+            missing.append(name)
+    return tuple(missing)
+
+def _estimated_prompt_tokens(inputs: Dict[str, Any], fields: Optional[Tuple[str, ...]] = None) -> int:
+    dynamic = inputs["job_json"] if fields is not None or PROMPT_LAYOUT == "prefix" else json.dumps(inputs, ensure_ascii=False)
+    return static_prompt_tokens(fields=fields) + estimate_tokens(dynamic)
+
+def _used_tokens(out: Any) -> Optional[int]:
+    usage = getattr(out.get("raw"), "usage_metadata", None) if isinstance(out, dict) else None
+    return usage.get("total_tokens") if usage else None
+
+def _call_record(
+    model_id: str, role: str, raw: Any, inputs: Dict[str, Any], fields: Optional[Tuple[str, ...]] = None
+) -> Dict[str, Any]:
+    """
+    Per-call prompt accounting: static vs dynamic input tokens and how many
+    input tokens the provider served from its prompt cache.
+    """
+    usage = getattr(raw, "usage_metadata", None) or {}
+    static_tokens = static_prompt_tokens(fields=fields)
+    prompt_tokens = usage.get("input_tokens")
+    if prompt_tokens is None:
+        prompt_tokens = _estimated_prompt_tokens(inputs, fields)
+    cached_tokens = (usage.get("input_token_details") or {}).get("cache_read") or 0
+    return {
+        "model": model_id,
+        "role": role,
+        "prompt_tokens": prompt_tokens,
+        "static_tokens": static_tokens,
+        "dynamic_tokens": max(0, prompt_tokens - static_tokens),
+        "cached_tokens": cached_tokens,
+        "completion_tokens": usage.get("output_tokens") or 0,
+    }
+
+def _parsed(
+    model_id: str, role: str, out: Any, inputs: Dict[str, Any], calls: List[Dict[str, Any]],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> BaseModel:
+    if not isinstance(out, dict):
+        return out
+    record = _call_record(model_id, role, out.get("raw"), inputs, fields)
+    calls.append(record)
+    log.debug(
+        "llm call model=%s role=%s prompt=%d static=%d dynamic=%d cached=%d",
+        model_id, role, record["prompt_tokens"], record["static_tokens"],
+        record["dynamic_tokens"], record["cached_tokens"],
+    )
+    if out.get("parsed") is None:
+        raise ValueError(f"unparseable structured output: {out.get('parsing_error')}")
+    return out["parsed"]
+
+def _count_call(model_id: str, role: str, fields: Optional[Tuple[str, ...]]) -> None:
+    LLM_CALLS.inc(model=model_id, role=role)
+    if role == "fallback":
+        LLM_FALLBACKS.inc(kind="full" if fields is None else "gap_fill")
+
+def _retry_delay(attempt: int) -> float:
+    # full-jitter exponential backoff: the n-th retry waits up to base * 2**(n-1)
+    return random.uniform(0, LLM_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
 
-    prompt = ChatPromptTemplate.from_messages([("system", SYSTEM), ("user", USER_TMPL)])
-    primary_chain = prompt | _model(os.getenv("PRIMARY_MODEL"))
-    fallback_chain = prompt | _model(os.getenv("FALLBACK_MODEL", "gpt-4o-mini"))
+def _admit(model_id: str, budget: Optional[CallBudget]) -> CircuitBreaker:
+    breaker = breakers.model(model_id)
+    if budget is not None and not budget.take():
+        LLM_SKIPPED.inc(model=model_id, reason="budget")
+        raise CallBudgetExhausted(f"{model_id}: call budget used up")
+    if not breaker.allow():
+        if budget is not None:
+            budget.refund()
+        LLM_SKIPPED.inc(model=model_id, reason="breaker_open")
+        raise CircuitOpenError(f"{model_id}: circuit open")
+    return breaker
 
-    result_primary: Optional[JobOutputSchema] = None
+def _invoke(
+    model_id: str, role: str, inputs: Dict[str, Any], calls: List[Dict[str, Any]],
+    fields: Optional[Tuple[str, ...]] = None, budget: Optional[CallBudget] = None,
+) -> BaseModel:
+    """
+    One model call, refused without calling when the model's breaker is open
+    or `budget` is used up.
+    """
+    breaker = _admit(model_id, budget)
+    ok: Optional[bool] = None
     try:
-        result_primary = primary_chain.invoke(build_prompt(json.dumps(payload, ensure_ascii=False)))
+        _count_call(model_id, role, fields)
+        out = rate_limiter.call(
+            model_id, _estimated_prompt_tokens(inputs, fields) + LLM_OUTPUT_TOKENS_ESTIMATE,
+            lambda: get_chain(model_id, fields).invoke(inputs), _used_tokens,
+        )
+        ok = True
     except Exception:
-        result_primary = None
+        ok = False
+        raise
+    finally:
+        breaker.record(ok)
+    return _parsed(model_id, role, out, inputs, calls, fields)
 
-    if result_primary is None:
+async def _ainvoke(
+    model_id: str, role: str, inputs: Dict[str, Any], calls: List[Dict[str, Any]],
+    fields: Optional[Tuple[str, ...]] = None, budget: Optional[CallBudget] = None,
+) -> BaseModel:
+    breaker = _admit(model_id, budget)
+    ok: Optional[bool] = None
+    try:
+        _count_call(model_id, role, fields)
+        out = await rate_limiter.acall(
+            model_id, _estimated_prompt_tokens(inputs, fields) + LLM_OUTPUT_TOKENS_ESTIMATE,
+            lambda: get_chain(model_id, fields).ainvoke(inputs), _used_tokens,
+        )
+        ok = True
+    except Exception:
+        ok = False
+        raise
+    finally:
+        breaker.record(ok)
+    return _parsed(model_id, role, out, inputs, calls, fields)
+
+def _retryable(exc: Exception) -> bool:
+    # the rate limiter already retried 429s; refused calls would only be refused again
+    return not (is_rate_limited(exc) or isinstance(exc, (CircuitOpenError, CallBudgetExhausted)))
+
+def _attempt(
+    model_id: str, role: str, inputs: Dict[str, Any], calls: List[Dict[str, Any]], budget: CallBudget,
+    fields: Optional[Tuple[str, ...]] = None, retries: int = LLM_CALL_RETRIES,
+) -> Optional[BaseModel]:
+    """
+    `_invoke` plus up to `retries` retries while the budget and the breaker
+    allow them. None if no call succeeded.
+    """
+    for attempt in range(retries + 1):
+        if attempt:
+            LLM_RETRIES.inc(node="llm_extract")
+            time.sleep(_retry_delay(attempt))
         try:
-            result_primary = fallback_chain.invoke(build_prompt(json.dumps(payload, ensure_ascii=False)))
-        except Exception:
-            result_primary = JobOutputSchema(
-                company_name="", company_website="", job_category="", benefits=[], job_tags=[],
-                job_type=[], job_region=[], salary=""
-            )
-
-    needs_fallback = any([
-        not (result_primary.company_name or "").strip(),
-        not (result_primary.job_category or "").strip(),
-        not coerce_list(result_primary.job_region),
-        not coerce_list(result_primary.benefits),
-        not coerce_list(result_primary.job_tags),
-        not coerce_list(result_primary.job_type),
-        not (result_primary.salary or "").strip(),
-    ])
+            return _invoke(model_id, role, inputs, calls, fields, budget)
+        except Exception as e:
+            log.warning("LLM %s call to %s failed: %s", role, model_id, e)
+            if not _retryable(e):
+                return None
+    return None
+
+async def _aattempt(
+    model_id: str, role: str, inputs: Dict[str, Any], calls: List[Dict[str, Any]], budget: CallBudget,
+    fields: Optional[Tuple[str, ...]] = None, retries: int = LLM_CALL_RETRIES,
+) -> Optional[BaseModel]:
+    for attempt in range(retries + 1):
+        if attempt:
+            LLM_RETRIES.inc(node="llm_extract")
+            await asyncio.sleep(_retry_delay(attempt))
+        try:
+            return await _ainvoke(model_id, role, inputs, calls, fields, budget)
+        except Exception as e:
+            log.warning("LLM %s call to %s failed: %s", role, model_id, e)
+            if not _retryable(e):
+                return None
+    return None
+
+def _hedge_leg(
+    model_id: str, role: str, inputs: Dict[str, Any], leg_calls: List[Dict[str, Any]], budget: CallBudget,
+    in_flight: Dict[str, str],
+):
+    def run() -> BaseModel:
+        in_flight[role] = model_id
+        try:
+            return _invoke(model_id, role, inputs, leg_calls, budget=budget)
+        finally:
+            in_flight.pop(role, None)
+    return run
+
+def _ahedge_leg(
+    model_id: str, role: str, inputs: Dict[str, Any], leg_calls: List[Dict[str, Any]], budget: CallBudget,
+    in_flight: Dict[str, str],
+):
+    async def run() -> BaseModel:
+        in_flight[role] = model_id
+        try:
+            return await _ainvoke(model_id, role, inputs, leg_calls, budget=budget)
+        finally:
+            in_flight.pop(role, None)
+    return run
+
+def _hedge_losers(in_flight: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    A leg still running when the hedge is decided was sent and will be billed,
+    but its usage arrives too late (sync) or never (cancelled async): count it
+    as an unpriced call instead of dropping it.
+    """
+    return [
+        {
+            "model": model_id, "role": f"hedge_{role}", "prompt_tokens": 0, "static_tokens": 0,
+            "dynamic_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "unpriced": True,
+        }
+        for role, model_id in list(in_flight.items())
+    ]
+
+def _first_result(
+    primary_id: str, fallback_id: str, inputs: Dict[str, Any], calls: List[Dict[str, Any]], budget: CallBudget,
+) -> Tuple[JobOutputSchema, bool]:
+    """
+    Full extraction: primary model, or the fallback model if the primary
+    fails, its breaker is open (or, with HEDGE_ENABLED, it is slower than the
+    hedge delay). Falls through to the empty result when the fallback is
+    unavailable too. Returns (result, answered_by_fallback).
+    """
+    if HEDGE_ENABLED:
+        primary_calls: List[Dict[str, Any]] = []
+        fallback_calls: List[Dict[str, Any]] = []
+        in_flight: Dict[str, str] = {}
+        # a refused leg fails at once, so the hedger moves on to the other one
+        result, winner = hedger.invoke(
+            _hedge_leg(primary_id, "primary", inputs, primary_calls, budget, in_flight),
+            _hedge_leg(fallback_id, "fallback", inputs, fallback_calls, budget, in_flight),
+        )
+        losers = _hedge_losers(in_flight)
+        calls.extend(primary_calls + fallback_calls + losers)
+        if result is None:
+            return _empty_result(), True
+        return result, winner == FALLBACK
+
+    result = _attempt(primary_id, "primary", inputs, calls, budget)
+    if result is not None:
+        return result, False
+    return _attempt(fallback_id, "fallback", inputs, calls, budget) or _empty_result(), True
+
+async def _afirst_result(
+    primary_id: str, fallback_id: str, inputs: Dict[str, Any], calls: List[Dict[str, Any]], budget: CallBudget,
+) -> Tuple[JobOutputSchema, bool]:
+    if HEDGE_ENABLED:
+        primary_calls: List[Dict[str, Any]] = []
+        fallback_calls: List[Dict[str, Any]] = []
+        in_flight: Dict[str, str] = {}
+        result, winner = await hedger.ainvoke(
+            _ahedge_leg(primary_id, "primary", inputs, primary_calls, budget, in_flight),
+            _ahedge_leg(fallback_id, "fallback", inputs, fallback_calls, budget, in_flight),
+        )
+        # the loser's cancellation lands on the next loop turn, so it is still in flight here
+        losers = _hedge_losers(in_flight)
+        calls.extend(primary_calls + fallback_calls + losers)
+        if result is None:
+            return _empty_result(), True
+        return result, winner == FALLBACK
+
+    result = await _aattempt(primary_id, "primary", inputs, calls, budget)
+    if result is not None:
+        return result, False
+    return await _aattempt(fallback_id, "fallback", inputs, calls, budget) or _empty_result(), True
+
+def node_llm_extract(state: JobState) -> JobState:
+    inputs = prompt_inputs(state["payload"])
+    primary_id, fallback_id = model_ids()
+    # a packed call that could not answer this job already charged its share
+    calls: List[Dict[str, Any]] = list(state.get("llm_calls") or [])
+    # retries live inside the budget: re-running the whole node multiplied calls
+    budget = CallBudget(LLM_CALL_BUDGET)
+
+    result_primary, primary_from_fallback = _first_result(primary_id, fallback_id, inputs, calls, budget)
 
     result_merged = result_primary
     result_fallback = None
-    if needs_fallback:
-        try:
-            result_fallback = fallback_chain.invoke(build_prompt(json.dumps(payload, ensure_ascii=False)))
-        except Exception:
-            result_fallback = None
-        result_merged = merge_results(result_primary, result_fallback)
+    # asking the model that just answered the same input again rarely fills gaps
+    missing = () if primary_from_fallback else missing_fields(result_primary)
+    if missing:
+        result_fallback = _attempt(fallback_id, "fallback", inputs, calls, budget, missing, retries=0)
+        result_merged = merge_results(result_primary, result_fallback, missing)
 
     return {
         **state,
         "llm_primary": result_primary,
         "llm_fallback": result_fallback,
         "llm_merged": result_merged,
+        "llm_calls": calls,
     }
+
+async def anode_llm_extract(state: JobState) -> JobState:
+    """
+    Async twin of node_llm_extract, used when the graph is driven with ainvoke.
+    """
+    inputs = prompt_inputs(state["payload"])
+    primary_id, fallback_id = model_ids()
+    # a packed call that could not answer this job already charged its share
+    calls: List[Dict[str, Any]] = list(state.get("llm_calls") or [])
+    budget = CallBudget(LLM_CALL_BUDGET)
+
+    result_primary, primary_from_fallback = await _afirst_result(primary_id, fallback_id, inputs, calls, budget)
+
+    result_merged = result_primary
+    result_fallback = None
+    # asking the model that just answered the same input again rarely fills gaps
+    missing = () if primary_from_fallback else missing_fields(result_primary)
+    if missing:
+        result_fallback = await _aattempt(fallback_id, "fallback", inputs, calls, budget, missing, retries=0)
+        result_merged = merge_results(result_primary, result_fallback, missing)
+
+    return {
+        **state,
+        "llm_primary": result_primary,
+        "llm_fallback": result_fallback,
+        "llm_merged": result_merged,
+        "llm_calls": calls,
+    }
+
+def _compaction_sampled(state: JobState) -> bool:
+    report = state.get("compaction")
+    return (
+        COMPACT_AGREEMENT_SAMPLE_RATE > 0
+        and bool(report) and report["tokens_saved"] > 0
+        and state.get("llm_merged") is not None
+        and random.random() < COMPACT_AGREEMENT_SAMPLE_RATE
+    )
+
+def _record_compaction_agreement(state: JobState, full: JobOutputSchema) -> None:
+    compacted = state.get("llm_primary") or state["llm_merged"]
+    compaction_stats.record_comparison(field_agreement(compacted, full))
+
+def node_compaction_shadow(state: JobState) -> JobState:
+    """
+    For a sample of compacted jobs: extract again from the full description
+    with the primary model and record field agreement with the compacted run.
+    """
+    if not _compaction_sampled(state):
+        return state
+
+    full_payload, _ = build_payload(state["job_dict"], compact=False)
+    calls = list(state.get("llm_calls") or [])
+    try:
+        full = _invoke(model_ids()[0], "compaction_shadow", prompt_inputs(full_payload), calls)
+    except Exception as e:
+        log.warning("Compaction shadow extraction failed: %s", e)
+        return state
+    _record_compaction_agreement(state, full)
+    return {**state, "llm_calls": calls}
+
+async def anode_compaction_shadow(state: JobState) -> JobState:
+    if not _compaction_sampled(state):
+        return state
+
+    full_payload, _ = build_payload(state["job_dict"], compact=False)
+    calls = list(state.get("llm_calls") or [])
+    try:
+        full = await _ainvoke(model_ids()[0], "compaction_shadow", prompt_inputs(full_payload), calls)
+    except Exception as e:
+        log.warning("Compaction shadow extraction failed: %s", e)
+        return state
+    _record_compaction_agreement(state, full)
+    return {**state, "llm_calls": calls}
@@ -0,0 +1,56 @@
+import hashlib
+import re
+
+from app.core.config import FALLBACK_FIELDS, NEAR_DUP_MIN_WORDS
+from app.core.metrics import CACHE_LOOKUPS
+from app.normalizer.state import JobState
+from app.normalizer.llm.model import model_ids
+from app.normalizer.llm.near_dup import features, get_near_dup_index, simhash
+from app.normalizer.llm.prompt import prompt_version
+from app.normalizer.nodes.llm_cache import worth_storing
+
+def _version() -> str:
+    return f"{prompt_version()}:{','.join(FALLBACK_FIELDS)}:{','.join(model_ids())}"
+
+def _group(payload: dict) -> str:
+    # hints a board can change without changing the description; they must match exactly.
+    # So must the title: it weighs a few features against hundreds from the description,
+    # yet one description under two titles is two different jobs.
+    parts = (payload.get(k) or "" for k in ("provided_company_field", "salary_field", "job_type_hint", "job_region_hint"))
+    title = " ".join(re.findall(r"\w+", (payload.get("title") or "").casefold()))
+    material = "\x1f".join([*(" ".join(p.casefold().split()) for p in parts), title])
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:16]
+
+def node_near_dup_lookup(state: JobState) -> JobState:
+    index = get_near_dup_index()
+    payload = state["payload"]
+    if index is None or len((payload.get("description") or "").split()) < NEAR_DUP_MIN_WORDS:
+        return {**state, "near_dup_hit": False}
+
+    fingerprint = simhash(features(payload.get("title", ""), payload.get("description", "")))
+    group = _group(payload)
+    out = {**state, "near_dup_fingerprint": fingerprint, "near_dup_hit": False}
+    match = index.lookup(fingerprint, group, _version())
+    CACHE_LOOKUPS.inc(cache="near_dup", result="miss" if match is None else "hit")
+    if match is None:
+        return out
+
+    return {
+        **out,
+        "near_dup_hit": True,
+        "near_dup_distance": match.distance,
+        "llm_primary": match.result,
+        "llm_fallback": None,
+        "llm_merged": match.result,
+    }
+
+def node_near_dup_store(state: JobState) -> JobState:
+    index = get_near_dup_index()
+    fingerprint = state.get("near_dup_fingerprint")
+    merged = state.get("llm_merged")
+    if index is None or fingerprint is None or merged is None or state.get("near_dup_hit"):
+        return state
+
+    if worth_storing(merged):
+        index.add(fingerprint, _group(state["payload"]), _version(), merged)
+    return state
@@ -1,13 +1,24 @@
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import COMPACT_ENABLED, COMPACT_TOKEN_BUDGET
 from app.normalizer.state import JobState
+from app.normalizer.utils.compact import compact_description, compaction_stats
 from app.normalizer.utils.text import strip_html
 
-def node_preprocess(state: JobState) -> JobState:
-    job_dict = state["job_dict"]
-
+def build_payload(
+    job_dict: Dict[str, Any], compact: bool = COMPACT_ENABLED
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    LLM payload for a job, plus the compaction report (None when compaction is off).
+    """
     full_text = strip_html(job_dict.get("job_description", ""))
     title = (job_dict.get("job_title") or "").strip()
     salary_field = (job_dict.get("salary") or "").strip()
 
+    report = None
+    if compact:
+        full_text, report = compact_description(full_text, COMPACT_TOKEN_BUDGET, title)
+
     _job_region_raw = job_dict.get("job_region", "")
     job_region_hint = ", ".join(map(str, _job_region_raw)) if isinstance(_job_region_raw, list) else str(_job_region_raw).strip()
 
@@ -24,5 +35,12 @@ def node_preprocess(state: JobState) -> JobState:
         "job_type_hint": job_type_hint,
         "provided_company_field": provided_company,
     }
+    return payload, report
+
+def node_preprocess(state: JobState) -> JobState:
+    payload, report = build_payload(state["job_dict"])
+    if report is None:
+        return {**state, "payload": payload}
 
-    return {**state, "payload": payload}
+    compaction_stats.record(report)
+    return {**state, "payload": payload, "compaction": report}
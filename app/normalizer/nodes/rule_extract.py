@@ -0,0 +1,32 @@
+from app.core.config import RULES_MODE, RULES_CONFIDENCE_THRESHOLD
+from app.normalizer.state import JobState
+from app.normalizer.utils.agreement import field_agreement
+from app.normalizer.utils.rules import rule_extract, rule_stats
+
+def node_rule_extract(state: JobState) -> JobState:
+    if RULES_MODE not in ("shadow", "on"):
+        return state
+
+    result, confidence, _ = rule_extract(state["payload"])
+    bypass = RULES_MODE == "on" and confidence >= RULES_CONFIDENCE_THRESHOLD
+    rule_stats.record_evaluated(bypass)
+
+    out = {**state, "rule_result": result, "rule_confidence": confidence, "rule_bypass": bypass}
+    if bypass:
+        out.update({
+            "llm_primary": result,
+            "llm_fallback": None,
+            "llm_merged": result,
+            "llm_calls": [],
+        })
+    return out
+
+def node_rules_shadow(state: JobState) -> JobState:
+    """
+    After a real LLM extraction: record how well the rule result agreed with it.
+    """
+    rule_result = state.get("rule_result")
+    llm_merged = state.get("llm_merged")
+    if rule_result is not None and llm_merged is not None:
+        rule_stats.record_comparison(state.get("rule_confidence", 0.0), field_agreement(rule_result, llm_merged))
+    return state
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+
+import app.normalizer.nodes.llm_extract as llm_extract
+from app.normalizer.llm.breaker import Breakers
+from app.normalizer.llm.hedging import Hedger
+from app.normalizer.llm.usage import summarize_calls
+from app.normalizer.llm.schema import JobOutputSchema, partial_schema
+from app.normalizer.nodes.llm_extract import merge_results, missing_fields, node_compaction_shadow
+from app.normalizer.utils.compact import CompactionStats
+
+
+def _primary(**overrides) -> JobOutputSchema:
+    values = dict(
+        company_name="Acme", company_website="", job_category="", benefits=[], job_tags=[],
+        job_type=["full-time"], job_region=[], salary="",
+    )
+    values.update(overrides)
+    return JobOutputSchema(**values)
+
+
+def test_missing_fields_follows_policy():
+    primary = _primary()
+
+    assert missing_fields(primary, ("job_category", "job_tags", "salary")) == ("job_category", "job_tags", "salary")
+    # salary/benefits are not gap-filled unless the policy asks for them
+    assert missing_fields(primary, ("company_name", "job_type", "job_region")) == ("job_region",)
+
+
+def test_merge_partial_fallback_only_touches_requested_fields():
+    fields = ("job_category", "job_tags")
+    partial = partial_schema(fields)(job_category="Engineering", job_tags=["Python"])
+
+    merged = merge_results(_primary(salary=" "), partial, fields)
+
+    assert merged.job_category == "Engineering"
+    assert merged.job_tags == ["Python"]
+    assert merged.company_name == "Acme"
+    assert merged.job_type == ["full-time"]
+
+
+def test_merge_full_fallback_prefers_primary():
+    fallback = _primary(company_name="Other", job_category="Data", salary="$1")
+
+    merged = merge_results(_primary(), fallback)
+
+    assert (merged.company_name, merged.job_category, merged.salary) == ("Acme", "Data", "$1")
+
+
+def test_compaction_shadow_records_agreement_on_sample(monkeypatch):
+    seen = []
+
+    class FullDescriptionChain:
+        def invoke(self, inputs):
+            seen.append(inputs)
+            return _primary(job_category="Engineering")
+
+    stats = CompactionStats()
+    monkeypatch.setattr(llm_extract, "COMPACT_AGREEMENT_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(llm_extract, "compaction_stats", stats)
+    monkeypatch.setattr(llm_extract, "get_chain", lambda model_id=None, fields=None: FullDescriptionChain())
+
+    state = {
+        "job_dict": {"job_description": "<p>Python role.</p><p>We use cookies. Accept all cookies?</p>"},
+        "compaction": {"tokens_saved": 10},
+        "llm_primary": _primary(),
+        "llm_merged": _primary(),
+        "llm_calls": [],
+    }
+    node_compaction_shadow(state)
+
+    assert "cookies" in str(seen[0])
+    assert stats.stats()["sample_compared"] == 1
+    assert stats.stats()["sample_field_agreement"]["job_category"] == 0.0
+    assert stats.stats()["sample_field_agreement"]["company_name"] == 1.0
+
+    # nothing saved -> nothing to compare
+    untouched = {**state, "compaction": {"tokens_saved": 0}}
+    assert node_compaction_shadow(untouched) is untouched
+    assert stats.stats()["sample_compared"] == 1
+
+
+class FlakyChain:
+    def __init__(self, model_id, calls, failing):
+        self.model_id, self.calls, self.failing = model_id, calls, failing
+
+    def invoke(self, inputs):
+        self.calls.append(self.model_id)
+        if self.model_id in self.failing:
+            raise TimeoutError(f"{self.model_id} timed out")
+        return _primary(job_category="Engineering", job_tags=["Python"], job_region=["US"])
+
+
+def _extract(monkeypatch, failing, open_models=()):
+    calls = []
+    breakers = Breakers()
+    for model_id in open_models:
+        breaker = breakers.model(model_id)
+        breaker.open_seconds = 60
+        for _ in range(breaker.failure_threshold):
+            breaker.record(False)
+    monkeypatch.setattr(llm_extract, "HEDGE_ENABLED", False)
+    monkeypatch.setattr(llm_extract, "LLM_CALL_BUDGET", 3)
+    monkeypatch.setattr(llm_extract, "LLM_RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(llm_extract, "breakers", breakers)
+    monkeypatch.setattr(llm_extract, "model_ids", lambda: ("primary", "fallback"))
+    monkeypatch.setattr(
+        llm_extract, "get_chain", lambda model_id=None, fields=None: FlakyChain(model_id, calls, failing)
+    )
+    state = llm_extract.node_llm_extract({"payload": {"job_title": "Engineer"}})
+    return state, calls, breakers
+
+
+def test_failing_primary_is_retried_then_falls_back_within_budget(monkeypatch):
+    state, calls, _ = _extract(monkeypatch, failing={"primary", "fallback"})
+
+    # previously the whole node was retried: up to nine calls
+    assert calls == ["primary", "primary", "fallback"]
+    assert state["llm_merged"] == llm_extract._empty_result()
+
+
+def test_open_primary_breaker_goes_straight_to_fallback(monkeypatch):
+    state, calls, breakers = _extract(monkeypatch, failing=set(), open_models=("primary",))
+
+    assert calls == ["fallback"]
+    assert state["llm_merged"].job_category == "Engineering"
+    assert breakers.stats()["primary"]["rejected"] == 1
+
+
+def test_both_breakers_open_fail_fast_to_empty_result(monkeypatch):
+    state, calls, _ = _extract(monkeypatch, failing=set(), open_models=("primary", "fallback"))
+
+    assert calls == []
+    assert state["llm_merged"] == llm_extract._empty_result()
+
+
+class HedgedChain:
+    """
+    Slow primary, fast fallback; answers carry usage like include_raw=True output.
+    """
+
+    def __init__(self, model_id):
+        self.model_id = model_id
+
+    def _out(self):
+        raw = AIMessage(content="{}", usage_metadata={"input_tokens": 500, "output_tokens": 50, "total_tokens": 550})
+        return {"raw": raw, "parsed": _primary(job_category="Engineering", job_tags=["Python"], job_region=["US"])}
+
+    def invoke(self, inputs):
+        if self.model_id == "gpt-4o":
+            time.sleep(0.3)
+        return self._out()
+
+    async def ainvoke(self, inputs):
+        if self.model_id == "gpt-4o":
+            await asyncio.sleep(0.3)
+        return self._out()
+
+
+def _hedged(monkeypatch):
+    hedger = Hedger()
+    hedger.delay = lambda: 0.02
+    monkeypatch.setattr(llm_extract, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(llm_extract, "hedger", hedger)
+    monkeypatch.setattr(llm_extract, "breakers", Breakers())
+    monkeypatch.setattr(llm_extract, "model_ids", lambda: ("gpt-4o", "gpt-4o-mini"))
+    monkeypatch.setattr(llm_extract, "get_chain", lambda model_id=None, fields=None: HedgedChain(model_id))
+
+
+def _assert_loser_counted(calls):
+    assert [(c["model"], c["role"]) for c in calls] == [("gpt-4o-mini", "fallback"), ("gpt-4o", "hedge_primary")]
+    usage = summarize_calls(calls)
+    assert usage["calls"] == 2
+    assert usage["unpriced_calls"] == 1
+    assert usage["prompt_tokens"] == 500
+
+
+def test_losing_sync_hedge_leg_counts_as_unpriced_call(monkeypatch):
+    _hedged(monkeypatch)
+    state = llm_extract.node_llm_extract({"payload": {"job_title": "Engineer"}})
+    _assert_loser_counted(state["llm_calls"])
+
+
+def test_cancelled_async_hedge_leg_counts_as_unpriced_call(monkeypatch):
+    _hedged(monkeypatch)
+    state = asyncio.run(llm_extract.anode_llm_extract({"payload": {"job_title": "Engineer"}}))
+    _assert_loser_counted(state["llm_calls"])
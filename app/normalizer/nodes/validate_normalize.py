@@ -1,9 +1,5 @@
 from app.normalizer.state import JobState
-from app.normalizer.vocab.categories import JOB_CATEGORIES
-from app.normalizer.vocab.tags import JOB_TAGS_WHITELIST
-from app.normalizer.vocab.benefits import BENEFITS_WHITELIST
-from app.normalizer.vocab.types import JOB_TYPES
-from app.normalizer.vocab.regions import REGION_VALUES
+from app.normalizer.vocab.registry import get_vocab
 
 from app.normalizer.utils.company import company_is_valid, normalize_company_shape
 from app.normalizer.utils.validation import validate_one, validate_many, coerce_list
@@ -20,11 +16,12 @@ def node_validate_normalize(state: JobState) -> JobState:
         company_final = provided_company
     company_final = normalize_company_shape(company_final)
 
-    job_category_final = validate_one((llm_merged.job_category or "").strip(), JOB_CATEGORIES)
-    benefits_final = validate_many(coerce_list(llm_merged.benefits), BENEFITS_WHITELIST)
-    job_tags_final = validate_many(coerce_list(llm_merged.job_tags), JOB_TAGS_WHITELIST)
-    job_type_final = validate_many(coerce_list(llm_merged.job_type), JOB_TYPES)
-    job_region_final = validate_many(coerce_list(llm_merged.job_region), REGION_VALUES)
+    vocab = get_vocab()
+    job_category_final = validate_one((llm_merged.job_category or "").strip(), vocab["job_categories"])
+    benefits_final = validate_many(coerce_list(llm_merged.benefits), vocab["benefits"])
+    job_tags_final = validate_many(coerce_list(llm_merged.job_tags), vocab["job_tags"])
+    job_type_final = validate_many(coerce_list(llm_merged.job_type), vocab["job_types"])
+    job_region_final = validate_many(coerce_list(llm_merged.job_region), vocab["regions"])
 
     salary_final = (llm_merged.salary or "").strip()
     min_amt = min_amount_from_llm_salary(salary_final)
@@ -0,0 +1,283 @@
+"""
+Packed extraction: several short job posts answered by one model call.
+
+Every call pays for the static prompt prefix (rules + controlled lists); for
+short posts that overhead dominates. In packed mode a batch first runs the
+pre-LLM part of the graph per job, the jobs that still need the model and
+are short enough are grouped up to a token budget, and each group is sent as
+one id → payload object with a list-of-results schema. Results are split back
+into the per-job states, which then resume the graph after llm_extract. Items
+that come back missing or malformed resume *at* llm_extract instead, i.e.
+they are retried on their own through the normal (single-job) path.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import (
+    PACK_MAX_ITEM_TOKENS, PACK_MAX_ITEMS, PACK_OUTPUT_TOKENS_PER_ITEM, PACK_TOKEN_BUDGET,
+)
+from app.core.metrics import JOBS_IN_FLIGHT, JOBS_TOTAL, LLM_CALLS, LLM_FALLBACKS, LLM_SKIPPED, NODE_SECONDS
+from app.normalizer.llm.breaker import breakers
+from app.normalizer.llm.model import get_packed_chain, model_ids
+from app.normalizer.llm.rate_limit import rate_limiter
+from app.normalizer.llm.prompt import estimate_tokens, packed_inputs, packed_static_tokens
+from app.normalizer.llm.schema import JobOutputSchema
+from app.normalizer.state import JobState
+
+log = logging.getLogger("job-normalizer")
+
+
+def needs_model(state: JobState) -> bool:
+    return not (state.get("llm_cache_hit") or state.get("near_dup_hit") or state.get("rule_bypass"))
+
+
+def payload_tokens(state: JobState) -> int:
+    return estimate_tokens(json.dumps(state["payload"], ensure_ascii=False))
+
+
+def pack_groups(
+    states: Sequence[JobState],
+    budget_tokens: int = PACK_TOKEN_BUDGET,
+    max_items: int = PACK_MAX_ITEMS,
+    max_item_tokens: int = PACK_MAX_ITEM_TOKENS,
+    output_tokens_per_item: int = PACK_OUTPUT_TOKENS_PER_ITEM,
+) -> List[List[int]]:
+    """
+    Indices of the states to extract together, in input order. Each item costs
+    its payload tokens plus the expected output; a group is closed once the
+    next item would exceed `budget_tokens` or `max_items`. Only groups of two
+    or more are returned: anything else is cheaper as a normal call.
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for idx, state in enumerate(states):
+        if not needs_model(state):
+            continue
+        tokens = payload_tokens(state)
+        if tokens > max_item_tokens:
+            continue
+        cost = tokens + output_tokens_per_item
+        if current and (used + cost > budget_tokens or len(current) >= max_items):
+            groups.append(current)
+            current, used = [], 0
+        current.append(idx)
+        used += cost
+    if current:
+        groups.append(current)
+    return [g for g in groups if len(g) > 1]
+
+
+def _raw_items(raw: Any) -> List[Any]:
+    """
+    Item list straight from the raw message, for when the structured parse of
+    the whole answer failed because of one bad item.
+    """
+    for call in getattr(raw, "tool_calls", None) or []:
+        items = (call.get("args") or {}).get("items")
+        if isinstance(items, list):
+            return items
+    try:
+        items = json.loads(getattr(raw, "content", "") or "").get("items")
+    except (ValueError, AttributeError):
+        return []
+    return items if isinstance(items, list) else []
+
+
+def split_items(out: Any, ids: Sequence[str]) -> Dict[str, JobOutputSchema]:
+    """
+    {id: result} for the ids that came back well-formed; duplicates keep the first.
+    """
+    parsed = out.get("parsed") if isinstance(out, dict) else out
+    items: List[Any] = list(parsed.items) if parsed is not None else _raw_items(out.get("raw"))
+    wanted = set(ids)
+    results: Dict[str, JobOutputSchema] = {}
+    for item in items:
+        data = item.model_dump() if hasattr(item, "model_dump") else item
+        if not isinstance(data, dict):
+            continue
+        item_id = str(data.get("id", ""))
+        if item_id not in wanted or item_id in results:
+            continue
+        try:
+            results[item_id] = JobOutputSchema.model_validate({k: v for k, v in data.items() if k != "id"})
+        except ValueError:
+            log.warning("Malformed packed item %s", item_id)
+    return results
+
+
+def _used_tokens(out: Dict[str, Any]) -> Optional[int]:
+    usage = getattr(out.get("raw"), "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def _shares(total: int, weights: Sequence[int]) -> List[int]:
+    # integer split proportional to weights; the remainder goes to the first items
+    if not weights:
+        return []
+    weights = [max(1, w) for w in weights]
+    out = [total * w // sum(weights) for w in weights]
+    for i in range(total - sum(out)):
+        out[i] += 1
+    return out
+
+
+def call_records(
+    model_id: str, role: str, raw: Any, item_tokens: Sequence[int]
+) -> List[Dict[str, Any]]:
+    """
+    One llm_calls record per packed item: the call's tokens split by payload
+    size, so per-job usage still adds up to what the call cost.
+    """
+    n = len(item_tokens)
+    usage = getattr(raw, "usage_metadata", None) or {}
+    prompt = usage.get("input_tokens")
+    static_tokens = packed_static_tokens()
+    if prompt is None:
+        prompt = static_tokens + sum(item_tokens)
+    cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+    completion = usage.get("output_tokens") or 0
+    static = _shares(static_tokens, [1] * n)
+    prompts = _shares(prompt, item_tokens)
+    return [
+        {
+            "model": model_id,
+            "role": role,
+            "prompt_tokens": p,
+            "static_tokens": s,
+            "dynamic_tokens": max(0, p - s),
+            "cached_tokens": c,
+            "completion_tokens": o,
+            "packed_items": n,
+        }
+        for p, s, c, o in zip(prompts, static, _shares(cached, [1] * n), _shares(completion, [1] * n))
+    ]
+
+
+async def aextract_packed(states: Sequence[JobState]) -> List[JobState]:
+    """
+    One packed call (primary model, then the fallback model if that fails or
+    its breaker is open) for `states`. Returns the states with llm_* filled
+    for every item that came back well-formed; the others only carry their
+    share of the call's tokens in llm_calls and are extracted again alone.
+    """
+    ids = [str(i) for i in range(len(states))]
+    item_tokens = [payload_tokens(s) for s in states]
+    inputs = packed_inputs({i: s["payload"] for i, s in zip(ids, states)})
+    primary_id, fallback_id = model_ids()
+
+    t0 = time.perf_counter()
+    out: Optional[Dict[str, Any]] = None
+    try:
+        for model_id, role in ((primary_id, "packed"), (fallback_id, "packed_fallback")):
+            breaker = breakers.model(model_id)
+            if not breaker.allow():
+                LLM_SKIPPED.inc(model=model_id, reason="breaker_open")
+                continue
+            LLM_CALLS.inc(model=model_id, role=role)
+            if role == "packed_fallback":
+                LLM_FALLBACKS.inc(kind="packed")
+            ok: Optional[bool] = None
+            try:
+                out = await rate_limiter.acall(
+                    model_id, packed_static_tokens() + sum(item_tokens) + PACK_OUTPUT_TOKENS_PER_ITEM * len(states),
+                    lambda: get_packed_chain(model_id).ainvoke(inputs), _used_tokens,
+                )
+                ok = True
+                break
+            except Exception as e:
+                ok = False
+                log.warning("Packed call of %d jobs failed on %s: %s", len(states), model_id, e)
+            finally:
+                breaker.record(ok)
+    finally:
+        NODE_SECONDS.observe(time.perf_counter() - t0, node="llm_extract_packed")
+    if out is None:
+        return list(states)
+
+    results = split_items(out, ids)
+    # every item pays its share of the call, answered or not, so per-job usage adds up to the bill
+    records = call_records(model_id, role, out.get("raw"), item_tokens)
+    finished = [{**state, "llm_calls": [record]} for state, record in zip(states, records)]
+    answered = [i for i, item_id in enumerate(ids) if item_id in results]
+    if len(answered) < len(ids):
+        log.info("Packed call answered %d of %d jobs; retrying the rest one by one", len(answered), len(ids))
+    if not answered:
+        return finished
+
+    for i in answered:
+        result = results[ids[i]]
+        finished[i] = {
+            **finished[i],
+            "llm_primary": result,
+            "llm_fallback": None,
+            "llm_merged": result,
+        }
+    return finished
+
+
+async def apack_job_posts(
+    jobs: List[dict], max_concurrency: int
+) -> Tuple[List[dict], Dict[str, Any]]:
+    """
+    anormalize_job_posts in packed mode: same results and stats, plus how many
+    packed calls were made, how many jobs they covered and how many items had
+    to be retried on their own.
+    """
+    from app.normalizer.graph import pre_llm_graph, resume_graph
+
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    in_flight = 0
+    peak = 0
+
+    async def limited(coro_fn, *args):
+        nonlocal in_flight, peak
+        async with sem:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await coro_fn(*args)
+            finally:
+                in_flight -= 1
+
+    states: List[JobState] = list(await asyncio.gather(
+        *(limited(pre_llm_graph.ainvoke, {"job_dict": job}) for job in jobs)
+    ))
+    groups = pack_groups(states)
+    packed = {i for group in groups for i in group}
+    retried = 0
+
+    async def run_group(group: List[int]) -> None:
+        nonlocal retried
+        done = await limited(aextract_packed, [states[i] for i in group])
+        for i, state in zip(group, done):
+            retried += state.get("llm_merged") is None
+            states[i] = state
+
+    await asyncio.gather(*(run_group(g) for g in groups))
+
+    async def resume(state: JobState) -> dict:
+        JOBS_IN_FLIGHT.inc()
+        status = "error"
+        try:
+            result = await resume_graph.ainvoke(state)
+            status = "ok"
+            return result
+        finally:
+            JOBS_IN_FLIGHT.dec()
+            JOBS_TOTAL.inc(status=status)
+
+    # answered jobs go to validation, packed ones on after llm_extract, the rest through llm_extract
+    results = await asyncio.gather(*(limited(resume, state) for state in states))
+    stats = {
+        "max_concurrency": max(1, max_concurrency),
+        "peak_concurrency": peak,
+        "packed_calls": len(groups),
+        "packed_jobs": len(packed),
+        "packed_retried": retried,
+    }
+    return list(results), stats
+
@@ -1,14 +1,26 @@
 # app/normalizer/state.py
-from typing import TypedDict, Optional, Dict, Any
+from typing import TypedDict, Optional, Dict, Any, List
 from app.normalizer.llm.schema import JobOutputSchema
 
 class JobState(TypedDict, total=False):
     job_dict: Dict[str, Any]
     payload: Dict[str, Any]
+    compaction: Dict[str, Any]
+    llm_cache_key: str
+    llm_cache_hit: bool
+    near_dup_fingerprint: int
+    near_dup_hit: bool
+    near_dup_distance: int
+    rule_result: JobOutputSchema
+    rule_confidence: float
+    rule_bypass: bool
     llm_primary: Optional[JobOutputSchema]
     llm_fallback: Optional[JobOutputSchema]
     llm_merged: JobOutputSchema
+    llm_calls: List[Dict[str, Any]]
+    llm_usage: Dict[str, Any]
     normalized: Dict[str, Any]
     company_website: str
+    company_match_score: float
     needs_company_website_lookup: bool
     experience_level: str
@@ -0,0 +1,125 @@
+import json
+
+import app.normalizer.nodes.llm_cache as llm_cache
+from app.normalizer.bulk import LocalBatchService, parse_results, prepare, wait_for, write_jsonl
+
+JOBS = [
+    {
+        "job_title": "Backend Engineer",
+        "company_name": "Acme",
+        "job_type": "Full time",
+        "job_region": "USA",
+        "salary": "$120k - $140k",
+        "job_description": "<p>Python and Django, fully remote.</p>",
+    },
+    {"job_title": "Designer", "job_description": "<p>Figma all day.</p>"},
+]
+
+
+def test_local_batch_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "get_extraction_cache", lambda: None)
+
+    states, requests = prepare(JOBS, model_id="gpt-4o")
+    assert [r["custom_id"] for r in requests] == ["0", "1"]
+    assert requests[0]["url"] == "/v1/chat/completions"
+    assert requests[0]["body"]["model"] == "gpt-4o"
+    assert "Python and Django" in requests[0]["body"]["messages"][-1]["content"]
+
+    input_path = str(tmp_path / "in.jsonl")
+    write_jsonl(input_path, requests)
+    service = LocalBatchService(str(tmp_path / "svc"))
+    batch_id = service.submit(input_path)
+    assert wait_for(service, batch_id, poll_interval=0)["status"] == "completed"
+
+    results = parse_results(service.results(batch_id))
+    assert results["0"].company_name == "Acme"
+    assert results["0"].salary == "$120,000–$140,000"
+    assert results["1"] is not None
+
+
+def test_failed_lines_parse_as_none(tmp_path):
+    def broken(body):
+        raise RuntimeError("nope")
+
+    service = LocalBatchService(str(tmp_path), responder=broken)
+    input_path = str(tmp_path / "in.jsonl")
+    write_jsonl(input_path, [{"custom_id": "7", "method": "POST", "url": "/v1/chat/completions", "body": {}}])
+    batch_id = service.submit(input_path)
+    service.status(batch_id)
+
+    lines = service.results(batch_id)
+    assert json.loads(json.dumps(lines))[0]["error"]["code"] == "local_responder_error"
+    assert parse_results(lines) == {"7": None}
+
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+class Recorder:
+    def __init__(self):
+        self.states = []
+
+    def invoke(self, state):
+        self.states.append(state)
+        return state
+
+
+def _bulk_states(monkeypatch, cache):
+    import app.normalizer.bulk as bulk
+    import app.normalizer.graph as graph
+
+    monkeypatch.setattr(llm_cache, "get_extraction_cache", lambda: cache)
+    monkeypatch.setattr(bulk, "get_extraction_cache", lambda: cache)
+    recorder = Recorder()
+    monkeypatch.setattr(graph, "post_llm_graph", recorder)
+    states, _ = prepare(JOBS[:1], model_id="gpt-4o")
+    states = [{**states[0], "near_dup_fingerprint": 42}]
+    result = parse_results([{
+        "custom_id": "0", "error": None,
+        "response": {"status_code": 200, "body": {"choices": [{"message": {"content": json.dumps({
+            "company_name": "Acme", "company_website": "", "job_category": "", "benefits": [],
+            "job_tags": [], "job_type": [], "job_region": [], "salary": "",
+        })}}]}},
+    }])
+    return states, result, recorder
+
+
+def test_batch_result_is_not_keyed_as_gap_filled(monkeypatch):
+    from app.normalizer.bulk import finish
+
+    states, results, recorder = _bulk_states(monkeypatch, DictCache())
+    online_key = states[0]["llm_cache_key"]
+    finish(states, results, model_id="gpt-4o")
+
+    stored = recorder.states[0]
+    assert stored["llm_cache_key"] == llm_cache.extraction_key(stored["payload"], ["gpt-4o"], fallback_fields=[])
+    assert stored["llm_cache_key"] != online_key
+    assert "near_dup_fingerprint" not in stored
+
+
+def test_local_batch_results_are_not_stored(monkeypatch):
+    from app.normalizer.bulk import finish
+
+    states, results, recorder = _bulk_states(monkeypatch, DictCache())
+    finish(states, results, model_id="gpt-4o", store=LocalBatchService.stores_results)
+    assert recorder.states[0]["llm_cache_key"] == ""
+    assert "near_dup_fingerprint" not in recorder.states[0]
+
+
+def test_prepare_reuses_earlier_batch_result(monkeypatch):
+    cache = DictCache()
+    states, results, _ = _bulk_states(monkeypatch, cache)
+    cache.set(llm_cache.extraction_key(states[0]["payload"], ["gpt-4o"], fallback_fields=[]), results["0"])
+
+    states, requests = prepare(JOBS[:1], model_id="gpt-4o")
+    assert requests == []
+    assert states[0]["llm_cache_hit"]
+    assert states[0]["llm_merged"].company_name == "Acme"
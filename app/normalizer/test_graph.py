@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+import app.normalizer.nodes.llm_cache as llm_cache
+from app.normalizer.graph import job_graph
+from app.normalizer.llm.schema import JobOutputSchema
+
+JOB = {
+    "job_title": "Backend Engineer", "company_name": "Acme", "company_website": "https://acme.io",
+    "job_description": "<p>Python and Django.</p>",
+}
+
+
+class SlowCache:
+    """
+    Blocking SQLite-like lookup that always hits.
+    """
+
+    def get(self, key):
+        time.sleep(0.3)
+        return JobOutputSchema(
+            company_name="Acme", company_website="", job_category="Engineering", benefits=[],
+            job_tags=["Python"], job_type=["full-time"], job_region=["US"], salary="",
+        )
+
+    def set(self, key, value):
+        pass
+
+
+def test_slow_sync_node_does_not_block_the_event_loop(monkeypatch):
+    monkeypatch.setattr(llm_cache, "get_extraction_cache", lambda: SlowCache())
+
+    async def run():
+        # longest stretch the loop went without running the ticker
+        longest, last = 0.0, time.perf_counter()
+        job = asyncio.ensure_future(job_graph.ainvoke({"job_dict": JOB}))
+        while not job.done():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            longest, last = max(longest, now - last), now
+        return await job, longest
+
+    result, longest = asyncio.run(run())
+
+    assert result["llm_cache_hit"] and result["normalized"]["job_category"] == "Engineering"
+    # run inline, the 0.3s lookup would freeze the loop for all of it
+    assert longest < 0.2
@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.core.config as config
+import app.main as main
+from app.api import routes
+from app.normalizer.job_queue import JobQueue, JobWorkerPool, get_job_queue
+
+JOBS = [{"job_description": f"post {i}"} for i in range(3)]
+
+
+def test_submit_lease_complete_round_trip():
+    queue = JobQueue(":memory:")
+    batch_id = queue.submit(JOBS)
+    assert queue.status(batch_id)["status"] == "queued"
+
+    leases = queue.lease(2)
+    assert [l.idx for l in leases] == [0, 1]
+    assert queue.status(batch_id)["status"] == "running"
+    for lease in leases:
+        assert queue.complete(lease, {"echo": lease.job["job_description"]})
+    (last,) = queue.lease(5)
+    queue.complete(last, {"echo": "post 2"})
+
+    status = queue.status(batch_id)
+    assert status["status"] == "done" and status["done"] == 3 and status["pending"] == 0
+    assert [r["result"]["echo"] for r in status["results"]] == ["post 0", "post 1", "post 2"]
+    assert queue.status("missing") is None
+
+
+def test_expired_lease_is_retried_and_stale_worker_cannot_complete():
+    queue = JobQueue(":memory:", visibility_timeout=0.01, max_attempts=2)
+    batch_id = queue.submit(JOBS[:1])
+    (first,) = queue.lease()
+    assert queue.lease() == []
+    time.sleep(0.02)
+
+    (second,) = queue.lease()
+    assert second.attempts == 2
+    assert not queue.complete(first, {"late": True})
+    assert queue.complete(second, {"ok": True})
+    assert queue.status(batch_id)["results"] == [{"index": 0, "result": {"ok": True}}]
+
+
+def test_failures_requeue_until_attempts_run_out():
+    queue = JobQueue(":memory:", max_attempts=2)
+    batch_id = queue.submit(JOBS[:1])
+    (lease,) = queue.lease()
+    queue.fail(lease, "boom")
+    (lease,) = queue.lease()
+    queue.fail(lease, "boom")
+
+    assert queue.lease() == []
+    status = queue.status(batch_id)
+    assert status["status"] == "done" and status["failed"] == 1
+    assert status["results"] == [{"index": 0, "error": "boom"}]
+
+
+def test_crashed_worker_exhausting_attempts_fails_item():
+    queue = JobQueue(":memory:", visibility_timeout=0.0, max_attempts=1)
+    batch_id = queue.submit(JOBS[:1])
+    queue.lease()  # never settled
+    time.sleep(0.01)
+    assert queue.lease() == []
+    assert queue.status(batch_id)["results"] == [{"index": 0, "error": "lease_expired"}]
+
+
+def test_purge_after_retention():
+    queue = JobQueue(":memory:", retention_seconds=0.01)
+    done = queue.submit([])
+    running = queue.submit(JOBS[:1])
+    time.sleep(0.02)
+    assert queue.purge() == 1
+    assert queue.status(done) is None
+    assert queue.status(running) is not None
+
+
+def test_worker_pool_drains_queue():
+    queue = JobQueue(":memory:")
+    calls = []
+
+    async def process(job):
+        calls.append(job["job_description"])
+        if job["job_description"] == "post 1" and calls.count("post 1") == 1:
+            raise RuntimeError("transient")
+        return {"ok": job["job_description"]}
+
+    async def run():
+        batch_id = queue.submit(JOBS)
+        pool = JobWorkerPool(queue, workers=2, process=process, poll_interval=0.01)
+        pool.start()
+        for _ in range(200):
+            if queue.status(batch_id, include_results=False)["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return queue.status(batch_id)
+
+    status = asyncio.run(run())
+    assert status["done"] == 3 and status["failed"] == 0
+    assert calls.count("post 1") == 2
+
+
+def test_queue_is_off_without_an_explicit_path(monkeypatch):
+    monkeypatch.setattr(config, "JOB_QUEUE_PATH", "")
+    assert get_job_queue() is None
+
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+    assert client.post("/jobs", json=[{"job_description": "post"}]).status_code == 503
+    assert client.get("/jobs/abc").status_code == 503
+    assert client.get("/stats/job-queue").json() == {"enabled": False}
+
+
+def test_workers_refuse_to_start_without_a_queue_path(monkeypatch):
+    monkeypatch.setattr(main, "JOB_WORKERS", 2)
+    monkeypatch.setattr(main, "get_job_queue", lambda: None)
+    with pytest.raises(RuntimeError, match="JOB_QUEUE_PATH"):
+        asyncio.run(main.start_job_workers())
+    assert main.job_workers is None
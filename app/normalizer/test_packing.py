@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+
+import app.normalizer.nodes.llm_cache as llm_cache
+import app.normalizer.nodes.llm_extract as llm_extract
+import app.normalizer.packing as packing
+from app.normalizer import anormalize_job_posts
+from app.normalizer.llm.schema import JobOutputSchema
+
+FIELDS = dict(
+    company_website="", job_category="Engineering", benefits=[], job_tags=["Python"],
+    job_type=["full-time"], job_region=["US"], salary="",
+)
+JOBS = [
+    {"job_title": f"Engineer {i}", "company_name": f"Co{i}", "company_website": f"https://co{i}.io",
+     "job_description": f"<p>Python role number {i}.</p>"}
+    for i in range(3)
+]
+
+
+def _state(tokens: int, **extra) -> dict:
+    return {"payload": {"job_description": "x" * (4 * tokens - 30)}, **extra}
+
+
+def test_pack_groups_fill_budget_and_skip_long_or_answered_posts():
+    states = [_state(100), _state(100), _state(5000), _state(100, llm_cache_hit=True), _state(100), _state(100)]
+
+    groups = packing.pack_groups(states, budget_tokens=500, max_items=8, max_item_tokens=600, output_tokens_per_item=120)
+
+    assert groups == [[0, 1], [4, 5]]
+    assert packing.pack_groups(states[:2] + states[4:], 10_000, 3, 600, 120) == [[0, 1, 2]]
+
+
+def test_only_missing_or_malformed_items_are_retried_alone(monkeypatch):
+    packed_inputs, single_inputs = [], []
+
+    class PackedChain:
+        async def ainvoke(self, inputs):
+            packed_inputs.append(json.loads(inputs["jobs_json"]))
+            # "1" is malformed (job_tags not a list), "2" is missing
+            content = json.dumps({"items": [
+                {"id": "0", "company_name": "Co0", **FIELDS},
+                {"id": "1", "company_name": "Co1", **{**FIELDS, "job_tags": 5}},
+            ]})
+            raw = AIMessage(content=content, usage_metadata={"input_tokens": 900, "output_tokens": 80, "total_tokens": 980})
+            return {"raw": raw, "parsed": None, "parsing_error": "items.1.job_tags"}
+
+    class SingleChain:
+        async def ainvoke(self, inputs):
+            single_inputs.append(inputs["job_json"])
+            return JobOutputSchema(company_name="Single", **FIELDS)
+
+    monkeypatch.setattr(llm_cache, "get_extraction_cache", lambda: None)
+    monkeypatch.setattr(packing, "get_packed_chain", lambda model_id=None: PackedChain())
+    monkeypatch.setattr(llm_extract, "get_chain", lambda model_id=None, fields=None: SingleChain())
+
+    results, stats = asyncio.run(anormalize_job_posts(JOBS, 4, pack=True))
+
+    assert len(packed_inputs) == 1 and sorted(packed_inputs[0]) == ["0", "1", "2"]
+    assert stats["packed_calls"] == 1 and stats["packed_retried"] == 2
+    assert len(single_inputs) == 2 and all("Engineer 0" not in s for s in single_inputs)
+    assert results[0]["llm_merged"].company_name == "Co0"
+    assert results[1]["llm_merged"].company_name == "Single"
+    assert results[2]["llm_merged"].company_name == "Single"
+    # the packed call's tokens are shared by all its items, retried ones included
+    packed = [r["llm_calls"][0] for r in results]
+    assert all(c["role"] == "packed" for c in packed)
+    assert sum(c["prompt_tokens"] for c in packed) == 900
+
+
+def test_unparseable_answer_retries_every_item_alone(monkeypatch):
+    single_inputs = []
+
+    class PackedChain:
+        async def ainvoke(self, inputs):
+            raw = AIMessage(content="not json", usage_metadata={"input_tokens": 900, "output_tokens": 80, "total_tokens": 980})
+            return {"raw": raw, "parsed": None, "parsing_error": "Invalid JSON"}
+
+    class SingleChain:
+        async def ainvoke(self, inputs):
+            single_inputs.append(inputs["job_json"])
+            return JobOutputSchema(company_name="Single", **FIELDS)
+
+    monkeypatch.setattr(llm_cache, "get_extraction_cache", lambda: None)
+    monkeypatch.setattr(packing, "get_packed_chain", lambda model_id=None: PackedChain())
+    monkeypatch.setattr(llm_extract, "get_chain", lambda model_id=None, fields=None: SingleChain())
+
+    results, stats = asyncio.run(anormalize_job_posts(JOBS, 4, pack=True))
+
+    assert stats["packed_calls"] == 1 and stats["packed_retried"] == 3
+    assert len(single_inputs) == 3
+    assert all(r["llm_merged"].company_name == "Single" for r in results)
+    assert sum(r["llm_calls"][0]["prompt_tokens"] for r in results) == 900
+    assert packing._shares(10, []) == []
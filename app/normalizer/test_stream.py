@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.normalizer as normalizer
+from app.api import routes
+from app.normalizer import astream_job_posts
+
+
+def _jobs(n):
+    return [{"job_title": f"Job {i}", "job_description": f"<p>Role {i}</p>", "delay": 0.0} for i in range(n)]
+
+
+def _fake_worker(monkeypatch, started=None, cancelled=None, failing=()):
+    async def anormalize_job_post(job):
+        if started is not None:
+            started.append(job["job_title"])
+        try:
+            await asyncio.sleep(job.get("delay", 0.0))
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(job["job_title"])
+            raise
+        if job["job_title"] in failing:
+            raise RuntimeError("boom")
+        return {"job_title": job["job_title"]}
+
+    async def no_prefetch(jobs):
+        return None
+
+    monkeypatch.setattr(normalizer, "anormalize_job_post", anormalize_job_post)
+    monkeypatch.setattr(normalizer, "_prefetch_company_websites", no_prefetch)
+
+
+async def _collect(jobs, **kwargs):
+    return [item async for item in astream_job_posts(jobs, **kwargs)]
+
+
+def test_results_arrive_in_completion_order_tagged_with_their_index(monkeypatch):
+    _fake_worker(monkeypatch)
+    jobs = _jobs(3)
+    for job, delay in zip(jobs, (0.1, 0.0, 0.05)):
+        job["delay"] = delay
+
+    items = asyncio.run(_collect(jobs, max_concurrency=3))
+
+    assert [idx for idx, _, _ in items] == [1, 2, 0]
+    assert all(result == {"job_title": f"Job {idx}"} for idx, result, _ in items)
+
+
+def test_failing_job_yields_an_error_and_the_stream_goes_on(monkeypatch):
+    _fake_worker(monkeypatch, failing={"Job 1"})
+
+    items = asyncio.run(_collect(_jobs(4), max_concurrency=1))
+
+    assert [idx for idx, _, _ in items] == [0, 1, 2, 3]
+    idx, result, error = items[1]
+    assert result is None and isinstance(error, RuntimeError)
+
+
+def test_route_streams_error_lines_without_ending_the_stream(monkeypatch):
+    _fake_worker(monkeypatch, failing={"Job 0"})
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    response = TestClient(app).post("/normalize-job/stream", json=_jobs(3))
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert {"index": 0, "error": "internal_error"} in lines
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert all("result" in line for line in lines if line["index"] != 0)
+
+
+def test_slow_consumer_blocks_workers_on_the_full_buffer(monkeypatch):
+    started = []
+    _fake_worker(monkeypatch, started=started)
+
+    async def run():
+        stream = astream_job_posts(_jobs(20), max_concurrency=4, buffer_size=2)
+        first = await stream.__anext__()
+        await asyncio.sleep(0.05)
+        # one consumed, two buffered, one finished result held by each blocked worker
+        stalled = len(started)
+        rest = [item async for item in stream]
+        return first, stalled, rest
+
+    first, stalled, rest = asyncio.run(run())
+
+    assert stalled == 1 + 2 + 4
+    assert len(rest) == 19 and len(started) == 20
+
+
+def test_closing_the_stream_cancels_remaining_workers(monkeypatch):
+    started, cancelled = [], []
+    _fake_worker(monkeypatch, started=started, cancelled=cancelled)
+    jobs = _jobs(6)
+    for job in jobs[1:]:
+        job["delay"] = 10.0
+
+    async def run():
+        stream = astream_job_posts(jobs, max_concurrency=3)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    first = asyncio.run(asyncio.wait_for(run(), timeout=2))
+
+    assert first[0] == 0
+    # every slow job in flight was cancelled; the rest never started
+    assert {"Job 1", "Job 2"} <= set(cancelled)
+    assert sorted(cancelled) == sorted(started[1:])
+    assert "Job 5" not in started
+
+
+def test_route_returns_only_the_public_state(monkeypatch):
+    async def anormalize_job_post(job):
+        return {
+            "normalized": {"job_title": job["job_title"]}, "company_website": "", "experience_level": "",
+            "payload": {}, "llm_calls": [], "llm_cache_hit": False, "rule_bypass": False, "llm_usage": {"calls": 0},
+        }
+
+    monkeypatch.setattr(normalizer, "anormalize_job_post", anormalize_job_post)
+    monkeypatch.setattr(routes, "LLM_USAGE_IN_RESPONSE", False)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    (line,) = [json.loads(line) for line in TestClient(app).post("/normalize-job/stream", json=_jobs(1)).text.splitlines()]
+    assert sorted(line["result"]) == ["company_website", "experience_level", "normalized", "payload"]
+
+    monkeypatch.setattr(routes, "LLM_USAGE_IN_RESPONSE", True)
+    assert routes._public({"normalized": {}, "llm_usage": {"calls": 0}, "near_dup_hit": True}) == {
+        "normalized": {}, "llm_usage": {"calls": 0},
+    }
@@ -0,0 +1,35 @@
+from app.normalizer.warmup import FAILED, Warmup, default_phases
+
+
+def test_phases_are_timed_and_optional_failures_do_not_block_readiness():
+    warmup = Warmup()
+    ran = []
+
+    def broken():
+        raise RuntimeError("no credentials")
+
+    ready = warmup.run([("graph", lambda: ran.append("graph"), True), ("supabase_clients", broken, False)])
+
+    assert ready and warmup.status()["status"] == "ready"
+    assert set(warmup.status()["phases_s"]) == {"graph", "supabase_clients"}
+    assert warmup.status()["errors"] == {"supabase_clients": "no credentials"}
+    # runs once
+    assert warmup.run([("graph", lambda: ran.append("again"), True)]) and ran == ["graph"]
+
+
+def test_failed_required_phase_stops_and_stays_not_ready():
+    warmup = Warmup()
+    ran = []
+
+    def broken():
+        raise RuntimeError("boom")
+
+    assert not warmup.run([("graph", broken, True), ("vocab", lambda: ran.append("vocab"), False)])
+    assert warmup.state == FAILED and ran == []
+
+
+def test_default_phases_compile_the_graph():
+    warmup = Warmup()
+
+    assert warmup.run([p for p in default_phases(prime_caches=False) if p[0] in ("graph", "vocab")])
+    assert [name for name, _, _ in default_phases(prime_caches=True)][-1] == "caches"
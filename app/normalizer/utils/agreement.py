@@ -0,0 +1,35 @@
+from typing import Dict, Iterable, Optional
+
+from pydantic import BaseModel
+from app.normalizer.utils.salary import min_amount_from_llm_salary
+from app.normalizer.utils.validation import coerce_list
+
+COMPARED_FIELDS = ("company_name", "job_category", "job_type", "job_region", "salary", "job_tags", "benefits")
+
+_LIST_FIELDS = {"benefits", "job_tags", "job_type", "job_region"}
+
+def _same_salary(a: str, b: str) -> bool:
+    a, b = (a or "").strip(), (b or "").strip()
+    if not a or not b:
+        return a == b
+    amount_a, amount_b = min_amount_from_llm_salary(a), min_amount_from_llm_salary(b)
+    if amount_a is not None and amount_b is not None:
+        return amount_a == amount_b
+    return "".join(a.split()).casefold() == "".join(b.split()).casefold()
+
+def field_agreement(
+    a: BaseModel, b: BaseModel, fields: Optional[Iterable[str]] = None
+) -> Dict[str, bool]:
+    """
+    Per-field agreement of two extraction results (case-insensitive; lists as sets).
+    """
+    out = {}
+    for name in fields or COMPARED_FIELDS:
+        va, vb = getattr(a, name, None), getattr(b, name, None)
+        if name in _LIST_FIELDS:
+            out[name] = {v.strip().casefold() for v in coerce_list(va)} == {v.strip().casefold() for v in coerce_list(vb)}
+        elif name == "salary":
+            out[name] = _same_salary(va, vb)
+        else:
+            out[name] = (va or "").strip().casefold() == (vb or "").strip().casefold()
+    return out
@@ -0,0 +1,202 @@
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+
+from app.normalizer.llm.prompt import estimate_tokens
+from app.normalizer.utils.rules import normalize_salary_hint
+from app.normalizer.vocab.matcher import get_vocab_matcher
+
+# segments that never carry an extracted field: EEO / legal notices, cookie
+# banners, application-form chrome
+_BOILERPLATE = re.compile(
+    r"equal (?:employment )?opportunity|affirmative action|without regard to (?:race|color|religion|sex|gender|age|national origin|disability)"
+    r"|reasonable accommodations?|protected veteran|e-verify|pay transparency nondiscrimination"
+    r"|\bwe use cookies\b|(?:site|website) uses cookies|accept (?:all )?cookies|cookie (?:policy|settings|preferences)"
+    r"|by (?:applying|submitting)\b.*\bprivacy|privacy (?:policy|notice)\b.*\b(?:applicant|candidate)s?"
+    r"|unsolicited (?:resumes|cvs)|recruitment agenc(?:y|ies)",
+    re.IGNORECASE,
+)
+_CHROME = re.compile(
+    r"^(?:apply(?: now| for this job)?|share(?: this job)?|save(?: job)?|back to (?:all )?jobs"
+    r"|report (?:this )?job|sign in|log in|show more|read more|similar jobs)[.!]?$",
+    re.IGNORECASE,
+)
+# words that usually introduce a field the model has to fill
+_CUES = re.compile(
+    r"\b(?:salary|compensation|pay|equity|benefits?|perks|remote|hybrid|on-?site|office|location|based in"
+    r"|time ?zones?|relocat\w*|visa|requirements|qualifications|experience|years|stack|tech|full[- ]time"
+    r"|part[- ]time|contract|freelance|internship)\b",
+    re.IGNORECASE,
+)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9])")
+_WORD = re.compile(r"[A-Za-z0-9+#]{3,}")
+
+# lines longer than this are split into sentences before scoring
+_MAX_SEGMENT_CHARS = 400
+# a truncated segment must still carry at least this many tokens to be worth keeping
+_MIN_TAIL_TOKENS = 24
+
+
+def segments(text: str) -> List[str]:
+    out = []
+    for line in (text or "").split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) > _MAX_SEGMENT_CHARS:
+            out.extend(s.strip() for s in _SENTENCE.split(line) if s.strip())
+        else:
+            out.append(line)
+    return out
+
+
+def _boilerplate_sentence(sentence: str) -> bool:
+    return bool(_BOILERPLATE.search(sentence)) and normalize_salary_hint(sentence) is None
+
+
+def drop_boilerplate(segment: str) -> str:
+    """
+    The segment without its boilerplate sentences ("" if nothing else is left).
+    Judged per sentence: a short paragraph of real requirements that ends with
+    an EEO line keeps the requirements.
+    """
+    if _CHROME.match(segment):
+        return ""
+    if not _BOILERPLATE.search(segment):
+        return segment
+    sentences = (s.strip() for s in _SENTENCE.split(segment))
+    return " ".join(s for s in sentences if s and not _boilerplate_sentence(s))
+
+
+def is_boilerplate(segment: str) -> bool:
+    return not drop_boilerplate(segment)
+
+
+def score_segment(segment: str, title_words: frozenset, first: bool = False) -> float:
+    """
+    Relevance to the extracted fields: salary, controlled-vocabulary hits
+    (stack, benefits, regions, job types), field cue words, title overlap.
+    """
+    score = 5.0 if normalize_salary_hint(segment) is not None else 0.0
+    score += min(6.0, 1.5 * len(get_vocab_matcher().hits(segment)))
+    score += min(3.0, len(_CUES.findall(segment)))
+    if title_words:
+        score += min(2.0, len(title_words.intersection(w.casefold() for w in _WORD.findall(segment))))
+    if first:
+        # the opening line usually names the company
+        score += 2.0
+    return score
+
+
+def _truncate(segment: str, max_tokens: int) -> str:
+    cut = segment[: max_tokens * 4]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > 0 else cut).rstrip(" ,;:") + " …"
+
+
+def compact_description(
+    text: str, budget_tokens: int, title: str = ""
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Drop boilerplate and repeated segments, then, if the description is still
+    over `budget_tokens`, keep the most relevant segments (in their original
+    order) until the budget is spent. Returns (text, report).
+    """
+    before = estimate_tokens(text or "")
+    report = {
+        "tokens_before": before, "tokens_after": before, "tokens_saved": 0,
+        "boilerplate_dropped": 0, "duplicates_dropped": 0, "budget_dropped": 0, "truncated": False,
+    }
+    if not text:
+        return "", report
+
+    kept: List[str] = []
+    seen = set()
+    for seg in segments(text):
+        key = " ".join(seg.casefold().split())
+        if key in seen:
+            report["duplicates_dropped"] += 1
+            continue
+        content = drop_boilerplate(seg)
+        if content != seg:
+            report["boilerplate_dropped"] += 1
+        if content:
+            seen.add(key)
+            kept.append(content)
+
+    out = "\n".join(kept)
+    if budget_tokens > 0 and estimate_tokens(out) > budget_tokens:
+        title_words = frozenset(w.casefold() for w in _WORD.findall(title or ""))
+        tokens = [estimate_tokens(seg) + 1 for seg in kept]
+        # relevance per token (sqrt-damped) so one long paragraph can't crowd out short, dense lines
+        order = sorted(
+            range(len(kept)),
+            key=lambda i: (-score_segment(kept[i], title_words, i == 0) / max(1, tokens[i]) ** 0.5, i),
+        )
+        chosen: Dict[int, str] = {}
+        left = budget_tokens
+        for i in order:
+            if tokens[i] <= left:
+                chosen[i] = kept[i]
+                left -= tokens[i]
+            elif left >= _MIN_TAIL_TOKENS and not report["truncated"]:
+                chosen[i] = _truncate(kept[i], left - 1)
+                left = 0
+                report["truncated"] = True
+        report["budget_dropped"] = len(kept) - len(chosen)
+        out = "\n".join(chosen[i] for i in sorted(chosen))
+
+    report["tokens_after"] = estimate_tokens(out)
+    report["tokens_saved"] = before - report["tokens_after"]
+    return out, report
+
+
+class CompactionStats:
+    """
+    Tokens saved by compaction, and how often an extraction from the compacted
+    description agreed with one from the full description (sampled).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.compacted = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.compared = 0
+        self.all_fields_agree = 0
+        self.field_agree: Dict[str, int] = {}
+
+    def record(self, report: Dict[str, Any]) -> None:
+        with self._lock:
+            self.jobs += 1
+            self.compacted += int(report["tokens_saved"] > 0)
+            self.tokens_before += report["tokens_before"]
+            self.tokens_after += report["tokens_after"]
+
+    def record_comparison(self, agreement: Dict[str, bool]) -> None:
+        with self._lock:
+            self.compared += 1
+            self.all_fields_agree += int(all(agreement.values()))
+            for name, same in agreement.items():
+                self.field_agree[name] = self.field_agree.get(name, 0) + int(same)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            compared = self.compared
+            return {
+                "jobs": self.jobs,
+                "compacted": self.compacted,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": self.tokens_before - self.tokens_after,
+                "saved_pct": round(100 * (1 - self.tokens_after / self.tokens_before), 1) if self.tokens_before else 0.0,
+                "sample_compared": compared,
+                "sample_all_fields_agree": round(self.all_fields_agree / compared, 4) if compared else None,
+                "sample_field_agreement": {
+                    k: round(v / compared, 4) for k, v in sorted(self.field_agree.items())
+                } if compared else {},
+            }
+
+
+compaction_stats = CompactionStats()
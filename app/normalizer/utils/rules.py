@@ -0,0 +1,264 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.normalizer.llm.schema import JobOutputSchema
+from app.normalizer.utils.company import company_is_valid
+from app.normalizer.utils.text import unique_keep_order
+from app.normalizer.vocab.registry import VocabSnapshot, get_vocab
+from app.normalizer.vocab.synonyms import CATEGORY_TITLE_KEYWORDS
+
+# tags that are also everyday words; a keyword hit says nothing about the job
+_AMBIGUOUS_TAGS = {"Go", "R", "Swift", "Spark", "Rails", "Equity", "Node", "Bilingual", "AI", "Git"}
+
+# how much each field counts towards the overall confidence
+_FIELD_WEIGHTS = {
+    "job_category": 2.0,
+    "company_name": 1.0,
+    "job_type": 1.0,
+    "job_region": 1.0,
+    "salary": 1.0,
+    "job_tags": 1.0,
+    "benefits": 0.5,
+}
+
+
+class PhraseMatcher:
+    """
+    Case-insensitive whole-word phrase lookup: phrase → controlled-list value.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self._values = {k.casefold(): v for k, v in phrases.items()}
+        alternation = "|".join(re.escape(k) for k in sorted(self._values, key=len, reverse=True))
+        self._re = re.compile(r"(?<![\w.#+-])(" + alternation + r")(?![\w#+-])", re.I) if alternation else None
+
+    def find(self, text: str) -> List[str]:
+        if not text or self._re is None:
+            return []
+        return unique_keep_order(self._values[m.group(1).casefold()] for m in self._re.finditer(text))
+
+
+def _identity(values: Iterable[str]) -> Dict[str, str]:
+    return {v.strip(): v for v in values if v.strip()}
+
+
+class RuleMatchers:
+    """
+    The rule stage's matchers, compiled once per vocab version. Tags only
+    match their own spellings (values and aliases); the other lists also take
+    the looser synonym phrases. Title keywords only point at categories the
+    current vocab still has.
+    """
+
+    def __init__(self, vocab: VocabSnapshot):
+        self.version = vocab.version
+        tags = vocab["job_tags"]
+        self.tags = PhraseMatcher({
+            k: v for k, v in {**_identity(tags.values), **tags.aliases}.items() if v not in _AMBIGUOUS_TAGS
+        })
+        self.benefits = PhraseMatcher({**_identity(vocab["benefits"].values), **vocab["benefits"].phrases})
+        self.types = PhraseMatcher({**_identity(vocab["job_types"].values), **vocab["job_types"].phrases})
+        self.regions = PhraseMatcher({**_identity(vocab["regions"].values), **vocab["regions"].phrases})
+        categories = vocab["job_categories"]
+        self.categories = {
+            cat: PhraseMatcher({k: cat for k in kws}) for cat, kws in CATEGORY_TITLE_KEYWORDS.items() if cat in categories
+        }
+
+
+_matchers: Optional[RuleMatchers] = None
+_matchers_lock = threading.Lock()
+
+
+def get_rule_matchers() -> RuleMatchers:
+    global _matchers
+    vocab = get_vocab()
+    if _matchers is None or _matchers.version != vocab.version:
+        with _matchers_lock:
+            if _matchers is None or _matchers.version != vocab.version:
+                _matchers = RuleMatchers(vocab)
+    return _matchers
+
+_HINT_SPLIT = re.compile(r"\s*(?:,|/|\||;|\band\b|&)\s*", re.I)
+
+_CURRENCY = r"USD|EUR|GBP|CAD|AUD|CHF|\$|€|£"
+_AMOUNT_RE = re.compile(r"(\d{1,3}(?:[,.]\d{3})+|\d+(?:\.\d+)?)\s*([kK])?")
+_CURRENCY_RE = re.compile(r"(" + _CURRENCY + r")", re.I)
+_PERIOD_RE = re.compile(r"\b(hour|hr|hourly|day|daily|week|weekly|month|monthly)\b|/\s*(h|hr|d|mo)\b", re.I)
+_LOWER_BOUND_RE = re.compile(r"\b(from|min(imum)?|starting|at least|up from)\b|\+", re.I)
+
+
+def _map_hint(hint: str, matcher: PhraseMatcher) -> Tuple[List[str], float]:
+    """
+    Map a comma-ish separated hint onto a closed list. Confidence is 1.0 when
+    every part mapped, lower when only some did.
+    """
+    parts = [p for p in _HINT_SPLIT.split(hint or "") if p.strip()]
+    if not parts:
+        return [], 0.0
+    mapped: List[str] = []
+    hits = 0
+    for part in parts:
+        found = matcher.find(part)
+        if found:
+            hits += 1
+            mapped.extend(found)
+    return unique_keep_order(mapped), hits / len(parts)
+
+
+def normalize_salary_hint(text: str) -> Optional[str]:
+    """
+    Deterministic version of the prompt's salary rules for simple annual
+    figures ('$90k - $120k' → '$90,000–$120,000', 'from £90k' → '£90,000+').
+    Returns None when the text isn't clean enough to be sure.
+    """
+    s = (text or "").strip()
+    if not s or _PERIOD_RE.search(s):
+        return None
+    cur = _CURRENCY_RE.search(s)
+    if not cur:
+        return None
+    currency = cur.group(1).upper() if cur.group(1).isalpha() else cur.group(1)
+
+    amounts = []
+    for num, k in _AMOUNT_RE.findall(s):
+        value = float(num.replace(",", "").replace(".", "")) if re.search(r"[,.]\d{3}\b", num) else float(num)
+        if k:
+            value *= 1000
+        amounts.append(int(value))
+    if not amounts or len(amounts) > 2 or any(a < 1000 for a in amounts):
+        return None
+
+    def fmt(amount: int) -> str:
+        return f"{currency}{amount:,}" if not currency.isalpha() else f"{currency} {amount:,}"
+
+    if len(amounts) == 2:
+        return f"{fmt(min(amounts))}–{fmt(max(amounts))}"
+    return fmt(amounts[0]) + ("+" if _LOWER_BOUND_RE.search(s) else "")
+
+
+def _category_from_title(title: str, categories: Dict[str, PhraseMatcher]) -> Tuple[str, float]:
+    matches = [cat for cat, matcher in categories.items() if matcher.find(title)]
+    if len(matches) == 1:
+        return matches[0], 0.95
+    if matches:
+        # more than one category fits the title: take the most specific, low confidence
+        return matches[0], 0.5
+    return "", 0.1
+
+
+def rule_extract(payload: Dict[str, Any]) -> Tuple[JobOutputSchema, float, Dict[str, float]]:
+    """
+    Rule-based extraction from the preprocess payload (hints + title/description
+    keywords) onto the closed vocabularies.
+
+    Returns (result, confidence, per_field_confidence); confidence is the
+    weighted mean of the per-field scores in [0, 1]. The whole extraction
+    uses one vocab snapshot, the one current when it starts.
+    """
+    matchers = get_rule_matchers()
+    title = payload.get("title") or ""
+    description = payload.get("description") or ""
+    text = f"{title}\n{description}"
+    conf: Dict[str, float] = {}
+
+    company = (payload.get("provided_company_field") or "").strip()
+    if company_is_valid(company):
+        conf["company_name"] = 0.9
+    else:
+        company, conf["company_name"] = "", 0.0
+
+    category, conf["job_category"] = _category_from_title(title, matchers.categories)
+
+    job_type, coverage = _map_hint(payload.get("job_type_hint") or "", matchers.types)
+    if job_type:
+        conf["job_type"] = 0.95 if coverage == 1.0 else 0.6
+    else:
+        job_type = matchers.types.find(text)
+        conf["job_type"] = 0.6 if job_type else 0.3
+
+    job_region, coverage = _map_hint(payload.get("job_region_hint") or "", matchers.regions)
+    if job_region:
+        conf["job_region"] = 0.95 if coverage == 1.0 else 0.5
+    else:
+        job_region = matchers.regions.find(text)
+        conf["job_region"] = 0.5 if job_region else 0.3
+
+    salary_hint = (payload.get("salary_field") or "").strip()
+    salary = normalize_salary_hint(salary_hint) if salary_hint else None
+    if salary:
+        conf["salary"] = 0.9
+    elif not salary_hint and not _CURRENCY_RE.search(description):
+        # nothing that looks like pay anywhere: empty is the right answer
+        salary, conf["salary"] = "", 0.9
+    else:
+        salary, conf["salary"] = "", 0.2
+
+    job_tags = matchers.tags.find(text)
+    conf["job_tags"] = 0.6 if job_tags else 0.3
+
+    benefits = matchers.benefits.find(description)
+    conf["benefits"] = 0.7 if benefits or "benefit" not in description.lower() else 0.4
+
+    result = JobOutputSchema(
+        company_name=company,
+        company_website="",
+        job_category=category,
+        benefits=benefits,
+        job_tags=job_tags,
+        job_type=job_type,
+        job_region=job_region,
+        salary=salary,
+    )
+    total = sum(_FIELD_WEIGHTS.values())
+    confidence = sum(conf[f] * w for f, w in _FIELD_WEIGHTS.items()) / total
+    return result, round(confidence, 4), conf
+
+
+class RuleStats:
+    """
+    Counters for the rule stage; shadow comparisons are bucketed by confidence
+    (0.1 wide) so the bypass threshold can be tuned from agreement rates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.evaluated = 0
+        self.bypassed = 0
+        self.compared = 0
+        self.field_agree: Dict[str, int] = {}
+        self.buckets: Dict[str, Dict[str, int]] = {}
+
+    def record_evaluated(self, bypassed: bool) -> None:
+        with self._lock:
+            self.evaluated += 1
+            if bypassed:
+                self.bypassed += 1
+
+    def record_comparison(self, confidence: float, agreement: Dict[str, bool]) -> None:
+        bucket = f"{min(int(confidence * 10), 9) / 10:.1f}"
+        with self._lock:
+            self.compared += 1
+            for name, same in agreement.items():
+                self.field_agree[name] = self.field_agree.get(name, 0) + int(same)
+            b = self.buckets.setdefault(bucket, {"compared": 0, "all_fields_agree": 0})
+            b["compared"] += 1
+            b["all_fields_agree"] += int(all(agreement.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            compared = self.compared
+            return {
+                # vocab the rule matchers were last compiled for
+                "vocab_version": _matchers.version if _matchers is not None else None,
+                "evaluated": self.evaluated,
+                "bypassed": self.bypassed,
+                "shadow_compared": compared,
+                "field_agreement": {
+                    k: round(v / compared, 4) for k, v in sorted(self.field_agree.items())
+                } if compared else {},
+                "by_confidence": {k: dict(v) for k, v in sorted(self.buckets.items())},
+            }
+
+
+rule_stats = RuleStats()
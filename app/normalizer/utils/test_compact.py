@@ -0,0 +1,85 @@
+from app.normalizer.utils.compact import compact_description, drop_boilerplate, is_boilerplate, segments
+
+EEO = (
+    "Acme is an equal opportunity employer. We do not discriminate without regard to race, "
+    "color, religion, sex, national origin or disability."
+)
+COOKIES = "We use cookies to improve your experience. Accept all cookies?"
+
+
+def _filler(n: int) -> list:
+    return [
+        f"Paragraph {i} is about our history, our founders and the many offsites we have enjoyed together over the years."
+        for i in range(n)
+    ]
+
+
+def test_boilerplate_detection_keeps_salary_lines():
+    assert is_boilerplate(EEO)
+    assert is_boilerplate(COOKIES)
+    assert is_boilerplate("Apply now")
+    assert not is_boilerplate("Salary: $120,000 - $140,000. We are an equal opportunity employer.")
+    assert not is_boilerplate("You will build Python services on AWS.")
+
+
+def test_mixed_paragraph_keeps_its_content_sentences():
+    mixed = (
+        "You bring 5+ years of Python and PostgreSQL. We offer health insurance, a learning budget "
+        "and fully remote work across Europe. We are an equal opportunity employer."
+    )
+    assert len(mixed) < 400
+
+    assert not is_boilerplate(mixed)
+    assert drop_boilerplate(mixed) == (
+        "You bring 5+ years of Python and PostgreSQL. We offer health insurance, a learning budget "
+        "and fully remote work across Europe."
+    )
+    out, report = compact_description("\n".join(["About Acme", mixed]), budget_tokens=1000)
+    assert out == "About Acme\n" + drop_boilerplate(mixed)
+    assert report["boilerplate_dropped"] == 1
+
+
+def test_long_lines_split_into_sentences():
+    line = " ".join(["This sentence is long enough to count as filler text here."] * 10)
+    assert len(segments(line)) == 10
+    assert segments("short one\n\n  short two ") == ["short one", "short two"]
+
+
+def test_under_budget_only_drops_boilerplate_and_duplicates():
+    text = "\n".join(["About Acme", "We build Python APIs.", EEO, "About Acme", COOKIES])
+    out, report = compact_description(text, budget_tokens=1000)
+
+    assert out == "About Acme\nWe build Python APIs."
+    assert report["boilerplate_dropped"] == 2
+    assert report["duplicates_dropped"] == 1
+    assert report["budget_dropped"] == 0
+    assert report["tokens_saved"] == report["tokens_before"] - report["tokens_after"] > 0
+
+
+def test_budget_keeps_relevant_segments_in_order():
+    lines = (
+        ["Acme builds logistics software."]
+        + _filler(20)
+        + ["Salary: $120,000 - $140,000 per year.", "Stack: Python, Django, PostgreSQL and AWS."]
+        + _filler(20)
+        + ["Fully remote across Europe, health insurance and paid time off."]
+    )
+    out, report = compact_description("\n".join(lines), budget_tokens=120, title="Backend Engineer")
+
+    kept = out.split("\n")
+    assert report["tokens_after"] <= 120
+    assert report["budget_dropped"] > 0
+    for needed in (lines[0], "Salary: $120,000 - $140,000 per year.", "Stack: Python, Django, PostgreSQL and AWS.", lines[-1]):
+        assert needed in kept
+    # original order survives selection
+    assert kept.index(lines[0]) < kept.index("Salary: $120,000 - $140,000 per year.") < kept.index(lines[-1])
+
+
+def test_empty_and_disabled_budget():
+    assert compact_description("", 100) == ("", {
+        "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0,
+        "boilerplate_dropped": 0, "duplicates_dropped": 0, "budget_dropped": 0, "truncated": False,
+    })
+    text = "\n".join(_filler(50))
+    out, report = compact_description(text, budget_tokens=0)
+    assert out == text and report["tokens_saved"] == 0
@@ -0,0 +1,81 @@
+import app.normalizer.utils.rules as rules
+from app.normalizer.utils.rules import get_rule_matchers, normalize_salary_hint, rule_extract, rule_stats
+from app.normalizer.vocab.registry import BUILTIN_ALIASES, BUILTIN_LISTS, compile_vocab
+
+
+def _payload(**overrides):
+    payload = {
+        "title": "Senior Python Developer",
+        "description": "We build APIs with Python, Django and PostgreSQL. Fully remote team, paid time off.",
+        "salary_field": "$120k - $150k",
+        "job_region_hint": "USA, Canada",
+        "job_type_hint": "Full time",
+        "provided_company_field": "Acme",
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_salary_hint_follows_prompt_format():
+    assert normalize_salary_hint("$90k - $120k") == "$90,000–$120,000"
+    assert normalize_salary_hint("from £90k") == "£90,000+"
+    assert normalize_salary_hint("90000 EUR") == "EUR 90,000"
+
+
+def test_salary_hint_gives_up_on_unclear_pay():
+    assert normalize_salary_hint("$40/hr") is None
+    assert normalize_salary_hint("competitive") is None
+
+
+def test_clean_post_maps_hints_onto_closed_lists():
+    result, confidence, fields = rule_extract(_payload())
+
+    assert result.company_name == "Acme"
+    assert result.job_category == "Engineering"
+    assert result.job_type == ["full-time"]
+    assert result.job_region == ["US", "Canada"]
+    assert result.salary == "$120,000–$150,000"
+    assert {"Python", "Django", "PostgreSQL"} <= set(result.job_tags)
+    assert {"work from anywhere policy", "Unlimited Time Off"} <= set(result.benefits)
+    assert confidence > 0.85
+
+
+def test_missing_hints_lower_confidence():
+    _, clean, _ = rule_extract(_payload())
+    result, sparse, fields = rule_extract(_payload(
+        title="Ninja", job_type_hint="", job_region_hint="", salary_field="", provided_company_field="",
+    ))
+
+    assert result.job_category == ""
+    assert fields["job_category"] < 0.5
+    assert sparse < clean
+
+
+def test_loose_words_do_not_map_to_closed_list_values():
+    result, _, _ = rule_extract(_payload(
+        description="Remote role within the US on a 12-month contract.",
+        job_type_hint="Contract", job_region_hint="Remote",
+    ))
+
+    assert "Freelance" not in result.job_type
+    assert "Worldwide" not in result.job_region
+    assert "work from anywhere " not in result.job_tags
+
+    result, _, _ = rule_extract(_payload(job_type_hint="Freelance contractor", job_region_hint="Anywhere in the world"))
+    assert result.job_type == ["Freelance"]
+    assert result.job_region == ["Worldwide"]
+
+
+def test_rules_follow_a_vocab_reload(monkeypatch):
+    before, _, _ = rule_extract(_payload(description="Django and the Phoenix Framework."))
+    assert "Django" in before.job_tags and "Phoenix" not in before.job_tags
+
+    lists = {**BUILTIN_LISTS, "job_tags": [t for t in BUILTIN_LISTS["job_tags"] if t != "Django"] + ["Phoenix"]}
+    aliases = {**BUILTIN_ALIASES, "job_tags": {**BUILTIN_ALIASES["job_tags"], "phoenix framework": "Phoenix"}}
+    reloaded = compile_vocab(lists, aliases)
+    monkeypatch.setattr(rules, "get_vocab", lambda: reloaded)
+
+    after, _, _ = rule_extract(_payload(description="Django and the Phoenix Framework."))
+    assert "Phoenix" in after.job_tags and "Django" not in after.job_tags
+    assert get_rule_matchers().version == reloaded.version
+    assert rule_stats.stats()["vocab_version"] == reloaded.version
@@ -0,0 +1,31 @@
+import json
+from pathlib import Path
+
+from app.bench.corpus import load_corpus
+from app.bench.strip_html import bs4_strip_html, scraped_page
+from app.normalizer.utils.text import strip_html
+
+GOLDEN = json.loads((Path(__file__).parent / "fixtures" / "strip_html_golden.json").read_text(encoding="utf-8"))
+
+
+def test_golden_corpus():
+    for case in GOLDEN:
+        assert strip_html(case["html"]) == case["text"], case["html"]
+
+
+def test_same_text_as_bs4_apart_from_block_breaks():
+    # the BeautifulSoup version glued adjacent blocks together ("<p>a</p><p>b</p>" -> "ab");
+    # apart from where whitespace falls, the visible text must be identical
+    descriptions = [r["job"]["job_description"] for r in load_corpus()]
+    for html in descriptions + [case["html"] for case in GOLDEN] + [scraped_page(descriptions, 20 * 1024)]:
+        assert "".join(strip_html(html).split()) == "".join(bs4_strip_html(html).split())
+
+
+def test_none_and_empty():
+    assert strip_html(None) == ""
+    assert strip_html("<p> </p><br>") == ""
+
+
+def test_unclosed_tag_with_many_attributes_is_linear():
+    # a pathological unterminated tag must not backtrack exponentially
+    assert strip_html("<a " + "x='y " * 5000).startswith("<a x='y")
@@ -1,10 +1,61 @@
-from bs4 import BeautifulSoup
+import re
+from html import unescape
 from typing import Optional, Iterable, List
 
+# elements whose start/end starts a new line in the extracted text
+_BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "caption", "dd", "details", "div",
+    "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3",
+    "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "option", "p", "pre",
+    "section", "summary", "table", "title", "tr", "ul",
+})
+# table cells: same line, but never glued to the neighbouring cell
+_SPACED_TAGS = frozenset({"td", "th"})
+
+# one pass over the document; each match is markup, the gaps between matches are text
+_MARKUP = re.compile(
+    r"<(?P<raw>script|style|noscript|template)\b[^>]*>.*?(?:</(?P=raw)\s*>|\Z)"  # dropped with contents
+    r"|<!--.*?(?:-->|\Z)"  # comment
+    r"|<!\[CDATA\[(?P<cdata>.*?)(?:\]\]>|\Z)"
+    r"|<[!?][^>]*>"  # doctype / processing instruction
+    # quotes only delimit an attribute value right after "=": x'y in href=x'y is a plain character.
+    # The value is atomic so a tag that never closes fails in linear time.
+    r"|</?(?P<tag>[a-zA-Z][a-zA-Z0-9-]*)(?:[^>=]|=(?>\s*(?:\"[^\"]*\"|'[^']*'|[^\s>]*)))*>",
+    re.DOTALL | re.IGNORECASE,
+)
+_WS = re.compile(r"\s+")
+
+def _text(chunk: str) -> str:
+    return _WS.sub(" ", unescape(chunk)) if chunk else ""
+
 def strip_html(html: Optional[str]) -> str:
+    """
+    Visible text of an HTML fragment: script/style dropped, entities decoded,
+    whitespace collapsed, one line per block element.
+    """
     if not html:
         return ""
-    return " ".join(BeautifulSoup(html, "html.parser").get_text().split()).strip()
+    if "<" not in html:
+        return _WS.sub(" ", unescape(html)).strip()
+
+    parts: List[str] = []
+    pos = 0
+    for m in _MARKUP.finditer(html):
+        parts.append(_text(html[pos:m.start()]))
+        pos = m.end()
+        tag = m.group("tag")
+        if tag:
+            tag = tag.lower()
+            if tag in _BLOCK_TAGS:
+                parts.append("\n")
+            elif tag in _SPACED_TAGS:
+                parts.append(" ")
+        elif m.group("cdata"):
+            parts.append(_WS.sub(" ", m.group("cdata")))
+    parts.append(_text(html[pos:]))
+
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
 
 def unique_keep_order(items: Iterable[str]) -> List[str]:
     seen, out = set(), []
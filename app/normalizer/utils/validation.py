@@ -1,12 +1,13 @@
 from typing import Iterable, List, Any
 from app.normalizer.utils.text import unique_keep_order
+from app.normalizer.vocab.registry import Vocabulary
 
-def validate_one(value: str, allowed: List[str]) -> str:
-    return value if value in allowed else ""
+def validate_one(value: str, allowed: Vocabulary) -> str:
+    # exact value, or the value a case/spacing variant or alias stands for
+    return allowed.canonical(value)
 
-def validate_many(values: Iterable[str], allowed: List[str]) -> List[str]:
-    allowed_set = set(allowed)
-    return [v for v in unique_keep_order(values or []) if v in allowed_set]
+def validate_many(values: Iterable[str], allowed: Vocabulary) -> List[str]:
+    return unique_keep_order(c for c in (allowed.canonical(v) for v in values or []) if c)
 
 def coerce_list(x: Any) -> List[str]:
     if x is None:
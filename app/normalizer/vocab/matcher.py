@@ -0,0 +1,170 @@
+# app/normalizer/vocab/matcher.py
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.normalizer.vocab.registry import BUILTIN_LISTS, VocabSnapshot, get_vocab
+
+# list name → built-in controlled list, in build_prompt key order
+VOCAB_LISTS = BUILTIN_LISTS
+
+# safety margin: entries that are always sent because the model maps them from
+# phrasing a keyword scan can't see (seniority, broad regions, remote work)
+ALWAYS_INCLUDE = {
+    "job_tags": ["1-3 years", "3-5 years", "5+ years", "Entry Level", "work from anywhere "],
+    "regions": ["Worldwide", "EMEA", "Europe", "AMER", "LATAM", "APAC", "Asia", "Africa"],
+    "benefits": ["work from anywhere policy", "Flexible Schedule"],
+}
+
+# lists too short to be worth filtering
+UNFILTERED = ("job_categories", "job_types")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "_#+"
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: one pass over the text finds every pattern,
+    keeping only whole-word occurrences. Patterns are matched case-folded.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, object]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, object]]] = [[]]
+        for pattern, payload in patterns:
+            self._add(pattern.casefold(), payload)
+        self._build()
+
+    def _add(self, pattern: str, payload: object) -> None:
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), payload))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterable[object]:
+        folded = text.casefold()
+        # casefold can change length (e.g. 'ß'); boundaries are checked on the folded text
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(folded)
+        for i, ch in enumerate(folded):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            after_ok = i + 1 >= n or not _is_word_char(folded[i + 1])
+            for length, payload in out[node]:
+                start = i - length + 1
+                before_ok = start == 0 or not _is_word_char(folded[start - 1])
+                if before_ok and (after_ok or not _is_word_char(folded[i])):
+                    yield payload
+
+
+def _related(values: List[str]) -> Dict[str, List[str]]:
+    """
+    Spelling families inside one list (React/Reactjs/react native, Node/node.js,
+    Go/Golang): if one member is a candidate, all are.
+    """
+    stems = {v: "".join(ch for ch in v.casefold() if ch.isalnum()) for v in values}
+    family: Dict[str, List[str]] = {v: [] for v in values}
+    for a in values:
+        for b in values:
+            sa, sb = stems[a], stems[b]
+            if a != b and len(sa) >= 2 and sb.startswith(sa):
+                family[a].append(b)
+                family[b].append(a)
+    return family
+
+
+class VocabMatcher:
+    """
+    Compiled once per vocab version from the lists and their phrases; returns,
+    per controlled list, the entries a description could plausibly map to.
+    """
+
+    def __init__(self, vocab: VocabSnapshot):
+        self.version = vocab.version
+        self._lists = vocab.as_lists()
+        patterns = []
+        for name, values in self._lists.items():
+            if name in UNFILTERED:
+                continue
+            for value in values:
+                if value.strip():
+                    patterns.append((value.strip(), (name, value)))
+            for phrase, value in vocab[name].phrases.items():
+                patterns.append((phrase, (name, value)))
+        self._automaton = AhoCorasick(patterns)
+        self._families = {name: _related(values) for name, values in self._lists.items()}
+
+    def hits(self, text: str) -> Set[Tuple[str, str]]:
+        """
+        Distinct (list name, value) pairs mentioned in the text, synonyms included.
+        """
+        return set(self._automaton.iter_matches(text or ""))
+
+    def candidates(self, text: str) -> Dict[str, List[str]]:
+        found: Dict[str, Set[str]] = {name: set(ALWAYS_INCLUDE.get(name, ())) for name in self._lists}
+        for name, value in self._automaton.iter_matches(text or ""):
+            found[name].add(value)
+            found[name].update(self._families[name].get(value, ()))
+
+        out: Dict[str, List[str]] = {}
+        for name, values in self._lists.items():
+            if name in UNFILTERED:
+                out[name] = list(values)
+            else:
+                # keep the controlled list's own order
+                out[name] = [v for v in values if v in found[name]]
+        return out
+
+
+_matcher: Optional[VocabMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_vocab_matcher() -> VocabMatcher:
+    global _matcher
+    vocab = get_vocab()
+    if _matcher is None or _matcher.version != vocab.version:
+        with _matcher_lock:
+            if _matcher is None or _matcher.version != vocab.version:
+                _matcher = VocabMatcher(vocab)
+    return _matcher
+
+
+def vocab_candidates(payload: Dict[str, object]) -> Dict[str, List[str]]:
+    """
+    Candidate entries per controlled list for one preprocess payload.
+    """
+    text = "\n".join(
+        str(payload.get(k) or "")
+        for k in ("title", "description", "job_region_hint", "job_type_hint")
+    )
+    return get_vocab_matcher().candidates(text)
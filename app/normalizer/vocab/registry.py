@@ -0,0 +1,293 @@
+# app/normalizer/vocab/registry.py
+"""
+Controlled vocabularies compiled once into frozen lookup structures.
+
+The lists in this package are the built-in default. VOCAB_PATH may point at
+a JSON file that replaces any of them and adds aliases:
+
+    {"job_tags": [...], "aliases": {"job_tags": {"react.js": "Reactjs"}}}
+
+Aliases are other spellings of a value and validation maps them onto it.
+The broader synonym tables ("remote" → Worldwide) only feed the prompt's
+candidate filter as phrases; a model answer is never rewritten through them.
+
+The file is re-read when it changes (checked at most every
+VOCAB_RELOAD_SECONDS), so a vocabulary edit needs no redeploy. Each compiled
+snapshot carries a content hash; the prompt version, and with it every
+extraction cache key, follows it.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from app.core.config import VOCAB_PATH, VOCAB_RELOAD_SECONDS
+from app.core.metrics import VOCAB_RELOADS
+from app.normalizer.vocab.benefits import BENEFITS_WHITELIST
+from app.normalizer.vocab.categories import JOB_CATEGORIES
+from app.normalizer.vocab.regions import REGION_VALUES
+from app.normalizer.vocab.synonyms import (
+    BENEFIT_SYNONYMS, JOB_TYPE_SYNONYMS, NAME_VARIANTS, REGION_SYNONYMS, TAG_SYNONYMS,
+)
+from app.normalizer.vocab.tags import JOB_TAGS_WHITELIST
+from app.normalizer.vocab.types import JOB_TYPES
+
+log = logging.getLogger("job-normalizer")
+
+# list name → built-in controlled list, in build_prompt key order
+BUILTIN_LISTS: Dict[str, List[str]] = {
+    "job_categories": JOB_CATEGORIES,
+    "job_types": JOB_TYPES,
+    "job_tags": JOB_TAGS_WHITELIST,
+    "benefits": BENEFITS_WHITELIST,
+    "regions": REGION_VALUES,
+}
+
+# built-in phrases: the synonym tables that point into each list
+BUILTIN_PHRASES: Dict[str, Dict[str, str]] = {
+    "job_types": JOB_TYPE_SYNONYMS,
+    "job_tags": TAG_SYNONYMS,
+    "benefits": BENEFIT_SYNONYMS,
+    "regions": REGION_SYNONYMS,
+}
+
+
+def fold(value: str) -> str:
+    """
+    Lookup key: case-folded, whitespace trimmed and collapsed.
+    """
+    return " ".join((value or "").split()).casefold()
+
+
+def _skeleton(value: str) -> str:
+    return "".join(c for c in value.casefold() if c.isalnum())
+
+
+def spelling_variants(table: Mapping[str, str], names: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+    """
+    Entries of a synonym table that only differ from their value in case and
+    punctuation ("react.js" → Reactjs, "full time" → full-time), plus `names`.
+    """
+    out = {alias: value for alias, value in table.items() if _skeleton(alias) == _skeleton(value)}
+    out.update(names or {})
+    return out
+
+
+# built-in aliases: spelling variants only
+BUILTIN_ALIASES: Dict[str, Dict[str, str]] = {
+    name: spelling_variants(table, NAME_VARIANTS.get(name)) for name, table in BUILTIN_PHRASES.items()
+}
+
+
+@dataclass(frozen=True, eq=False)
+class Vocabulary:
+    """
+    One controlled list. `values` keeps the list's own order (the prompt shows
+    it as is); `exact` answers verbatim membership; `keys` maps the folded
+    form of every value and alias to its canonical value. `phrases` (aliases
+    plus looser synonyms) is what a description may say to mean a value.
+    """
+
+    name: str
+    values: Tuple[str, ...]
+    exact: FrozenSet[str]
+    keys: Mapping[str, str]
+    aliases: Mapping[str, str]
+    phrases: Mapping[str, str]
+
+    @classmethod
+    def compile(
+        cls, name: str, values: Sequence[str], aliases: Optional[Mapping[str, str]] = None,
+        phrases: Optional[Mapping[str, str]] = None,
+    ) -> "Vocabulary":
+        keys: Dict[str, str] = {}
+        for value in values:
+            # values differing only in case keep their first spelling for folded lookups
+            keys.setdefault(fold(value), value)
+
+        def resolve(table: Mapping[str, str], warn: bool) -> Dict[str, str]:
+            resolved: Dict[str, str] = {}
+            for alias, target in table.items():
+                canonical = target if target in values else keys.get(fold(target))
+                if canonical is None:
+                    if warn:
+                        log.warning("Vocab %s: alias %r points at unknown value %r", name, alias, target)
+                    continue
+                resolved[fold(alias)] = canonical
+            return resolved
+
+        resolved = resolve(aliases or {}, warn=True)
+        # built-in phrases for a list a vocab file replaced may point nowhere; that's expected
+        matched = {**resolve(phrases or {}, warn=False), **resolved}
+        for alias, canonical in resolved.items():
+            # a real value always wins over an alias of the same spelling
+            keys.setdefault(alias, canonical)
+        return cls(
+            name, tuple(values), frozenset(values), MappingProxyType(keys),
+            MappingProxyType(resolved), MappingProxyType(matched),
+        )
+
+    def canonical(self, value: str) -> str:
+        """
+        The controlled value `value` stands for, or "" if none.
+        """
+        if value in self.exact:
+            return value
+        return self.keys.get(fold(value), "")
+
+    def __contains__(self, value: object) -> bool:
+        return value in self.exact
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+@dataclass(frozen=True, eq=False)
+class VocabSnapshot:
+    """
+    All controlled lists at one version. Immutable: a reload builds a new one.
+    """
+
+    lists: Mapping[str, Vocabulary]
+    version: str
+    source: str
+
+    def __getitem__(self, name: str) -> Vocabulary:
+        return self.lists[name]
+
+    def as_lists(self) -> Dict[str, List[str]]:
+        return {name: list(vocab.values) for name, vocab in self.lists.items()}
+
+
+def compile_vocab(
+    lists: Mapping[str, Sequence[str]], aliases: Optional[Mapping[str, Mapping[str, str]]] = None, source: str = "builtin",
+    phrases: Optional[Mapping[str, Mapping[str, str]]] = None,
+) -> VocabSnapshot:
+    aliases = aliases or {}
+    phrases = BUILTIN_PHRASES if phrases is None else phrases
+    ordered = {name: list(lists[name]) for name in BUILTIN_LISTS}
+    material = json.dumps(
+        {
+            "lists": ordered,
+            "aliases": {name: dict(sorted(aliases.get(name, {}).items())) for name in BUILTIN_LISTS},
+            "phrases": {name: dict(sorted(phrases.get(name, {}).items())) for name in BUILTIN_LISTS},
+        },
+        ensure_ascii=False,
+    )
+    return VocabSnapshot(
+        lists=MappingProxyType({
+            name: Vocabulary.compile(name, values, aliases.get(name), phrases.get(name))
+            for name, values in ordered.items()
+        }),
+        version=hashlib.sha256(material.encode("utf-8")).hexdigest()[:12],
+        source=source,
+    )
+
+
+def _read_file(path: str) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, str]]]:
+    """
+    Lists and aliases from a vocab file, on top of the built-in ones.
+    """
+    with open(path, encoding="utf-8") as f:
+        data: Dict[str, Any] = json.load(f)
+    lists = dict(BUILTIN_LISTS)
+    for name in BUILTIN_LISTS:
+        if name not in data:
+            continue
+        values = data[name]
+        if not isinstance(values, list) or not all(isinstance(v, str) and v.strip() for v in values):
+            raise ValueError(f"{name} must be a list of non-empty strings")
+        lists[name] = values
+    aliases = {name: dict(table) for name, table in BUILTIN_ALIASES.items()}
+    for name, table in (data.get("aliases") or {}).items():
+        if name not in BUILTIN_LISTS or not isinstance(table, dict):
+            raise ValueError(f"aliases.{name} must map alias → value of a known list")
+        aliases.setdefault(name, {}).update(table)
+    return lists, aliases
+
+
+class VocabRegistry:
+    """
+    Current VocabSnapshot; re-reads `path` when its mtime changes. A file
+    that fails to load is logged and the previous snapshot stays in use.
+    """
+
+    def __init__(self, path: str = VOCAB_PATH, reload_seconds: float = VOCAB_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._snapshot: Optional[VocabSnapshot] = None
+        self._mtime: Optional[int] = None
+        self._checked = 0.0
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def current(self) -> VocabSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not (self.path and time.monotonic() - self._checked >= self.reload_seconds):
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or (self.path and time.monotonic() - self._checked >= self.reload_seconds):
+                self._load_locked(force=False)
+            return self._snapshot
+
+    def reload(self) -> VocabSnapshot:
+        with self._lock:
+            self._load_locked(force=True)
+            return self._snapshot
+
+    def _load_locked(self, force: bool) -> None:
+        self._checked = time.monotonic()
+        if self._snapshot is None:
+            self._snapshot = compile_vocab(BUILTIN_LISTS, BUILTIN_ALIASES)
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = -1
+        if mtime == self._mtime and not force:
+            return
+        # a missing or broken file is reported once, not on every check until it is fixed
+        self._mtime = mtime
+        try:
+            lists, aliases = _read_file(self.path)
+            snapshot = compile_vocab(lists, aliases, source=self.path)
+        except (OSError, ValueError) as e:
+            self.reload_errors += 1
+            VOCAB_RELOADS.inc(result="error")
+            log.warning("Keeping vocab %s: could not load %s: %s", self._snapshot.version, self.path, e)
+            return
+        if snapshot.version != self._snapshot.version:
+            self.reloads += 1
+            VOCAB_RELOADS.inc(result="ok")
+            log.info("Vocab %s -> %s loaded from %s", self._snapshot.version, snapshot.version, self.path)
+        self._snapshot = snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.current()
+        return {
+            "version": snapshot.version,
+            "source": snapshot.source,
+            "path": self.path or None,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "sizes": {name: len(vocab) for name, vocab in snapshot.lists.items()},
+            "aliases": {name: len(vocab.aliases) for name, vocab in snapshot.lists.items()},
+            "phrases": {name: len(vocab.phrases) for name, vocab in snapshot.lists.items()},
+        }
+
+
+vocab_registry = VocabRegistry()
+
+
+def get_vocab() -> VocabSnapshot:
+    return vocab_registry.current()
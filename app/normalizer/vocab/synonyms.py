@@ -0,0 +1,178 @@
+# app/normalizer/vocab/synonyms.py
+# Free-text phrases → exact controlled-list value. Keys are lower-case.
+
+# mirrors the "Benefits mapping" block of the SYSTEM prompt
+BENEFIT_SYNONYMS = {
+    "remote-first": "work from anywhere policy",
+    "remote first": "work from anywhere policy",
+    "fully remote": "work from anywhere policy",
+    "distributed team": "work from anywhere policy",
+    "work remotely": "work from anywhere policy",
+    "work from anywhere": "work from anywhere policy",
+    "flexible hours": "Flexible Schedule",
+    "flexible schedule": "Flexible Schedule",
+    "flexible working hours": "Flexible Schedule",
+    "pto": "Unlimited Time Off",
+    "paid time off": "Unlimited Time Off",
+    "vacation days": "Unlimited Time Off",
+    "unlimited vacation": "Unlimited Time Off",
+    "health insurance": "Health insurance",
+    "dental": "Health insurance",
+    "vision coverage": "Health insurance",
+    "medical insurance": "Health insurance",
+    "parental leave": "parental leave",
+    "maternity leave": "parental leave",
+    "paternity leave": "parental leave",
+    "equity": "Equity / Stocks",
+    "stock options": "Equity / Stocks",
+    "rsus": "Equity / Stocks",
+    "token grants": "Equity / Stocks",
+    "learning budget": "professional development allowance",
+    "training budget": "professional development allowance",
+    "professional development": "professional development allowance",
+    "mental health": "mental health support",
+    "therapy": "mental health support",
+    "coworking stipend": "coworking budget",
+    "coworking budget": "coworking budget",
+    "home office stipend": "home-office budget",
+    "home office budget": "home-office budget",
+    "equipment budget": "home-office budget",
+    "childcare": "Childcare support",
+    "fertility": "Fertility benefits",
+    "company retreat": "company retreats",
+    "team retreat": "company retreats",
+    "wellbeing allowance": "wellbeing allowance",
+    "wellness allowance": "wellbeing allowance",
+    "4 day work week": "4 day work week ",
+    "four-day work week": "4 day work week ",
+}
+
+JOB_TYPE_SYNONYMS = {
+    "full time": "full-time",
+    "full-time": "full-time",
+    "fulltime": "full-time",
+    "ft": "full-time",
+    "permanent": "full-time",
+    "part time": "Part Time",
+    "part-time": "Part Time",
+    "pt": "Part Time",
+    "intern": "Internship",
+    "internship": "Internship",
+    "freelance": "Freelance",
+    "freelancer": "Freelance",
+    # a contract role may well be full-time employment: only the explicit phrases
+    "freelance contract": "Freelance",
+    "freelance contractor": "Freelance",
+    "temporary": "Temporary",
+    "temp": "Temporary",
+    "4 day week": "4 day week",
+    "four day week": "4 day week",
+}
+
+REGION_SYNONYMS = {
+    # plain "remote" or "anywhere" is often remote within one country
+    "anywhere in the world": "Worldwide",
+    "global": "Worldwide",
+    "worldwide": "Worldwide",
+    "usa": "US",
+    "u.s.": "US",
+    "united states": "US",
+    "united states of america": "US",
+    "uk": "UK",
+    "united kingdom": "UK",
+    "great britain": "UK",
+    "england": "UK",
+    "eu": "Europe",
+    "european union": "Europe",
+    "latin america": "LATAM",
+    "south america": "LATAM",
+    "north america": "AMER",
+    "americas": "AMER",
+    "asia pacific": "APAC",
+    "asia-pacific": "APAC",
+    "united arab emirates": "UAE",
+    "czech republic": "Czechia",
+    "north macedonia": "Macedonia",
+    "türkiye": "Turkey",
+}
+
+# title keywords per job category, most specific first; matched on word boundaries
+CATEGORY_TITLE_KEYWORDS = {
+    "Data": [
+        "data scientist", "data analyst", "data engineer", "machine learning", "ml engineer",
+        "analytics", "business intelligence", "bi developer", "data",
+    ],
+    "Engineering": [
+        "software engineer", "developer", "engineer", "programmer", "devops", "sre",
+        "frontend", "front-end", "backend", "back-end", "full stack", "fullstack", "architect",
+    ],
+    "Design": ["designer", "ux", "ui", "design"],
+    "Product": ["product manager", "product owner", "product lead", "head of product"],
+    "Marketing": ["marketing", "seo", "growth", "content writer", "copywriter", "social media", "brand"],
+    "Sales": ["sales", "account executive", "business development", "sdr", "bdr", "account manager"],
+    "Customer Support": ["customer support", "customer success", "customer service", "support specialist", "support"],
+    "Finance": ["accountant", "finance", "financial", "controller", "bookkeeper", "payroll"],
+    "Human Resources": ["recruiter", "talent acquisition", "human resources", "hr", "people partner", "people operations"],
+    "Legal": ["lawyer", "counsel", "legal", "paralegal", "attorney", "compliance"],
+    "IT": ["it support", "system administrator", "sysadmin", "helpdesk", "help desk", "network administrator"],
+    "Admin & Operations": ["operations", "office manager", "executive assistant", "administrative", "admin"],
+}
+
+# common spellings/abbreviations of whitelisted tags
+TAG_SYNONYMS = {
+    "golang": "Golang",
+    "k8s": "Kubernetes",
+    "postgres": "PostgreSQL",
+    "postgresql": "PostgreSQL",
+    "js": "Javascript",
+    "javascript": "Javascript",
+    "ts": "Typescript",
+    "typescript": "Typescript",
+    "nodejs": "node.js",
+    "react.js": "Reactjs",
+    "react-native": "react native",
+    "nextjs": "Next.js",
+    "vuejs": "vue.js",
+    "ml": "Machine Learning",
+    "artificial intelligence": "AI",
+    "llm": "AI",
+    "ruby on rails": "Ruby on Rails",
+    "ror": "Ruby on Rails",
+    "crypto": "jobs in crypto",
+    "defi": "web3",
+    "dao": "jobs in crypto",
+    "smart contract": "Blockchain",
+    "smart contracts": "Blockchain",
+    "mongo": "MongoDB",
+    "gcp bigquery": "BigQuery",
+    "tailwindcss": "Tailwind",
+    "work from anywhere": "work from anywhere ",
+    "visa sponsorship": "Visa support",
+    "relocation": "Relocation support",
+    "offsite": "company off-sites",
+    "junior": "1-3 years",
+    "mid-level": "3-5 years",
+    "senior": "5+ years",
+    "entry level": "Entry Level",
+    "entry-level": "Entry Level",
+}
+
+# the same name written another way, beyond what case and punctuation cover;
+# the only aliases validation accepts besides those (see vocab.registry)
+NAME_VARIANTS = {
+    "job_tags": {
+        "k8s": "Kubernetes",
+        "postgres": "PostgreSQL",
+        "js": "Javascript",
+        "ts": "Typescript",
+        "mongo": "MongoDB",
+        "tailwindcss": "Tailwind",
+    },
+    "regions": {
+        "usa": "US",
+        "united states": "US",
+        "united states of america": "US",
+        "united kingdom": "UK",
+        "united arab emirates": "UAE",
+    },
+}
@@ -0,0 +1,20 @@
+from app.normalizer.vocab.matcher import AhoCorasick, VOCAB_LISTS, get_vocab_matcher
+
+
+def test_aho_corasick_matches_whole_words_only():
+    automaton = AhoCorasick([("java", "java"), ("javascript", "js"), ("c#", "c#")])
+
+    assert list(automaton.iter_matches("JavaScript and C# but not Javanese")) == ["js", "c#"]
+
+
+def test_candidates_include_synonyms_families_and_margin():
+    candidates = get_vocab_matcher().candidates(
+        "We ship React and k8s. Stock options and paid time off."
+    )
+
+    assert {"React", "Reactjs", "react native", "Kubernetes"} <= set(candidates["job_tags"])
+    assert {"Equity / Stocks", "Unlimited Time Off"} <= set(candidates["benefits"])
+    # broad regions are always offered, short lists are never filtered
+    assert "Worldwide" in candidates["regions"]
+    assert candidates["job_categories"] == VOCAB_LISTS["job_categories"]
+    assert "Scala" not in candidates["job_tags"]
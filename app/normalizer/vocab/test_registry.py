@@ -0,0 +1,62 @@
+import json
+import os
+
+from app.normalizer.utils.validation import validate_many, validate_one
+from app.normalizer.vocab.registry import BUILTIN_ALIASES, BUILTIN_LISTS, VocabRegistry, compile_vocab
+
+
+def test_lookups_exact_folded_and_aliases():
+    vocab = compile_vocab(BUILTIN_LISTS, BUILTIN_ALIASES)
+    tags = vocab["job_tags"]
+
+    assert validate_one("Reactjs", tags) == "Reactjs"
+    assert validate_one("  PYTHON ", tags) == "Python"
+    assert validate_one("k8s", tags) == "Kubernetes"
+    # both spellings are in the list: each stays itself
+    assert validate_one("high-salary", tags) == "high-salary"
+    assert validate_one("Cobol", tags) == ""
+    assert validate_many(["full time", "Full-Time", "FT", "Part Time", "gig"], vocab["job_types"]) == ["full-time", "Part Time"]
+
+
+def test_synonyms_are_not_validation_aliases():
+    vocab = compile_vocab(BUILTIN_LISTS, BUILTIN_ALIASES)
+
+    # not the same thing: a remote US job isn't Worldwide, a contract isn't freelancing
+    assert validate_one("remote", vocab["regions"]) == ""
+    assert validate_one("Contract", vocab["job_types"]) == ""
+    assert validate_one("U.S.", vocab["regions"]) == "US"
+    assert validate_one("react.js", vocab["job_tags"]) == "Reactjs"
+    # the prompt filter still hears the looser synonyms
+    assert validate_one("stock options", vocab["benefits"]) == ""
+    assert vocab["benefits"].phrases["stock options"] == "Equity / Stocks"
+
+
+def test_version_follows_content():
+    base = compile_vocab(BUILTIN_LISTS, BUILTIN_ALIASES)
+
+    assert compile_vocab(BUILTIN_LISTS, BUILTIN_ALIASES).version == base.version
+    assert compile_vocab({**BUILTIN_LISTS, "job_categories": ["Data"]}, BUILTIN_ALIASES).version != base.version
+    assert compile_vocab(BUILTIN_LISTS, {"job_tags": {"py": "Python"}}).version != base.version
+
+
+def test_hot_reload_from_file_keeps_last_good_snapshot(tmp_path):
+    path = tmp_path / "vocab.json"
+    path.write_text(json.dumps({"job_categories": ["Data", "Engineering"], "aliases": {"job_tags": {"py3": "Python"}}}))
+    registry = VocabRegistry(str(path), reload_seconds=0)
+
+    first = registry.current()
+    assert first.source == str(path)
+    assert list(first["job_categories"]) == ["Data", "Engineering"]
+    assert first["job_tags"].canonical("PY3") == "Python"
+    assert first["regions"].values == tuple(BUILTIN_LISTS["regions"])
+    assert registry.current() is first  # unchanged file: no recompile
+
+    path.write_text(json.dumps({"job_categories": ["Data", "Legal"]}))
+    os.utime(path, ns=(1, 10 ** 18))
+    second = registry.current()
+    assert list(second["job_categories"]) == ["Data", "Legal"] and second.version != first.version
+
+    path.write_text("{not json")
+    os.utime(path, ns=(1, 2 * 10 ** 18))
+    assert registry.current() is second
+    assert registry.stats()["reload_errors"] == 1 and registry.stats()["version"] == second.version
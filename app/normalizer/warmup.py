@@ -0,0 +1,153 @@
+# app/normalizer/warmup.py
+"""
+Startup warm-up: pay the one-off costs (imports, graph compilation, model
+clients, lookup structures) before the first request does.
+
+Phases run in order and are timed one by one. A failed required phase
+leaves the service not ready; a failed optional phase is logged and the
+structure is simply built lazily on first use as before.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.metrics import READY, STARTUP_PHASE_SECONDS
+
+log = logging.getLogger("job-normalizer")
+
+PENDING = "pending"
+RUNNING = "running"
+READY_STATE = "ready"
+FAILED = "failed"
+
+
+def _compile_graphs() -> None:
+    # importing the module compiles every graph and pulls in LangGraph/LangChain/OpenAI
+    import app.normalizer.graph  # noqa: F401
+
+
+def _build_model_clients() -> None:
+    from app.core.config import PACK_ENABLED
+    from app.normalizer.llm.model import get_chain, get_packed_chain, model_ids
+
+    for model_id in dict.fromkeys(model_ids()):
+        get_chain(model_id)
+        if PACK_ENABLED:
+            get_packed_chain(model_id)
+
+
+def _build_supabase_clients() -> None:
+    from app.integrations.postgrest import get_postgrest
+    from app.integrations.supabase_client import get_supabase
+
+    get_supabase()
+    get_postgrest()
+
+
+def _build_vocab() -> None:
+    from app.normalizer.llm.prompt import prompt_version, static_prompt_tokens
+    from app.normalizer.vocab.matcher import get_vocab_matcher
+    from app.normalizer.vocab.registry import get_vocab
+
+    get_vocab()
+    get_vocab_matcher()
+    static_prompt_tokens()
+    prompt_version()
+
+
+def _open_caches() -> None:
+    from app.normalizer.llm.cache import get_extraction_cache
+    from app.normalizer.llm.near_dup import get_near_dup_index
+
+    get_extraction_cache()
+    get_near_dup_index()
+
+
+def default_phases(prime_caches: bool) -> List[Tuple[str, Callable[[], None], bool]]:
+    """
+    (name, fn, required) in run order.
+    """
+    phases = [
+        ("graph", _compile_graphs, True),
+        ("model_clients", _build_model_clients, True),
+        ("supabase_clients", _build_supabase_clients, False),
+        ("vocab", _build_vocab, False),
+    ]
+    if prime_caches:
+        phases.append(("caches", _open_caches, False))
+    return phases
+
+
+class Warmup:
+    """
+    Runs the phases once and remembers how it went, for /readyz.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = PENDING
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.total_seconds: Optional[float] = None
+        READY.set(0)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY_STATE
+
+    def run(self, phases: List[Tuple[str, Callable[[], None], bool]]) -> bool:
+        with self._lock:
+            if self.state != PENDING:
+                return self.ready
+            self.state = RUNNING
+
+        t_start = time.perf_counter()
+        failed = False
+        for name, fn, required in phases:
+            t0 = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self.errors[name] = str(e)
+                if required:
+                    log.error("Warm-up phase %s failed: %s", name, e)
+                    failed = True
+                    break
+                log.warning("Warm-up phase %s failed, continuing: %s", name, e)
+            finally:
+                seconds = time.perf_counter() - t0
+                self.phases[name] = round(seconds, 4)
+                STARTUP_PHASE_SECONDS.set(seconds, phase=name)
+            log.info("Warm-up phase %s took %.3fs", name, seconds)
+
+        self.total_seconds = round(time.perf_counter() - t_start, 4)
+        self.state = FAILED if failed else READY_STATE
+        READY.set(0 if failed else 1)
+        log.info("Warm-up %s in %.3fs", self.state, self.total_seconds)
+        return self.ready
+
+    def start(self, phases: List[Tuple[str, Callable[[], None], bool]]) -> threading.Thread:
+        """
+        Run in a daemon thread so the server answers /healthz meanwhile.
+        """
+        thread = threading.Thread(target=self.run, args=(phases,), name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def skip(self) -> None:
+        with self._lock:
+            if self.state == PENDING:
+                self.state = READY_STATE
+                READY.set(1)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": self.state,
+            "phases_s": dict(self.phases),
+            "errors": dict(self.errors),
+            "total_s": self.total_seconds,
+        }
+
+
+warmup = Warmup()